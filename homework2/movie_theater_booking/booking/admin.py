@@ -2,8 +2,10 @@ from django.contrib import admin
 
 # Register your models here.
 
-from .models import Movie, Seat, Booking
+from .models import Movie, Auditorium, Showtime, Seat, Booking
 
 admin.site.register(Movie)
+admin.site.register(Auditorium)
+admin.site.register(Showtime)
 admin.site.register(Seat)
 admin.site.register(Booking)
\ No newline at end of file
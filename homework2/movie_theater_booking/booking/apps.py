@@ -4,3 +4,14 @@ from django.apps import AppConfig
 class BookingConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'booking'
+    
+    def ready(self):
+        # Register signal handlers
+        from . import signals  # noqa: F401
+        # Apply the SQLite pragmas to new connections
+        from . import sqlitetuning  # noqa: F401
+        
+        # Time queries for the Server-Timing header
+        from . import timing
+        if timing.timing_enabled():
+            timing.install()
@@ -0,0 +1,160 @@
+"""
+Native async implementations of the read-heavy API endpoints.
+
+Under the ASGI worker these run on the event loop with Django's async ORM
+instead of being pushed through a thread by sync_to_async. They return
+the same JSON as their BookingViewSet/MovieViewSet/SeatViewSet
+counterparts, which still handle writes and the browsable API.
+Serializers are only given rows that are fully loaded (select_related and
+annotations), so serializing never touches the database.
+"""
+from django.http import HttpResponse
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from .models import Movie, Showtime, Seat, Booking, SeatHold
+from .pagination import MovieCursorPagination, BookingCursorPagination
+from .serializers import (
+    MovieSerializer,
+    MovieDetailSerializer,
+    SeatAvailabilitySerializer,
+    BookingSerializer
+)
+from . import availability
+from . import counters
+from . import seatcatalog
+from .timing import serialized
+
+_renderer = JSONRenderer()
+
+
+def _json(data, status=200):
+    return HttpResponse(_renderer.render(data), status=status, content_type='application/json')
+
+
+def _not_found(model):
+    return _json({"detail": f"No {model.__name__} matches the given query."}, status=404)
+
+
+def _method_not_allowed(request):
+    return _json({"detail": f'Method "{request.method}" not allowed.'}, status=405)
+
+
+async def _paginated(request, queryset, paginator_class, serializer_class):
+    """Serialize one cursor page in the same shape as the viewsets"""
+    paginator = paginator_class()
+    drf_request = Request(request)
+    page = await paginator.apaginate_queryset(queryset, drf_request)
+    serializer = serializer_class(page, many=True, context={'request': drf_request})
+    return _json(paginator.get_paginated_response(serialized(serializer)).data)
+
+
+async def _require_user(request):
+    """Return the session user, or None if the request is anonymous"""
+    user = await request.auser()
+    if not user.is_authenticated:
+        return None
+    return user
+
+
+async def movie_list(request):
+    """GET /api/async/movies/"""
+    if request.method != 'GET':
+        return _method_not_allowed(request)
+    return await _paginated(request, Movie.objects.all(), MovieCursorPagination, MovieSerializer)
+
+
+async def movie_detail(request, pk):
+    """GET /api/async/movies/{id}/"""
+    if request.method != 'GET':
+        return _method_not_allowed(request)
+    
+    movie = await (
+        Movie.objects.annotate(total_seats=counters.capacity_subquery())
+        .filter(pk=pk)
+        .afirst()
+    )
+    if movie is None:
+        return _not_found(Movie)
+    return _json(serialized(MovieDetailSerializer(movie)))
+
+
+async def movie_available_seats(request, pk):
+    """GET /api/async/movies/{id}/available_seats/"""
+    if request.method != 'GET':
+        return _method_not_allowed(request)
+    showtime = await Showtime.objects.aprimary_for(pk)
+    if showtime is None:
+        if not await Movie.objects.filter(pk=pk).aexists():
+            return _not_found(Movie)
+        return _json([])
+    
+    seats = await seatcatalog.aavailable_seats(showtime)
+    serializer = SeatAvailabilitySerializer(seats, many=True, context={'showtime_id': showtime.id})
+    return _json(serialized(serializer))
+
+
+async def seat_check_availability(request, pk):
+    """GET /api/async/seats/{id}/check_availability/?showtime_id={id} or ?movie_id={id}"""
+    if request.method != 'GET':
+        return _method_not_allowed(request)
+    seat = await Seat.objects.filter(pk=pk).afirst()
+    if seat is None:
+        return _not_found(Seat)
+    
+    showtime_id = request.GET.get('showtime_id')
+    movie_id = request.GET.get('movie_id')
+    if not movie_id and not showtime_id:
+        return _json({"error": "movie_id parameter is required"}, status=400)
+    
+    try:
+        if showtime_id:
+            showtime = await Showtime.objects.filter(pk=showtime_id).afirst()
+        else:
+            showtime = await Showtime.objects.aprimary_for(movie_id)
+    except ValueError:
+        showtime = None
+    if showtime is None:
+        return _not_found(Showtime)
+    
+    is_available = False
+    if seat.auditorium_id == showtime.auditorium_id:
+        index = await availability.aget_index(showtime.id)
+        is_available = (
+            not index.is_booked(seat.id)
+            and not await SeatHold.objects.active().filter(showtime=showtime, seat=seat).aexists()
+        )
+    return _json({
+        "seat_id": seat.id,
+        "seat_number": seat.seat_number,
+        "movie_id": showtime.movie_id,
+        "showtime_id": showtime.id,
+        "is_available": is_available
+    })
+
+
+async def my_bookings(request):
+    """GET /api/async/bookings/my_bookings/"""
+    if request.method != 'GET':
+        return _method_not_allowed(request)
+    user = await _require_user(request)
+    if user is None:
+        return _json({"detail": "Authentication credentials were not provided."}, status=403)
+    
+    bookings = Booking.objects.with_related().filter(user=user)
+    return await _paginated(request, bookings, BookingCursorPagination, BookingSerializer)
+
+
+async def upcoming_bookings(request):
+    """GET /api/async/bookings/upcoming/"""
+    if request.method != 'GET':
+        return _method_not_allowed(request)
+    user = await _require_user(request)
+    if user is None:
+        return _json({"detail": "Authentication credentials were not provided."}, status=403)
+    
+    bookings = Booking.objects.with_related().filter(
+        user=user,
+        movie__release_date__gte=timezone.now().date()
+    )
+    return await _paginated(request, bookings, BookingCursorPagination, BookingSerializer)
@@ -0,0 +1,139 @@
+"""
+Maintenance and lookup helpers for the per-showtime seat availability index.
+
+Each showtime's index row is created with the showtime and kept up to date
+by the Booking signal handlers in signals.py, so it always changes in the
+same transaction as the booking write that changed it. Reads never write.
+"""
+import threading
+from contextlib import contextmanager
+from asgiref.sync import sync_to_async
+from django.db import DEFAULT_DB_ALIAS, transaction
+from django.db.models import Subquery
+from .models import Showtime, Booking, SeatAvailabilityIndex, TheaterStats
+from .counters import STATS_PK
+
+
+def _index_from_bookings(showtime_id, using=None):
+    seat_ids = (
+        Booking.objects.using(using).filter(showtime_id=showtime_id)
+        .order_by()
+        .values_list('seat_id', flat=True)
+    )
+    index = SeatAvailabilityIndex(showtime_id=showtime_id)
+    index.set_seats(seat_ids, booked=True)
+    return index
+
+
+def build_index(showtime_id):
+    """Build (or rebuild) the index row for one showtime from Booking rows"""
+    index = _index_from_bookings(showtime_id)
+    index.save()
+    return index
+
+
+def _index_query(showtime_id):
+    # The catalog version rides along for seatcatalog, which saves it a query
+    catalog_version = TheaterStats.objects.filter(pk=STATS_PK).values('catalog_version')
+    return SeatAvailabilityIndex.objects.filter(showtime_id=showtime_id).annotate(
+        catalog_version=Subquery(catalog_version)
+    )
+
+
+def get_index(showtime_id):
+    """
+    Fetch the index row for a showtime. A fetched row carries the current
+    catalog_version as an attribute. Without a row (an unknown showtime, or
+    rows not built yet; see rebuild_seat_index) an unsaved index is built
+    from the Booking rows on 'default', which a replica may lag behind.
+    """
+    index = _index_query(showtime_id).first()
+    if index is None:
+        index = _index_from_bookings(showtime_id, using=DEFAULT_DB_ALIAS)
+    return index
+
+
+async def aget_index(showtime_id):
+    """Async variant of get_index; the rare fallback build runs in a thread"""
+    index = await _index_query(showtime_id).afirst()
+    if index is None:
+        index = await sync_to_async(_index_from_bookings)(showtime_id, using=DEFAULT_DB_ALIAS)
+    return index
+
+
+def booked_seat_ids(showtime_id):
+    """Return the set of seat ids booked for a showtime"""
+    return get_index(showtime_id).booked_seat_ids()
+
+
+async def abooked_seat_ids(showtime_id):
+    """Async variant of booked_seat_ids"""
+    return (await aget_index(showtime_id)).booked_seat_ids()
+
+
+def is_seat_booked(showtime_id, seat_id):
+    """Check a single seat against the index"""
+    return get_index(showtime_id).is_booked(seat_id)
+
+
+_state = threading.local()
+
+
+@contextmanager
+def suspend_updates():
+    """
+    Skip per-booking index and counter maintenance inside the block. Used
+    when the showtime rows are going away anyway, e.g. deleting a movie
+    cascades to its showtimes and bookings.
+    """
+    previous = getattr(_state, 'suspended', False)
+    _state.suspended = True
+    try:
+        yield
+    finally:
+        _state.suspended = previous
+
+
+def updates_suspended():
+    return getattr(_state, 'suspended', False)
+
+
+def _update(showtime_id, seat_ids, booked):
+    if not seat_ids or updates_suspended():
+        return
+    with transaction.atomic():
+        index = (
+            SeatAvailabilityIndex.objects
+            .select_for_update()
+            .filter(showtime_id=showtime_id)
+            .first()
+        )
+        # No row means the showtime predates the index; reads fall back to
+        # Booking rows until rebuild_seat_index creates it.
+        if index is None:
+            return
+        index.set_seats(seat_ids, booked=booked)
+        index.save(update_fields=['bitmap', 'base_seat_id', 'updated_at'])
+
+
+def mark_booked(showtime_id, seat_ids):
+    """Set the bits for newly booked seats"""
+    _update(showtime_id, seat_ids, booked=True)
+
+
+def mark_released(showtime_id, seat_ids):
+    """Clear the bits for cancelled bookings"""
+    _update(showtime_id, seat_ids, booked=False)
+
+
+def rebuild(showtime_ids=None):
+    """Regenerate index rows from Booking rows; returns the number rebuilt"""
+    if showtime_ids is None:
+        showtime_ids = Showtime.objects.values_list('id', flat=True)
+    
+    count = 0
+    for showtime_id in showtime_ids:
+        with transaction.atomic():
+            build_index(showtime_id)
+        count += 1
+    return count
@@ -0,0 +1,169 @@
+"""
+Helpers for the HTTP benchmark commands.
+
+serve() starts the project under the same server stack as production
+(gunicorn with uvicorn workers, see render.yaml) against the configured
+database, and run_load() drives it with concurrent requests and reports
+throughput and latency percentiles. run_users() instead runs one scripted
+flow per virtual user, for scenarios where each user's requests depend on
+each other, and summarize_steps() reports it per step.
+"""
+import os
+import socket
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from urllib.error import HTTPError
+from urllib.request import Request, urlopen
+from django.conf import settings
+from django.contrib.auth import BACKEND_SESSION_KEY, HASH_SESSION_KEY, SESSION_KEY
+from django.contrib.sessions.backends.db import SessionStore
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+@contextmanager
+def serve(workers=4, port=None, startup_timeout=30, env=None):
+    """Run the ASGI app under gunicorn + uvicorn workers; yields the base URL"""
+    port = port or free_port()
+    command = [
+        sys.executable, '-m', 'gunicorn', 'movie_theater_booking.asgi:application',
+        '-k', 'uvicorn.workers.UvicornWorker',
+        '--workers', str(workers),
+        '--bind', f'127.0.0.1:{port}',
+        '--log-level', 'warning',
+    ]
+    process_env = dict(os.environ, **(env or {}))
+    process = subprocess.Popen(command, cwd=settings.BASE_DIR, env=process_env)
+    base_url = f'http://127.0.0.1:{port}'
+    try:
+        deadline = time.monotonic() + startup_timeout
+        while True:
+            try:
+                urlopen(base_url + '/api/', timeout=1).close()
+                break
+            except OSError:  # Not listening yet (URLError, timeouts, resets)
+                if process.poll() is not None or time.monotonic() > deadline:
+                    raise RuntimeError("Benchmark server did not start")
+                time.sleep(0.2)
+        yield base_url
+    finally:
+        process.terminate()
+        process.wait(timeout=10)
+
+
+def session_cookie(user):
+    """Create a login session for user and return it as a Cookie header value"""
+    session = SessionStore()
+    session[SESSION_KEY] = str(user.pk)
+    session[BACKEND_SESSION_KEY] = settings.AUTHENTICATION_BACKENDS[0]
+    session[HASH_SESSION_KEY] = user.get_session_auth_hash()
+    session.create()
+    return f'{settings.SESSION_COOKIE_NAME}={session.session_key}'
+
+
+def http_request(url, method='GET', data=None, headers=None):
+    """Send one request; returns (status, body bytes)"""
+    request = Request(url, data=data, method=method, headers=headers or {})
+    try:
+        with urlopen(request, timeout=30) as response:
+            return response.status, response.read()
+    except HTTPError as error:
+        return error.code, error.read()
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return None
+    rank = max(0, min(len(sorted_values) - 1, round(pct / 100 * len(sorted_values)) - 1))
+    return sorted_values[rank]
+
+
+def summarize(latencies, elapsed, statuses):
+    """Build the JSON-friendly result for one load run"""
+    latencies = sorted(latencies)
+    errors = sum(1 for status in statuses if status >= 500 or status == 0)
+    return {
+        'requests': len(latencies),
+        'errors': errors,
+        'seconds': round(elapsed, 3),
+        'throughput_rps': round(len(latencies) / elapsed, 1) if elapsed else None,
+        'p50_ms': round(percentile(latencies, 50) * 1000, 2) if latencies else None,
+        'p95_ms': round(percentile(latencies, 95) * 1000, 2) if latencies else None,
+        'p99_ms': round(percentile(latencies, 99) * 1000, 2) if latencies else None,
+    }
+
+
+def run_load(send, total, concurrency):
+    """
+    Call send(i) total times from concurrency threads. send returns an HTTP
+    status. Returns (summary dict, list of statuses).
+    """
+    def timed(i):
+        start = time.perf_counter()
+        try:
+            status = send(i)
+        except OSError:  # Connection failures and timeouts count as errors
+            status = 0
+        return time.perf_counter() - start, status
+    
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(timed, range(total)))
+    elapsed = time.perf_counter() - start
+    
+    latencies = [latency for latency, _ in results]
+    statuses = [status for _, status in results]
+    return summarize(latencies, elapsed, statuses), statuses
+
+
+def timed_request(url, method='GET', data=None, headers=None):
+    """Send one request; returns (latency seconds, status). Connection failures are status 0"""
+    start = time.perf_counter()
+    try:
+        status = http_request(url, method, data, headers)[0]
+    except OSError:
+        status = 0
+    return time.perf_counter() - start, status
+
+
+def run_users(flow, users):
+    """
+    Run flow(user_index) once for each of users virtual users, all
+    concurrently. flow returns a list of (step, latency, status) records.
+    Returns (all records, elapsed seconds).
+    """
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=users) as pool:
+        results = list(pool.map(flow, range(users)))
+    elapsed = time.perf_counter() - start
+    return [record for records in results for record in records], elapsed
+
+
+def summarize_steps(records, elapsed):
+    """summarize() each step of run_users() records, keyed by step name"""
+    steps = {}
+    for step, latency, status in records:
+        latencies, statuses = steps.setdefault(step, ([], []))
+        latencies.append(latency)
+        statuses.append(status)
+    return {
+        step: summarize(latencies, elapsed, statuses)
+        for step, (latencies, statuses) in steps.items()
+    }
+
+
+def count_queries(func, *args, **kwargs):
+    """Call func in-process and return how many SQL queries it ran"""
+    with CaptureQueriesContext(connection) as queries:
+        func(*args, **kwargs)
+    return len(queries)
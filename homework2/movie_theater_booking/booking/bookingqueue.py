@@ -0,0 +1,81 @@
+"""
+Queued booking intake for on-sale spikes.
+
+With settings.BOOKING_QUEUE_ENABLED, POST /api/bookings/ does not book the
+seat. It stores a BookingRequest row and answers 202 with a ticket, so a
+burst of requests becomes a burst of appends instead of transactions
+fighting over the same showtime's index and counter rows.
+
+The process_booking_queue command drains the table in arrival order. Each
+batch is one transaction: every request goes through BookingCreateSerializer
+exactly as a direct POST would (the seat write in its own savepoint) and
+the outcomes are saved with the bookings, so a crashed batch is simply
+processed again. One worker applies the writes one after another, so there
+is no contention left between them.
+
+Clients poll GET /api/booking-requests/{ticket}/ for the outcome.
+"""
+from types import SimpleNamespace
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from rest_framework import serializers
+from .models import BookingRequest
+from .serializers import BookingCreateSerializer
+from . import metrics
+
+BATCH_SIZE = 100
+
+
+def queue_enabled():
+    return getattr(settings, 'BOOKING_QUEUE_ENABLED', False)
+
+
+def enqueue(user, movie=None, showtime=None, seat=None):
+    """Store a booking request for the worker; returns it"""
+    request = BookingRequest.objects.create(user=user, movie=movie, showtime=showtime, seat=seat)
+    metrics.BOOKING_QUEUE.inc(result='enqueued')
+    return request
+
+
+def _first_error(detail):
+    """The first message of a ValidationError's detail, however nested"""
+    while isinstance(detail, (dict, list)):
+        detail = next(iter(detail.values())) if isinstance(detail, dict) else detail[0]
+    return str(detail)
+
+
+def process(request):
+    """Book one queued request, recording the outcome on it (not saved)"""
+    data = {'movie': request.movie_id, 'showtime': request.showtime_id, 'seat': request.seat_id}
+    serializer = BookingCreateSerializer(
+        data={field: value for field, value in data.items() if value is not None},
+        context={'request': SimpleNamespace(user=request.user)}
+    )
+    try:
+        serializer.is_valid(raise_exception=True)
+        request.booking = serializer.save()
+    except serializers.ValidationError as error:
+        request.status = BookingRequest.REJECTED
+        request.error = _first_error(error.detail)
+    else:
+        request.status = BookingRequest.BOOKED
+    request.processed_at = timezone.now()
+    metrics.BOOKING_QUEUE.inc_on_commit(result=request.status)
+
+
+def drain(batch_size=BATCH_SIZE):
+    """
+    Process up to batch_size pending requests, oldest first, in one
+    transaction; returns the processed requests.
+    """
+    with transaction.atomic():
+        requests = list(
+            BookingRequest.objects.pending()
+            .select_for_update(skip_locked=True, of=('self',))
+            .select_related('user')[:batch_size]
+        )
+        for request in requests:
+            process(request)
+        BookingRequest.objects.bulk_update(requests, ['status', 'error', 'booking', 'processed_at'])
+    return requests
@@ -0,0 +1,132 @@
+"""
+Denormalized counters and change versions.
+
+Movie.booked_count, Auditorium.seat_count and TheaterStats.seat_count are
+updated with F() expressions in the same transaction as the booking or
+seat write, so concurrent requests never lose an increment.
+Movie.seat_version and TheaterStats.catalog_version are bumped the same
+way and feed the ETags in booking/etags.py.
+"""
+import time
+from asgiref.sync import sync_to_async
+from django.db import transaction
+from django.db.models import Count, F, OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce
+from .models import Movie, Auditorium, Showtime, Seat, Booking, TheaterStats
+
+STATS_PK = 1
+
+
+def adjust_booked_count(movie_id, delta):
+    """Add delta to a movie's booked_count and bump its seat version"""
+    if delta:
+        Movie.objects.filter(pk=movie_id).update(
+            booked_count=F('booked_count') + delta,
+            seat_version=F('seat_version') + 1
+        )
+
+
+def bump_seat_version(movie_id):
+    """Record a seat map change that does not change the booking count (holds)"""
+    Movie.objects.filter(pk=movie_id).update(seat_version=F('seat_version') + 1)
+
+
+def bump_catalog(seat_delta=0, auditorium_id=None):
+    """
+    Bump the catalog version after a catalog edit, adjusting the theater
+    and auditorium seat counts by seat_delta.
+    """
+    if seat_delta and auditorium_id is not None:
+        Auditorium.objects.filter(pk=auditorium_id).update(seat_count=F('seat_count') + seat_delta)
+    updated = TheaterStats.objects.filter(pk=STATS_PK).update(
+        seat_count=F('seat_count') + seat_delta,
+        catalog_version=F('catalog_version') + 1
+    )
+    if not updated:
+        # First edit ever, or the stats row was removed: count from scratch
+        repair_seat_count()
+
+
+def adjust_seat_count(delta, auditorium_id=None):
+    """Add delta to the theater-wide (and the auditorium's) seat count"""
+    if delta:
+        bump_catalog(seat_delta=delta, auditorium_id=auditorium_id)
+
+
+def capacity_subquery(movie_ref='pk'):
+    """
+    Subquery for the total seats across a movie's showtimes, from the
+    cached auditorium seat counts. movie_ref names the outer movie id.
+    """
+    capacity = (
+        Showtime.objects.filter(movie=OuterRef(movie_ref))
+        .order_by()
+        .values('movie')
+        .annotate(total=Sum('auditorium__seat_count'))
+        .values('total')
+    )
+    return Coalesce(Subquery(capacity), 0)
+
+
+def get_capacity(movie_id):
+    """Total seats across a movie's showtimes"""
+    return Movie.objects.filter(pk=movie_id).annotate(
+        capacity=capacity_subquery()
+    ).values_list('capacity', flat=True).first() or 0
+
+
+def get_seat_count():
+    """Return the cached total number of seats"""
+    stats = TheaterStats.objects.filter(pk=STATS_PK).first()
+    if stats is None:
+        return repair_seat_count()
+    return stats.seat_count
+
+
+async def aget_seat_count():
+    """Async variant of get_seat_count"""
+    stats = await TheaterStats.objects.filter(pk=STATS_PK).afirst()
+    if stats is None:
+        return await sync_to_async(repair_seat_count)()
+    return stats.seat_count
+
+
+def repair_seat_count():
+    """Recount seats into the stats row and every auditorium; returns the theater total"""
+    actual = (
+        Seat.objects.filter(auditorium=OuterRef('pk'))
+        .order_by()
+        .values('auditorium')
+        .annotate(total=Count('id'))
+        .values('total')
+    )
+    with transaction.atomic():
+        Auditorium.objects.update(seat_count=Coalesce(Subquery(actual), 0))
+        seat_count = Seat.objects.count()
+        TheaterStats.objects.update_or_create(
+            pk=STATS_PK,
+            defaults={'seat_count': seat_count},
+            # A recreated row must not reuse version numbers already handed out as ETags
+            create_defaults={'seat_count': seat_count, 'catalog_version': time.time_ns()}
+        )
+    return seat_count
+
+
+def repair_booked_counts():
+    """Recount every movie's bookings; returns the number of movies fixed"""
+    actual = (
+        Booking.objects.filter(movie=OuterRef('pk'))
+        .order_by()
+        .values('movie')
+        .annotate(total=Count('id'))
+        .values('total')
+    )
+    with transaction.atomic():
+        stale = Movie.objects.annotate(
+            actual=Coalesce(Subquery(actual), 0)
+        ).exclude(booked_count=F('actual'))
+        stale_ids = list(stale.values_list('id', flat=True))
+        Movie.objects.filter(pk__in=stale_ids).update(
+            booked_count=Coalesce(Subquery(actual), 0)
+        )
+    return len(stale_ids)
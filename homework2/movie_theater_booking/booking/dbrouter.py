@@ -0,0 +1,124 @@
+"""
+Read replica routing for the read-heavy pages and endpoints.
+
+Views opt in: MovieViewSet and SeatViewSet set read_replica = True and the
+template views use the @read_replica decorator. For a GET or HEAD to one
+of them, ReplicaMiddleware picks one of settings.DATABASE_REPLICAS and
+ReplicaRouter sends that request's reads there. Everything else (writes,
+other views, reads inside a transaction, management commands) stays on
+'default'.
+
+A client that has just written something (any successful POST, PUT, PATCH
+or DELETE, such as a booking) is pinned to 'default' for
+settings.READ_REPLICA_STICKY_SECONDS, so replication lag cannot hide their
+own booking from them. The pin is a cookie that expires by itself rather
+than a session flag, so writes do not pay for a session save and clients
+without a session are covered too.
+
+Locally, SQLITE_REPLICA=1 adds a second SQLite file as 'replica1'; the
+sync_sqlite_replicas command copies the main database into it.
+"""
+import random
+from contextvars import ContextVar
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+STICKY_COOKIE = 'db_primary'
+SAFE_METHODS = ('GET', 'HEAD')
+
+_read_alias = ContextVar('booking_read_alias', default=None)
+
+
+def replicas():
+    return getattr(settings, 'DATABASE_REPLICAS', [])
+
+
+def read_replica(view):
+    """Mark a function view as safe to serve from a read replica"""
+    view.read_replica = True
+    return view
+
+
+def pin_to_primary(response):
+    """Have the client read from 'default' for the next READ_REPLICA_STICKY_SECONDS"""
+    response.set_cookie(
+        STICKY_COOKIE,
+        '1',
+        max_age=getattr(settings, 'READ_REPLICA_STICKY_SECONDS', 10),
+        httponly=True,
+        samesite='Lax'
+    )
+
+
+def is_pinned(request):
+    return STICKY_COOKIE in request.COOKIES
+
+
+def current_read_alias():
+    """The replica this request reads from, or None for 'default'"""
+    return _read_alias.get()
+
+
+class ReplicaRouter:
+    """Route reads to the alias chosen by ReplicaMiddleware; all writes go to 'default'"""
+    
+    def db_for_read(self, model, **hints):
+        alias = _read_alias.get()
+        if alias is None or connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            # Reads in a transaction must see its writes
+            return None
+        return alias
+    
+    def db_for_write(self, model, **hints):
+        # Also for instances that were read from a replica
+        return DEFAULT_DB_ALIAS
+    
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same data as 'default'
+        return True
+    
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == DEFAULT_DB_ALIAS
+
+
+class ReplicaMiddleware:
+    """Choose the read database for each request (see the module docstring)"""
+    sync_capable = True
+    async_capable = True
+    
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self._async = iscoroutinefunction(get_response)
+        if self._async:
+            markcoroutinefunction(self)
+    
+    def __call__(self, request):
+        if self._async:
+            return self.__acall__(request)
+        token = _read_alias.set(None)
+        try:
+            response = self.get_response(request)
+        finally:
+            _read_alias.reset(token)
+        return self.finish(request, response)
+    
+    async def __acall__(self, request):
+        token = _read_alias.set(None)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _read_alias.reset(token)
+        return self.finish(request, response)
+    
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        # Viewsets carry the flag on their class, function views on themselves
+        view_class = getattr(view_func, 'cls', None)
+        eligible = getattr(view_class or view_func, 'read_replica', False)
+        if eligible and request.method in SAFE_METHODS and replicas() and not is_pinned(request):
+            _read_alias.set(random.choice(replicas()))
+    
+    def finish(self, request, response):
+        if request.method not in SAFE_METHODS and response.status_code < 400 and replicas():
+            pin_to_primary(response)
+        return response
@@ -0,0 +1,209 @@
+"""
+Strong ETags for the read endpoints.
+
+Every ETag is built from version counters rather than from the rendered
+body, so a matching If-None-Match can be answered with 304 after one
+small query and without running a serializer or template:
+
+- TheaterStats.catalog_version changes on any Movie or Seat edit
+- Movie.seat_version changes on any booking or hold change for any of the
+  movie's showtimes
+- the next active hold expiry makes a seat map go stale when a hold lapses
+"""
+import hashlib
+from django.contrib.messages import get_messages
+from django.db.models import F, OuterRef, Subquery
+from django.utils.cache import get_conditional_response, quote_etag
+from rest_framework.exceptions import APIException
+from .models import Movie, Showtime, SeatHold, TheaterStats
+from . import counters
+
+CATALOG = 'catalog'
+MOVIE = 'movie'
+SEAT_MAP = 'seatmap'
+
+
+def _catalog_version():
+    return TheaterStats.objects.filter(pk=counters.STATS_PK).values('catalog_version')
+
+
+def catalog_tag():
+    """Version tag for catalog-only responses, or None if there is no stats row yet"""
+    version = _catalog_version().values_list('catalog_version', flat=True).first()
+    if version is None:
+        return None
+    return f'{CATALOG}-{version}'
+
+
+def _versions_tag(queryset, seat_version, hold_filter, prefix, seat_map):
+    """
+    Tag from one row of queryset annotated with the catalog version, the
+    given seat_version expression and, for seat maps, the next hold expiry.
+    """
+    queryset = queryset.order_by().annotate(
+        tag_catalog_version=Subquery(_catalog_version()),
+        tag_seat_version=seat_version
+    )
+    fields = ['tag_seat_version', 'tag_catalog_version']
+    if seat_map:
+        next_expiry = (
+            SeatHold.objects.active()
+            .filter(**{hold_filter: OuterRef('pk')})
+            .order_by('expires_at')
+            .values('expires_at')[:1]
+        )
+        queryset = queryset.annotate(tag_next_expiry=Subquery(next_expiry))
+        fields.append('tag_next_expiry')
+    
+    row = queryset.values_list(*fields)[:1]
+    row = row[0] if row else None
+    if row is None:
+        return None
+    
+    tag = f'{SEAT_MAP if seat_map else MOVIE}-{prefix}-{row[1]}-{row[0]}'
+    if seat_map and row[2] is not None:
+        tag += f'-{int(row[2].timestamp() * 1000000)}'
+    return tag
+
+
+def _as_id(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def movie_tag(movie_id, seat_map=False):
+    """
+    Version tag for one movie, or None if the movie does not exist.
+    
+    With seat_map=True the tag also covers hold expiry, for responses that
+    list which seats are currently available.
+    """
+    movie_id = _as_id(movie_id)
+    if movie_id is None:
+        return None
+    return _versions_tag(
+        Movie.objects.filter(pk=movie_id), F('seat_version'), 'movie_id', movie_id, seat_map
+    )
+
+
+def showtime_tag(showtime_id, seat_map=False):
+    """Version tag for one showtime (versioned with its movie), or None if it does not exist"""
+    showtime_id = _as_id(showtime_id)
+    if showtime_id is None:
+        return None
+    return _versions_tag(
+        Showtime.objects.filter(pk=showtime_id),
+        F('movie__seat_version'),
+        'showtime_id',
+        f's{showtime_id}',
+        seat_map
+    )
+
+
+def make_etag(*parts):
+    """Quote a tag (plus any variant parts) as a strong ETag"""
+    return quote_etag('-'.join(str(part) for part in parts if part is not None))
+
+
+class NotModified(APIException):
+    """Carries a ready-made 304 (or 412) response out of APIView.initial"""
+    status_code = 304
+
+    def __init__(self, response):
+        super().__init__()
+        self.response = response
+
+
+class ConditionalGetMixin:
+    """
+    Answer If-None-Match for the actions listed in etag_scopes.
+
+    etag_scopes maps an action name to CATALOG, MOVIE or SEAT_MAP. MOVIE and
+    SEAT_MAP take the showtime from get_etag_showtime_id if it gives one,
+    else the movie from get_etag_movie_id: the URL pk for movie actions, or
+    the showtime_id and movie_id query parameters for seat actions.
+    The check runs after authentication and content negotiation, so the
+    ETag can include the response format, and before the handler runs.
+    """
+    etag_scopes = {}
+
+    def get_etag_showtime_id(self):
+        """Showtime the MOVIE/SEAT_MAP scopes refer to, ahead of the movie"""
+        return self.request.query_params.get('showtime_id')
+
+    def get_etag_movie_id(self):
+        """Movie the MOVIE/SEAT_MAP scopes refer to"""
+        return self.request.query_params.get('movie_id')
+
+    def get_etag_variant(self):
+        """Extra ETag part for actions with several representations per version"""
+        return None
+
+    def get_etag(self, request):
+        """Current ETag for this request, or None to skip conditional handling"""
+        if request.method not in ('GET', 'HEAD'):
+            return None
+        scope = self.etag_scopes.get(self.action)
+        # The browsable API embeds the user and a CSRF token; never cache it
+        renderer_format = getattr(request.accepted_renderer, 'format', None)
+        if scope is None or renderer_format == 'api':
+            return None
+
+        showtime_id = self.get_etag_showtime_id()
+        movie_id = self.get_etag_movie_id()
+        if scope == CATALOG:
+            tag = catalog_tag()
+        elif showtime_id:
+            tag = showtime_tag(showtime_id, seat_map=scope == SEAT_MAP)
+        elif movie_id is not None:
+            tag = movie_tag(movie_id, seat_map=scope == SEAT_MAP)
+        else:
+            # Seat actions without a movie only show catalog data
+            tag = catalog_tag()
+        if tag is None:
+            return None
+        return make_etag(tag, renderer_format, self.get_etag_variant())
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        self.response_etag = self.get_etag(request)
+        if self.response_etag is not None:
+            response = get_conditional_response(request, etag=self.response_etag)
+            if response is not None:
+                raise NotModified(response)
+
+    def handle_exception(self, exc):
+        if isinstance(exc, NotModified):
+            return exc.response
+        return super().handle_exception(exc)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        etag = getattr(self, 'response_etag', None)
+        if etag is not None and response.status_code == 200:
+            response['ETag'] = etag
+        return response
+
+
+def template_etag(tag_func):
+    """
+    Build an etag_func for django.views.decorators.http.condition.
+
+    tag_func(request, *args, **kwargs) returns a version tag. Only GET and
+    HEAD are tagged, pages with pending flash messages are never cached,
+    and the CSRF secret is mixed in so a cached form never carries a token
+    from an older session. The plain tag is left on request.version_tag for
+    the view, e.g. to key responsecache entries.
+    """
+    def etag_func(request, *args, **kwargs):
+        if request.method not in ('GET', 'HEAD') or len(get_messages(request)):
+            return None
+        tag = tag_func(request, *args, **kwargs)
+        request.version_tag = tag
+        if tag is None:
+            return None
+        csrf_secret = request.META.get('CSRF_COOKIE', '')
+        return f'{tag}-html-{hashlib.sha256(csrf_secret.encode()).hexdigest()[:12]}'
+    return etag_func
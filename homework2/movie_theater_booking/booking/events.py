@@ -0,0 +1,97 @@
+"""
+In-process fan-out of seat booked/released events.
+
+Each worker process keeps its own broker, so a subscriber only sees events
+published by the worker it is connected to. That needs no external
+services; run a single worker (or put a shared broker behind publish())
+if every client must see every change.
+"""
+import asyncio
+import threading
+from collections import defaultdict
+from django.db import transaction
+
+BOOKED = 'booked'
+RELEASED = 'released'
+HELD = 'held'
+
+
+class Subscription:
+    """One client's queue of events for a showtime"""
+    
+    def __init__(self, broker, showtime_id, maxsize):
+        self.broker = broker
+        self.showtime_id = showtime_id
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue(maxsize=maxsize)
+        # Set when events were dropped; the client should refetch the seat map
+        self.overflowed = False
+    
+    def _put(self, event):
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            self.overflowed = True
+    
+    def deliver(self, event):
+        """Queue an event from any thread"""
+        self.loop.call_soon_threadsafe(self._put, event)
+    
+    async def get(self, timeout=None):
+        """Wait for the next event; returns None on timeout"""
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+    
+    def close(self):
+        self.broker.unsubscribe(self)
+
+
+class SeatEventBroker:
+    """Thread-safe registry of per-showtime subscriptions"""
+    
+    def __init__(self, queue_size=1000):
+        self.queue_size = queue_size
+        self._lock = threading.Lock()
+        self._subscriptions = defaultdict(set)
+    
+    def subscribe(self, showtime_id):
+        """Subscribe to a showtime's events; must be called from a running event loop"""
+        subscription = Subscription(self, int(showtime_id), self.queue_size)
+        with self._lock:
+            self._subscriptions[subscription.showtime_id].add(subscription)
+        return subscription
+    
+    def unsubscribe(self, subscription):
+        with self._lock:
+            subscriptions = self._subscriptions.get(subscription.showtime_id)
+            if subscriptions is not None:
+                subscriptions.discard(subscription)
+                if not subscriptions:
+                    del self._subscriptions[subscription.showtime_id]
+    
+    def subscriber_count(self, showtime_id):
+        with self._lock:
+            return len(self._subscriptions.get(int(showtime_id), ()))
+    
+    def publish(self, showtime_id, seat_ids, status, **fields):
+        """Send one event per seat, with any extra fields, to every subscriber of the showtime"""
+        with self._lock:
+            subscriptions = list(self._subscriptions.get(int(showtime_id), ()))
+        if not subscriptions:
+            return
+        for seat_id in seat_ids:
+            event = {'showtime_id': int(showtime_id), 'seat_id': seat_id, 'status': status, **fields}
+            for subscription in subscriptions:
+                subscription.deliver(event)
+
+
+broker = SeatEventBroker()
+
+
+def publish_on_commit(showtime_id, seat_ids, status, **fields):
+    """Publish seat changes once the surrounding transaction commits"""
+    seat_ids = list(seat_ids)
+    if seat_ids:
+        transaction.on_commit(lambda: broker.publish(showtime_id, seat_ids, status, **fields))
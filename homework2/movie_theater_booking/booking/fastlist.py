@@ -0,0 +1,111 @@
+"""
+Serializer-free list responses built from .values() rows.
+
+A ModelSerializer with many=True builds a serializer field tree and walks
+every field's get_attribute() for each model instance, which dominates the
+CPU time of long lists. ValuesRepresentation reads the serializer's fields
+once, turns their sources into .values() lookups (related sources such as
+movie.title become movie__title joins), and converts each row with the
+same to_representation() calls, so the rendered JSON is byte-identical.
+Values that come out of the database already in their JSON form (ints,
+strings, booleans and primary keys) are passed through as they are.
+
+Viewsets opt in with FastListMixin; settings.FAST_LIST_RESPONSES turns
+the fast path off everywhere, e.g. to compare against the serializers.
+"""
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from rest_framework import serializers
+from rest_framework.response import Response
+
+# Fields whose to_representation() leaves a database value unchanged
+PASSTHROUGH_FIELDS = (
+    serializers.IntegerField,
+    serializers.CharField,
+    serializers.BooleanField,
+    serializers.PrimaryKeyRelatedField,
+)
+
+
+def fast_list_enabled():
+    return getattr(settings, 'FAST_LIST_RESPONSES', True)
+
+
+class ValuesRepresentation:
+    """
+    Mirror of serializer_class's output for .values() rows.
+    
+    Only plain model fields, related primary keys and dotted sources are
+    supported; anything else (method fields, nested serializers) raises
+    ImproperlyConfigured when the representation is built.
+    """
+    
+    def __init__(self, serializer_class):
+        self.columns = []
+        for field in serializer_class().fields.values():
+            if field.write_only:
+                continue
+            if isinstance(field, (serializers.SerializerMethodField, serializers.BaseSerializer)):
+                raise ImproperlyConfigured(
+                    f"{serializer_class.__name__}.{field.field_name} cannot be read from .values()"
+                )
+            lookup = '__'.join(field.source_attrs)
+            convert = None if isinstance(field, PASSTHROUGH_FIELDS) else field.to_representation
+            self.columns.append((field.field_name, lookup, convert))
+    
+    @property
+    def lookups(self):
+        return [lookup for _, lookup, _ in self.columns]
+    
+    def values(self, queryset, *extra):
+        """queryset as .values() rows carrying every lookup, plus extra (e.g. ordering) fields"""
+        lookups = self.lookups
+        return queryset.values(*lookups, *(name for name in extra if name not in lookups))
+    
+    def to_representation(self, rows):
+        """Serializer-identical dicts for the rows"""
+        columns = self.columns
+        data = []
+        for row in rows:
+            item = {}
+            for name, lookup, convert in columns:
+                value = row[lookup]
+                if convert is not None and value is not None:
+                    value = convert(value)
+                item[name] = value
+            data.append(item)
+        return data
+
+
+class FastListMixin:
+    """
+    Answer the list action from .values() rows instead of the serializer.
+    
+    The rows follow get_queryset(), filtering and pagination exactly as
+    ListModelMixin.list does; only the serialization step differs. The
+    serializer is the one get_serializer_class() returns for the list.
+    """
+    _values_representations = {}
+    
+    def get_values_representation(self):
+        serializer_class = self.get_serializer_class()
+        representation = self._values_representations.get(serializer_class)
+        if representation is None:
+            representation = ValuesRepresentation(serializer_class)
+            self._values_representations[serializer_class] = representation
+        return representation
+    
+    def list(self, request, *args, **kwargs):
+        if not fast_list_enabled():
+            return super().list(request, *args, **kwargs)
+        
+        representation = self.get_values_representation()
+        queryset = self.filter_queryset(self.get_queryset())
+        # Cursor pagination reads its position from the ordering field
+        ordering = getattr(self.paginator, 'ordering', None) or ()
+        rows = representation.values(queryset, *(name.lstrip('-') for name in ordering))
+        
+        page = self.paginate_queryset(rows)
+        if page is not None:
+            return self.get_paginated_response(representation.to_representation(page))
+        return Response(representation.to_representation(rows))
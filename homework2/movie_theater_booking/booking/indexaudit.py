@@ -0,0 +1,105 @@
+"""
+EXPLAIN-based index audit for the queries behind the hot endpoints.
+
+audited_queries() builds each endpoint's main query the way its view does,
+with placeholder ids, and audit() runs EXPLAIN on it and reports any
+sequential scan:
+
+- SQLite: a "SCAN <table>" plan step that uses no index
+- PostgreSQL: a "Seq Scan on <table>" node. EXPLAIN runs with
+  enable_seqscan off, so a remaining Seq Scan means no index can serve
+  the query, not merely that the table is too small to bother.
+
+Unfiltered catalog listings read every row anyway; their expected scans
+are listed per query and not flagged. Run it with `manage.py audit_indexes`.
+"""
+import re
+from django.db import connection, transaction
+from django.utils import timezone
+from .models import Movie, Showtime, Seat, Booking, SeatHold
+from . import seatcatalog
+
+SQLITE_SCAN = re.compile(r'^SCAN (\S+)$')
+POSTGRES_SCAN = re.compile(r'Seq Scan on (\S+)')
+
+
+def audited_queries():
+    """
+    (label, queryset, allowed_scans) for each audited endpoint query.
+    allowed_scans names the tables a full read is expected on.
+    """
+    today = timezone.now().date()
+    # Unsaved placeholders: the plans only depend on which columns are filtered
+    showtime = Showtime(id=1, movie_id=1, auditorium_id=1)
+    bookings = Booking.objects.with_related()
+    
+    return [
+        ('movies.list', Movie.objects.all()[:51], set()),
+        ('movies.retrieve', Movie.objects.filter(pk=1), set()),
+        ('showtimes.list?movie_id', Showtime.objects.filter(movie_id=1)[:51], set()),
+        ('showtimes.primary_for', Showtime.objects.filter(movie_id=1).order_by('id')[:1], set()),
+        ('seats.list', Seat.objects.all(), {'booking_seat'}),
+        ('seats.available', Seat.objects.filter(is_booked=False), set()),
+        # Seat maps: the per-worker catalog load and the active holds to leave out
+        ('seatcatalog.load', seatcatalog._all_seats(), {'booking_seat'}),
+        ('seatcatalog.held', seatcatalog._held_seat_ids(showtime), set()),
+        ('seats.check_availability', SeatHold.objects.active().filter(showtime_id=1, seat_id=1), set()),
+        ('bookings.list', bookings[:51], set()),
+        ('bookings.my_bookings', bookings.filter(user_id=1)[:51], set()),
+        ('bookings.upcoming', bookings.filter(user_id=1, movie__release_date__gte=today)[:51], set()),
+        (
+            'all_bookings.upcoming_count',
+            Booking.objects.filter(movie__release_date__gte=today).order_by().values('pk'),
+            set()
+        ),
+        ('holds.for_user', SeatHold.objects.active().filter(showtime_id=1, user_id=1), set()),
+        ('holds.expired', SeatHold.objects.filter(showtime_id=1).expired(), set()),
+    ]
+
+
+def explain(queryset):
+    """The query plan as a list of lines"""
+    if connection.vendor == 'postgresql':
+        with transaction.atomic():
+            with connection.cursor() as cursor:
+                cursor.execute('SET LOCAL enable_seqscan = off')
+            plan = queryset.explain()
+    elif connection.vendor == 'sqlite':
+        plan = queryset.explain()
+    else:
+        raise ValueError(f"Index audit does not support the {connection.vendor} backend")
+    return plan.splitlines()
+
+
+def sequential_scans(plan, vendor=None):
+    """Tables (or aliases) the plan reads with a sequential scan"""
+    vendor = vendor or connection.vendor
+    tables = []
+    for line in plan:
+        if vendor == 'sqlite':
+            # Lines are "<id> <parent> <unused> <detail>"
+            detail = line.split(' ', 3)[-1]
+            match = SQLITE_SCAN.match(detail)
+        else:
+            match = POSTGRES_SCAN.search(line)
+        if match:
+            tables.append(match.group(1))
+    return tables
+
+
+def audit():
+    """
+    EXPLAIN every audited query. Returns one dict per query with its
+    plan, its sequential scans and the ones not expected (flagged).
+    """
+    results = []
+    for label, queryset, allowed_scans in audited_queries():
+        plan = explain(queryset)
+        scans = sequential_scans(plan)
+        results.append({
+            'label': label,
+            'plan': plan,
+            'scans': scans,
+            'flagged': [table for table in scans if table not in allowed_scans],
+        })
+    return results
@@ -0,0 +1,134 @@
+"""
+Seat layouts: row labels and bulk generation of whole rooms.
+
+Seat numbers are a row label and a column, e.g. "B12". Rows are labelled
+A-Z, then AA, AB, ... like spreadsheet columns; Seat.row stores the label
+as a number (A=1, AA=27) and Seat.column the seat within the row, so
+seats sort A1, A2, A10 rather than A1, A10, A2.
+
+generate_layout() builds rows x seats_per_row seats with bulk_create in
+batches. bulk_create skips the Seat signals, so it updates the seat
+counts and the catalog version once for the whole layout instead.
+delete_auditorium() does the same in reverse: the per-seat and per-booking
+signal work is suspended and the counters are adjusted once.
+"""
+import re
+from django.db import transaction
+from django.db.models import Count, Q
+from .models import Seat, Booking
+from . import availability
+from . import counters
+from . import seatcatalog
+
+SEAT_NUMBER = re.compile(r'([A-Za-z]+)(\d+)$')
+MAX_LAYOUT_SEATS = 10000
+BATCH_SIZE = 500
+
+
+class LayoutError(ValueError):
+    """A layout that cannot be generated, e.g. one clashing with existing seats"""
+
+
+def row_label(row):
+    """1 -> "A", 26 -> "Z", 27 -> "AA" """
+    label = ''
+    while row > 0:
+        row, remainder = divmod(row - 1, 26)
+        label = chr(ord('A') + remainder) + label
+    return label
+
+
+def row_index(label):
+    """Inverse of row_label: "A" -> 1, "AA" -> 27"""
+    row = 0
+    for char in label.upper():
+        row = row * 26 + ord(char) - ord('A') + 1
+    return row
+
+
+def parse_seat_number(seat_number):
+    """(row, column) of a seat number ending in letters and digits, else (None, None)"""
+    match = SEAT_NUMBER.search(seat_number or '')
+    if match is None:
+        return None, None
+    return row_index(match.group(1)), int(match.group(2))
+
+
+def layout_seats(auditorium, rows, seats_per_row, section='', first_row=1):
+    """Unsaved seats for the layout, row by row"""
+    seats = []
+    for row in range(first_row, first_row + rows):
+        label = row_label(row)
+        for column in range(1, seats_per_row + 1):
+            seats.append(Seat(
+                auditorium=auditorium,
+                seat_number=f'{label}{column}',
+                section=section,
+                row=row,
+                column=column,
+            ))
+    return seats
+
+
+def generate_layout(auditorium, rows, seats_per_row, section='', first_row=1,
+                    batch_size=BATCH_SIZE):
+    """
+    Create rows x seats_per_row seats in the auditorium, numbered
+    {row label}{column} from row first_row on; give further sections of a
+    room their own first_row. Returns the number of seats created; raises
+    LayoutError if a seat number is already taken.
+    """
+    if rows < 1 or seats_per_row < 1 or first_row < 1:
+        raise LayoutError("rows, seats_per_row and first_row must be positive.")
+    if rows * seats_per_row > MAX_LAYOUT_SEATS:
+        raise LayoutError(f"A layout can have at most {MAX_LAYOUT_SEATS} seats.")
+    
+    seats = layout_seats(auditorium, rows, seats_per_row, section, first_row)
+    max_length = Seat._meta.get_field('seat_number').max_length
+    if len(seats[-1].seat_number) > max_length:
+        raise LayoutError(f"Seat numbers would be longer than {max_length} characters.")
+    
+    with transaction.atomic():
+        # Compared in Python: a layout has more numbers than SQLite allows parameters
+        existing = set(Seat.objects.filter(auditorium=auditorium).values_list('seat_number', flat=True))
+        taken = [seat.seat_number for seat in seats if seat.seat_number in existing]
+        if taken:
+            raise LayoutError(f"Seats already exist in {auditorium.name}: {', '.join(taken[:5])}")
+        
+        Seat.objects.bulk_create(seats, batch_size=batch_size)
+        counters.bump_catalog(seat_delta=len(seats), auditorium_id=auditorium.id)
+    seatcatalog.invalidate()
+    return len(seats)
+
+
+def delete_auditorium(auditorium):
+    """
+    Delete an auditorium with its seats and showtimes (and their bookings
+    and holds), updating booked counts, seat counts and the catalog version
+    once instead of per seat and per booking. Returns the number of seats
+    deleted.
+    """
+    with transaction.atomic():
+        with availability.suspend_updates():
+            bookings = (
+                Booking.objects
+                .filter(Q(seat__auditorium=auditorium) | Q(showtime__auditorium=auditorium))
+                .order_by()
+                .values_list('movie', 'showtime', 'showtime__auditorium')
+                .annotate(count=Count('id'))
+            )
+            booked = {}
+            # Showtimes in other rooms that lose bookings on this room's seats keep their index
+            kept_showtime_ids = set()
+            for movie_id, showtime_id, auditorium_id, count in bookings:
+                booked[movie_id] = booked.get(movie_id, 0) + count
+                if auditorium_id != auditorium.id:
+                    kept_showtime_ids.add(showtime_id)
+            seat_count = auditorium.seats.count()
+            auditorium.delete()
+            for movie_id, count in booked.items():
+                counters.adjust_booked_count(movie_id, -count)
+            counters.bump_catalog(seat_delta=-seat_count)
+        availability.rebuild(kept_showtime_ids)
+    seatcatalog.invalidate()
+    return seat_count
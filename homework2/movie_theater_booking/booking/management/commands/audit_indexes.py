@@ -0,0 +1,41 @@
+from django.core.management.base import BaseCommand, CommandError
+from booking import indexaudit
+
+
+class Command(BaseCommand):
+    help = (
+        "EXPLAIN the queries behind the hot endpoints (SQLite or PostgreSQL) "
+        "and flag sequential scans"
+    )
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--plans', action='store_true', help='Print every query plan')
+        parser.add_argument(
+            '--strict', action='store_true', help='Exit with an error if any scan is flagged'
+        )
+    
+    def handle(self, *args, **options):
+        try:
+            results = indexaudit.audit()
+        except ValueError as error:
+            raise CommandError(str(error))
+        
+        flagged = 0
+        for result in results:
+            if result['flagged']:
+                flagged += 1
+                self.stdout.write(self.style.WARNING(
+                    f"SEQ SCAN  {result['label']}: {', '.join(result['flagged'])}"
+                ))
+            elif result['scans']:
+                self.stdout.write(f"ok        {result['label']} (expected scan of {', '.join(result['scans'])})")
+            else:
+                self.stdout.write(f"ok        {result['label']}")
+            if options['plans']:
+                for line in result['plan']:
+                    self.stdout.write(f"          {line}")
+        
+        summary = f"{len(results)} queries audited, {flagged} with unexpected sequential scans."
+        if flagged and options['strict']:
+            raise CommandError(summary)
+        self.stdout.write(self.style.SUCCESS(summary) if not flagged else summary)
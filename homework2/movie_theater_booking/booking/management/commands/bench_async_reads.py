@@ -0,0 +1,79 @@
+import json
+import os
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from booking.benchmarking import serve, session_cookie, http_request, run_load
+from booking.models import Movie, Seat
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark the sync viewset GETs against the native async read endpoints "
+        "under gunicorn + uvicorn workers, reporting throughput and latency"
+    )
+    
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workers', type=int, default=int(os.environ.get('WEB_CONCURRENCY', 4)),
+            help='Server worker processes (default: WEB_CONCURRENCY or 4)'
+        )
+        parser.add_argument('--requests', type=int, default=1000, help='Requests per endpoint')
+        parser.add_argument('--concurrency', type=int, default=32, help='Concurrent client threads')
+        parser.add_argument('--json', action='store_true', help='Print machine-readable JSON only')
+    
+    def handle(self, *args, **options):
+        movie = Movie.objects.first()
+        seat = Seat.objects.first()
+        if movie is None or seat is None:
+            raise CommandError("Need at least one movie and one seat; seed the database first.")
+        
+        user, _ = User.objects.get_or_create(username='bench_user')
+        headers = {'Cookie': session_cookie(user), 'Accept': 'application/json'}
+        
+        endpoints = {
+            'movie_list': ('/api/movies/', '/api/async/movies/'),
+            'movie_detail': (f'/api/movies/{movie.id}/', f'/api/async/movies/{movie.id}/'),
+            'available_seats': (
+                f'/api/movies/{movie.id}/available_seats/',
+                f'/api/async/movies/{movie.id}/available_seats/'
+            ),
+            'check_availability': (
+                f'/api/seats/{seat.id}/check_availability/?movie_id={movie.id}',
+                f'/api/async/seats/{seat.id}/check_availability/?movie_id={movie.id}'
+            ),
+            'my_bookings': ('/api/bookings/my_bookings/', '/api/async/bookings/my_bookings/'),
+            'upcoming': ('/api/bookings/upcoming/', '/api/async/bookings/upcoming/'),
+        }
+        
+        report = {
+            'workers': options['workers'],
+            'requests_per_endpoint': options['requests'],
+            'concurrency': options['concurrency'],
+            'endpoints': {},
+        }
+        with serve(workers=options['workers']) as base_url:
+            for name, (sync_path, async_path) in endpoints.items():
+                report['endpoints'][name] = {}
+                for mode, path in (('sync', sync_path), ('async', async_path)):
+                    url = base_url + path
+                    
+                    def send(i, url=url):
+                        return http_request(url, headers=headers)[0]
+                    
+                    run_load(send, min(50, options['requests']), options['concurrency'])  # Warm up
+                    summary, _ = run_load(send, options['requests'], options['concurrency'])
+                    report['endpoints'][name][mode] = summary
+        
+        if options['json']:
+            self.stdout.write(json.dumps(report, indent=2))
+            return
+        
+        self.stdout.write(
+            f"{'endpoint':<20}{'mode':<7}{'req/s':>10}{'p50 ms':>10}{'p99 ms':>10}{'errors':>8}"
+        )
+        for name, modes in report['endpoints'].items():
+            for mode, summary in modes.items():
+                self.stdout.write(
+                    f"{name:<20}{mode:<7}{summary['throughput_rps']:>10}"
+                    f"{summary['p50_ms']:>10}{summary['p99_ms']:>10}{summary['errors']:>8}"
+                )
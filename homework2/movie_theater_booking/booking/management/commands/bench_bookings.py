@@ -0,0 +1,221 @@
+import json
+import os
+import random
+from datetime import timedelta
+from urllib.parse import urlencode
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.test import Client
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.crypto import get_random_string
+from booking import availability
+from booking.benchmarking import (
+    serve, session_cookie, timed_request, run_users, summarize_steps, count_queries
+)
+from booking.models import Movie, Auditorium, Seat, Booking
+
+GUEST_PREFIX = 'bench'
+
+
+class Command(BaseCommand):
+    help = (
+        "Load-test the booking flow: concurrent users list movies, fetch the seat "
+        "map and race to book overlapping seats through the API and the booking "
+        "page. Reports throughput, latency percentiles, conflict rate and "
+        "queries per request"
+    )
+    
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workers', type=int, default=int(os.environ.get('WEB_CONCURRENCY', 4)),
+            help='Server worker processes (default: WEB_CONCURRENCY or 4)'
+        )
+        parser.add_argument('--users', type=int, default=20, help='Concurrent virtual users')
+        parser.add_argument('--iterations', type=int, default=10, help='Booking attempts per user')
+        parser.add_argument(
+            '--seats', type=int, default=20,
+            help='Size of the seat pool every user books from; smaller means more conflicts'
+        )
+        parser.add_argument('--seed', type=int, default=0, help='Seed for the seat choices')
+        parser.add_argument('--keep', action='store_true', help='Keep the benchmark movie and its bookings')
+        parser.add_argument('--json', action='store_true', help='Print machine-readable JSON only')
+    
+    def handle(self, *args, **options):
+        seats = list(
+            Seat.objects.filter(auditorium=Auditorium.get_default())
+            .order_by('seat_number')[:options['seats']]
+        )
+        if not seats:
+            raise CommandError("Need seats in the main auditorium; seed the database first.")
+        
+        # A fresh movie, so every seat starts free and real bookings are untouched
+        movie = Movie.objects.create(
+            title='Benchmark run',
+            description='Created by manage.py bench_bookings',
+            release_date=timezone.now().date() + timedelta(days=1),
+            duration=120
+        )
+        users = [
+            User.objects.get_or_create(username=f'bench_user_{i}')[0]
+            for i in range(options['users'])
+        ]
+        try:
+            queries = self.profile_queries(movie, seats, users[0])
+            report = self.run(movie, seats, users, options)
+        finally:
+            if not options['keep']:
+                with transaction.atomic(), availability.suspend_updates():
+                    movie.delete()
+        
+        for step, count in queries.items():
+            if step in report['steps']:
+                report['steps'][step]['queries_per_request'] = count
+        
+        if options['json']:
+            self.stdout.write(json.dumps(report, indent=2))
+            return
+        
+        self.stdout.write(
+            f"{report['users']} users, {report['seconds']}s, {report['throughput_rps']} req/s, "
+            f"{report['bookings_per_second']} bookings/s"
+        )
+        self.stdout.write(
+            f"{'step':<18}{'req/s':>8}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}"
+            f"{'errors':>8}{'conflicts':>11}{'queries':>14}"
+        )
+        self.stdout.write(
+            "(booking steps show queries as booked/conflict)"
+        )
+        for step, summary in report['steps'].items():
+            conflict_rate = summary.get('conflict_rate')
+            conflicts = '' if conflict_rate is None else f"{conflict_rate:.0%}"
+            queries = summary.get('queries_per_request')
+            if isinstance(queries, dict):
+                queries = f"{queries['booked']}/{queries['conflict']}"
+            self.stdout.write(
+                f"{step:<18}{summary['throughput_rps']:>8}{summary['p50_ms']:>9}"
+                f"{summary['p95_ms']:>9}{summary['p99_ms']:>9}{summary['errors']:>8}"
+                f"{conflicts:>11}{str(queries):>14}"
+            )
+    
+    def profile_queries(self, movie, seats, user):
+        """
+        Count queries per request for each step in-process, booking once
+        successfully and once into a conflict, then undo the bookings.
+        """
+        client = Client(HTTP_HOST='localhost', HTTP_ACCEPT='application/json')
+        client.force_login(user)
+        book_url = reverse('seat_booking', args=[movie.id])
+        api_data = {'movie': movie.id, 'seat': seats[0].id}
+        form_data = {'seat_ids': str(seats[-1].id), 'guest_name': f'{GUEST_PREFIX} profile'}
+        
+        def api_booking():
+            return count_queries(
+                client.post, reverse('api-booking-list'), api_data, content_type='application/json'
+            )
+        
+        def template_booking():
+            return count_queries(client.post, book_url, form_data)
+        
+        queries = {
+            'movie_list': count_queries(client.get, reverse('api-movie-list')),
+            'seat_map': count_queries(
+                client.get, reverse('api-movie-available-seats', args=[movie.id])
+            ),
+            'api_booking': {'booked': api_booking(), 'conflict': api_booking()},
+            'template_booking': {'booked': template_booking(), 'conflict': template_booking()},
+        }
+        with transaction.atomic():
+            for booking in Booking.objects.filter(movie=movie):
+                booking.delete()
+        return queries
+    
+    def run(self, movie, seats, users, options):
+        """Run the concurrent scenario against a served copy of the project"""
+        seat_ids = [seat.id for seat in seats]
+        csrf_secret = get_random_string(32)
+        headers = [
+            {
+                'Cookie': f'{session_cookie(user)}; {settings.CSRF_COOKIE_NAME}={csrf_secret}',
+                'X-CSRFToken': csrf_secret,
+                'Accept': 'application/json',
+            }
+            for user in users
+        ]
+        
+        with serve(workers=options['workers']) as base_url:
+            list_url = base_url + reverse('api-movie-list')
+            seat_map_url = base_url + reverse('api-movie-available-seats', args=[movie.id])
+            api_url = base_url + reverse('api-booking-list')
+            # The page redirects to the confirmation page, which urllib follows like a browser
+            page_url = base_url + reverse('seat_booking', args=[movie.id])
+            
+            def flow(i):
+                rng = random.Random(options['seed'] * 100003 + i)
+                records = []
+                for iteration in range(options['iterations']):
+                    records.append(('movie_list',) + timed_request(list_url, headers=headers[i]))
+                    records.append(('seat_map',) + timed_request(seat_map_url, headers=headers[i]))
+                    seat_id = rng.choice(seat_ids)
+                    # Alternate routes, staggered so both race at the same time
+                    if (i + iteration) % 2 == 0:
+                        body = json.dumps({'movie': movie.id, 'seat': seat_id}).encode()
+                        step_headers = dict(headers[i], **{'Content-Type': 'application/json'})
+                        records.append(('api_booking',) + timed_request(
+                            api_url, 'POST', body, step_headers
+                        ))
+                    else:
+                        body = urlencode({'seat_ids': seat_id, 'guest_name': f'{GUEST_PREFIX} {i}'})
+                        step_headers = dict(
+                            headers[i], **{'Content-Type': 'application/x-www-form-urlencoded'}
+                        )
+                        records.append(('template_booking',) + timed_request(
+                            page_url, 'POST', body.encode(), step_headers
+                        ))
+                return records
+            
+            records, elapsed = run_users(flow, len(users))
+        
+        steps = summarize_steps(records, elapsed)
+        api_statuses = [status for step, _, status in records if step == 'api_booking']
+        self.add_booking_outcome(
+            steps.get('api_booking'),
+            booked=api_statuses.count(201),
+            conflicts=api_statuses.count(400)
+        )
+        # The page redirects either way, so count its bookings in the database
+        template_booked = Booking.objects.filter(
+            movie=movie, user__username__startswith=f'guest_{GUEST_PREFIX}_'
+        ).count()
+        template = steps.get('template_booking')
+        if template is not None:
+            self.add_booking_outcome(
+                template,
+                booked=template_booked,
+                conflicts=template['requests'] - template['errors'] - template_booked
+            )
+        
+        total_booked = Booking.objects.filter(movie=movie).count()
+        return {
+            'workers': options['workers'],
+            'users': len(users),
+            'iterations': options['iterations'],
+            'contested_seats': len(seat_ids),
+            'seconds': round(elapsed, 3),
+            'throughput_rps': round(len(records) / elapsed, 1) if elapsed else None,
+            'bookings': total_booked,
+            'bookings_per_second': round(total_booked / elapsed, 1) if elapsed else None,
+            'steps': steps,
+        }
+    
+    def add_booking_outcome(self, summary, booked, conflicts):
+        """Add booked and conflict counts and the conflict rate to a booking step summary"""
+        if summary is None:
+            return
+        attempts = booked + conflicts
+        summary['booked'] = booked
+        summary['conflicts'] = conflicts
+        summary['conflict_rate'] = round(conflicts / attempts, 3) if attempts else None
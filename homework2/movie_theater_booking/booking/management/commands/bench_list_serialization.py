@@ -0,0 +1,111 @@
+import json
+import statistics
+import time
+from datetime import timedelta
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.test import Client, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from booking.models import Movie, Auditorium, Showtime, Seat, Booking
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare the .values() list fast path with the DRF serializers on "
+        "/api/movies/, /api/seats/ and /api/bookings/. Adds throwaway rows in "
+        "a transaction that is rolled back, checks both paths return the same "
+        "bytes and reports the time per request"
+    )
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=2000, help='Extra movies, seats and bookings to add')
+        parser.add_argument('--repeat', type=int, default=20, help='Requests per endpoint and path')
+        parser.add_argument('--page-size', type=int, default=500, help='page_size for the paginated lists')
+        parser.add_argument('--json', action='store_true', help='Print machine-readable JSON only')
+    
+    def handle(self, *args, **options):
+        # Response caching would hide the serializer cost, and budgets are not the point here
+        with override_settings(
+            CACHES={'default': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'},
+                    'responses': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}},
+            QUERY_BUDGETS_ENFORCED=False
+        ), transaction.atomic():
+            staff = self.add_rows(options['rows'])
+            report = self.run(staff, options)
+            transaction.set_rollback(True)
+        
+        if options['json']:
+            self.stdout.write(json.dumps(report, indent=2))
+            return
+        
+        self.stdout.write(f"{report['rows']} extra rows, {report['repeat']} requests per path")
+        self.stdout.write(
+            f"{'endpoint':<12}{'items':>7}{'serializer ms':>15}{'values ms':>11}{'speedup':>9}{'identical':>11}"
+        )
+        for name, result in report['endpoints'].items():
+            self.stdout.write(
+                f"{name:<12}{result['items']:>7}{result['serializer_ms']:>15}"
+                f"{result['values_ms']:>11}{result['speedup']:>8}x{str(result['identical']):>11}"
+            )
+    
+    def add_rows(self, rows):
+        """Bulk-create rows for every list; returns a staff user who sees all bookings"""
+        staff = User.objects.create_user(username='bench_list_staff', is_staff=True)
+        today = timezone.now().date()
+        movies = Movie.objects.bulk_create(
+            Movie(
+                title=f'Benchmark movie {i}',
+                description='Created by manage.py bench_list_serialization',
+                release_date=today + timedelta(days=i % 365),
+                duration=90 + i % 60
+            )
+            for i in range(rows)
+        )
+        auditorium = Auditorium.objects.create(name='Benchmark auditorium')
+        seats = Seat.objects.bulk_create(
+            Seat(auditorium=auditorium, seat_number=f'B{i}') for i in range(rows)
+        )
+        showtime = Showtime.objects.create(
+            movie=movies[0], auditorium=auditorium, starts_at=timezone.now() + timedelta(days=1)
+        )
+        Booking.objects.bulk_create(
+            Booking(movie=movies[0], showtime=showtime, seat=seat, user=staff) for seat in seats
+        )
+        return staff
+    
+    def run(self, staff, options):
+        client = Client(HTTP_HOST='localhost', HTTP_ACCEPT='application/json')
+        client.force_login(staff)
+        page = f"?page_size={options['page_size']}"
+        endpoints = {
+            'movies': reverse('api-movie-list') + page,
+            'seats': reverse('api-seat-list'),
+            'bookings': reverse('api-booking-list') + page,
+        }
+        
+        report = {'rows': options['rows'], 'repeat': options['repeat'], 'endpoints': {}}
+        for name, url in endpoints.items():
+            timings = {}
+            bodies = {}
+            for path, enabled in (('serializer', False), ('values', True)):
+                with override_settings(FAST_LIST_RESPONSES=enabled):
+                    bodies[path] = client.get(url).content  # Warm up
+                    latencies = []
+                    for _ in range(options['repeat']):
+                        start = time.perf_counter()
+                        client.get(url)
+                        latencies.append(time.perf_counter() - start)
+                timings[path] = statistics.median(latencies) * 1000
+            
+            data = json.loads(bodies['values'])
+            items = data['results'] if isinstance(data, dict) else data
+            report['endpoints'][name] = {
+                'items': len(items),
+                'serializer_ms': round(timings['serializer'], 2),
+                'values_ms': round(timings['values'], 2),
+                'speedup': round(timings['serializer'] / timings['values'], 2),
+                'identical': bodies['serializer'] == bodies['values'],
+            }
+        return report
@@ -0,0 +1,129 @@
+import json
+import os
+import random
+import sqlite3
+from datetime import timedelta
+from urllib.parse import urlencode
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.crypto import get_random_string
+from booking import availability
+from booking.benchmarking import serve, timed_request, run_users, summarize_steps
+from booking.models import Movie, Auditorium, Seat, Booking
+
+GUEST_PREFIX = 'benchsqlite'
+
+# Server environment and journal mode for each configuration compared
+MODES = {
+    'stock': ({'SQLITE_TUNED': '0'}, 'delete'),
+    'tuned': ({'SQLITE_TUNED': '1'}, 'wal'),
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare concurrent booking throughput on stock SQLite (rollback journal, "
+        "DEFERRED transactions) and the tuned configuration (WAL, busy_timeout, "
+        "IMMEDIATE transactions): users race to book seats through the booking page"
+    )
+    
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workers', type=int, default=int(os.environ.get('WEB_CONCURRENCY', 4)),
+            help='Server worker processes (default: WEB_CONCURRENCY or 4)'
+        )
+        parser.add_argument('--users', type=int, default=20, help='Concurrent virtual users')
+        parser.add_argument('--iterations', type=int, default=10, help='Booking attempts per user')
+        parser.add_argument('--seats', type=int, default=100, help='Seats the users book from')
+        parser.add_argument(
+            '--modes', nargs='+', choices=list(MODES), default=list(MODES), help='Configurations to run'
+        )
+        parser.add_argument('--seed', type=int, default=0, help='Seed for the seat choices')
+        parser.add_argument('--json', action='store_true', help='Print machine-readable JSON only')
+    
+    def handle(self, *args, **options):
+        if connection.vendor != 'sqlite':
+            raise CommandError("The default database is not SQLite.")
+        seat_ids = list(
+            Seat.objects.filter(auditorium=Auditorium.get_default())
+            .order_by('seat_number')
+            .values_list('id', flat=True)[:options['seats']]
+        )
+        if not seat_ids:
+            raise CommandError("Need seats in the main auditorium; seed the database first.")
+        
+        report = {}
+        for mode in options['modes']:
+            report[mode] = self.run(mode, seat_ids, options)
+        
+        if options['json']:
+            self.stdout.write(json.dumps(report, indent=2))
+            return
+        self.stdout.write(
+            f"{'mode':<8}{'req/s':>8}{'bookings/s':>12}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'errors':>8}"
+        )
+        for mode, result in report.items():
+            summary = result['booking']
+            self.stdout.write(
+                f"{mode:<8}{summary['throughput_rps']:>8}{result['bookings_per_second']:>12}"
+                f"{summary['p50_ms']:>9}{summary['p95_ms']:>9}{summary['p99_ms']:>9}{summary['errors']:>8}"
+            )
+    
+    def set_journal_mode(self, mode):
+        """Switch the database file's journal mode; needs every connection to it closed"""
+        connection.close()
+        with sqlite3.connect(connection.settings_dict['NAME']) as db:
+            db.execute(f'PRAGMA journal_mode = {mode}')
+    
+    def run(self, mode, seat_ids, options):
+        """Book from a fresh movie under one configuration; returns its results"""
+        env, journal_mode = MODES[mode]
+        movie = Movie.objects.create(
+            title=f'SQLite benchmark ({mode})',
+            description='Created by manage.py bench_sqlite',
+            release_date=timezone.now().date() + timedelta(days=1),
+            duration=120
+        )
+        try:
+            self.set_journal_mode(journal_mode)
+            csrf_secret = get_random_string(32)
+            headers = {
+                'Cookie': f'{settings.CSRF_COOKIE_NAME}={csrf_secret}',
+                'X-CSRFToken': csrf_secret,
+                'Content-Type': 'application/x-www-form-urlencoded',
+            }
+            with serve(workers=options['workers'], env=env) as base_url:
+                # The page redirects to the confirmation page, which urllib follows
+                page_url = base_url + reverse('seat_booking', args=[movie.id])
+                
+                def flow(i):
+                    rng = random.Random(options['seed'] * 100003 + i)
+                    records = []
+                    for iteration in range(options['iterations']):
+                        body = urlencode({
+                            'seat_ids': rng.choice(seat_ids),
+                            'guest_name': f'{GUEST_PREFIX} {i}',
+                        })
+                        records.append(('booking',) + timed_request(
+                            page_url, 'POST', body.encode(), headers
+                        ))
+                    return records
+                
+                records, elapsed = run_users(flow, options['users'])
+            
+            bookings = Booking.objects.filter(movie=movie).count()
+        finally:
+            with transaction.atomic(), availability.suspend_updates():
+                movie.delete()
+            User.objects.filter(username__startswith=f'guest_{GUEST_PREFIX}_').delete()
+        
+        return {
+            'journal_mode': journal_mode,
+            'booking': summarize_steps(records, elapsed)['booking'],
+            'bookings': bookings,
+            'bookings_per_second': round(bookings / elapsed, 1) if elapsed else None,
+        }
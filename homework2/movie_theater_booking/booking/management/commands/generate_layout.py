@@ -0,0 +1,47 @@
+import time
+from django.core.management.base import BaseCommand, CommandError
+from booking import layouts
+from booking.models import Auditorium
+
+
+class Command(BaseCommand):
+    help = (
+        "Generate an auditorium's seats row by row (A1, A2, ... B1, ...) with "
+        "batched bulk inserts, e.g. `generate_layout Main --rows 40 --seats-per-row 50`"
+    )
+    
+    def add_arguments(self, parser):
+        parser.add_argument('auditorium', help='Auditorium name; created if it does not exist')
+        parser.add_argument('--rows', type=int, required=True, help='Number of rows')
+        parser.add_argument('--seats-per-row', type=int, required=True, help='Seats in each row')
+        parser.add_argument('--section', default='', help='Section name for these rows')
+        parser.add_argument(
+            '--first-row', type=int, default=1,
+            help='Row number to start from, for further sections (27 is row AA)'
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=layouts.BATCH_SIZE, help='Rows per INSERT'
+        )
+    
+    def handle(self, *args, **options):
+        auditorium, created = Auditorium.objects.get_or_create(name=options['auditorium'])
+        start = time.perf_counter()
+        try:
+            count = layouts.generate_layout(
+                auditorium,
+                options['rows'],
+                options['seats_per_row'],
+                section=options['section'],
+                first_row=options['first_row'],
+                batch_size=options['batch_size']
+            )
+        except layouts.LayoutError as error:
+            raise CommandError(str(error))
+        elapsed = (time.perf_counter() - start) * 1000
+        
+        first = layouts.row_label(options['first_row'])
+        last = layouts.row_label(options['first_row'] + options['rows'] - 1)
+        self.stdout.write(self.style.SUCCESS(
+            f"{'Created' if created else 'Updated'} {auditorium.name}: {count} seats in rows "
+            f"{first}-{last} in {elapsed:.0f} ms."
+        ))
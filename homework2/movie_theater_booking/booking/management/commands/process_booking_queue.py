@@ -0,0 +1,45 @@
+import time
+from collections import Counter
+from django.core.management.base import BaseCommand, CommandError
+from booking import bookingqueue
+
+
+class Command(BaseCommand):
+    help = (
+        "Book queued booking requests in arrival order, a batch per transaction. "
+        "Runs until interrupted unless --once is given"
+    )
+    
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=bookingqueue.BATCH_SIZE, help='Requests per transaction'
+        )
+        parser.add_argument(
+            '--interval', type=float, default=1.0, help='Seconds to wait when the queue is empty'
+        )
+        parser.add_argument('--once', action='store_true', help='Stop once the queue is empty')
+    
+    def handle(self, *args, **options):
+        if options['batch_size'] < 1:
+            raise CommandError("--batch-size must be positive.")
+        
+        totals = Counter()
+        try:
+            while True:
+                requests = bookingqueue.drain(options['batch_size'])
+                if requests:
+                    outcomes = Counter(request.status for request in requests)
+                    totals.update(outcomes)
+                    self.stdout.write(
+                        f"Processed {len(requests)}: {outcomes['booked']} booked, "
+                        f"{outcomes['rejected']} rejected"
+                    )
+                    continue
+                if options['once']:
+                    break
+                time.sleep(options['interval'])
+        except KeyboardInterrupt:
+            pass
+        self.stdout.write(self.style.SUCCESS(
+            f"Done: {totals['booked']} booked, {totals['rejected']} rejected."
+        ))
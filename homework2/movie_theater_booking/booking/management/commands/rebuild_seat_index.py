@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+from booking import availability
+
+
+class Command(BaseCommand):
+    help = "Regenerate the per-showtime seat availability index from Booking rows"
+    
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'showtime_ids',
+            nargs='*',
+            type=int,
+            help='Only rebuild these showtimes (default: all showtimes)'
+        )
+    
+    def handle(self, *args, **options):
+        showtime_ids = options['showtime_ids'] or None
+        count = availability.rebuild(showtime_ids)
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt seat index for {count} showtime(s)."))
@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+from booking import counters
+
+
+class Command(BaseCommand):
+    help = "Recompute denormalized booking and seat counters from the source tables"
+    
+    def handle(self, *args, **options):
+        fixed = counters.repair_booked_counts()
+        seat_count = counters.repair_seat_count()
+        self.stdout.write(self.style.SUCCESS(
+            f"Fixed booked_count on {fixed} movie(s); seat count is {seat_count}."
+        ))
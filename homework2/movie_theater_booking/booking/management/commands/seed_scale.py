@@ -0,0 +1,63 @@
+import json
+from django.core.management.base import BaseCommand, CommandError
+from booking import seeding
+
+
+class Command(BaseCommand):
+    help = (
+        "Fill the database with synthetic users, seats, movies and bookings for "
+        "scale testing, e.g. `seed_scale --movies 10000 --seats 5000 --bookings "
+        "5000000 --users 100000`. Deterministic for a given --seed and starting database"
+    )
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=1000, help='Users to create')
+        parser.add_argument('--movies', type=int, default=1000, help='Movies to create')
+        parser.add_argument('--seats', type=int, default=2000, help='Seats to create, split into rooms')
+        parser.add_argument('--bookings', type=int, default=100000, help='Bookings to create')
+        parser.add_argument('--showtimes-per-movie', type=int, default=1, help='Showtimes per movie')
+        parser.add_argument('--seats-per-room', type=int, default=500, help='Seats per generated auditorium')
+        parser.add_argument('--seed', type=int, default=0, help='Random seed; also tags the generated names')
+        parser.add_argument(
+            '--batch-size', type=int, default=seeding.BATCH_SIZE, help='Rows generated and inserted at a time'
+        )
+        parser.add_argument('--json', action='store_true', help='Print machine-readable JSON only')
+    
+    def handle(self, *args, **options):
+        for name in ('users', 'movies', 'seats', 'bookings', 'showtimes_per_movie'):
+            if options[name] < 0:
+                raise CommandError(f"--{name.replace('_', '-')} cannot be negative.")
+        for name in ('seats_per_room', 'batch_size'):
+            if options[name] < 1:
+                raise CommandError(f"--{name.replace('_', '-')} must be positive.")
+        
+        def progress(step, result):
+            if not options['json']:
+                self.stdout.write(
+                    f"{step:<10}{result['rows']:>10} rows in {result['seconds']:>8}s "
+                    f"({result['rows_per_second']} rows/s)"
+                )
+        
+        try:
+            report = seeding.seed(
+                options['users'],
+                options['movies'],
+                options['seats'],
+                options['bookings'],
+                showtimes_per_movie=options['showtimes_per_movie'],
+                seats_per_room=options['seats_per_room'],
+                seed=options['seed'],
+                batch_size=options['batch_size'],
+                progress=progress
+            )
+        except seeding.SeedError as error:
+            raise CommandError(str(error))
+        
+        if options['json']:
+            self.stdout.write(json.dumps(report, indent=2))
+            return
+        if report['bookings']['rows'] < options['bookings']:
+            self.stdout.write(self.style.WARNING(
+                f"Only {report['bookings']['rows']} bookings fit: every showtime's room was full."
+            ))
+        self.stdout.write(self.style.SUCCESS("Seeding complete."))
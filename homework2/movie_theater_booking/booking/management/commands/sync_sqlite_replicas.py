@@ -0,0 +1,32 @@
+import sqlite3
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+
+
+class Command(BaseCommand):
+    help = (
+        "Copy the default SQLite database into each SQLite read replica "
+        "(SQLITE_REPLICA=1), standing in for replication when testing locally"
+    )
+    
+    def handle(self, *args, **options):
+        source = connections[DEFAULT_DB_ALIAS].settings_dict
+        if source['ENGINE'] != 'django.db.backends.sqlite3':
+            raise CommandError("The default database is not SQLite.")
+        if not settings.DATABASE_REPLICAS:
+            raise CommandError("No replicas are configured; set SQLITE_REPLICA=1.")
+        
+        with sqlite3.connect(source['NAME']) as primary:
+            for alias in settings.DATABASE_REPLICAS:
+                target = connections[alias].settings_dict
+                if target['ENGINE'] != 'django.db.backends.sqlite3':
+                    raise CommandError(f"Replica {alias} is not SQLite.")
+                connections[alias].close()
+                replica = sqlite3.connect(target['NAME'])
+                try:
+                    # Online backup: consistent even while the server writes
+                    primary.backup(replica)
+                finally:
+                    replica.close()
+                self.stdout.write(self.style.SUCCESS(f"Copied {source['NAME']} to {alias} ({target['NAME']})."))
@@ -0,0 +1,356 @@
+"""
+In-process metrics registry, exposed in the Prometheus text format at /metrics.
+
+Counters and fixed-bucket histograms are declared at import time below and
+updated with inc() and observe(). By default the values live in a dict in
+this process, which is all runserver or a single worker needs.
+
+Under gunicorn each worker is its own process, so a scrape would only see
+the worker that happened to answer it. With settings.METRICS_MULTIPROC_DIR
+set, every process writes its values into its own memory-mapped file in
+that directory (metrics_<pid>.db) and a scrape sums all the files. An
+update is a write into shared memory, not a file write, and files of
+workers that exited are still counted, so counters never go backwards
+when gunicorn replaces a worker. Empty the directory when the server
+starts, before the workers fork.
+
+Bookings and cancellations are counted once their transaction commits, so
+a rolled-back or retried write is not counted twice.
+"""
+import glob
+import json
+import mmap
+import os
+import struct
+import threading
+import time
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import transaction
+from django.http import HttpResponse
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+_registry = {}
+_store = None
+_store_lock = threading.Lock()
+
+
+# ---- storage ----
+
+class MemoryStore:
+    """Sample values of this process, by key"""
+    
+    def __init__(self):
+        self._values = {}
+        self._lock = threading.Lock()
+    
+    def add(self, key, amount):
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+    
+    def items(self):
+        with self._lock:
+            return list(self._values.items())
+
+
+class MmapStore(MemoryStore):
+    """
+    Sample values in a memory-mapped file written only by this process.
+    
+    Layout: a 4-byte used size, then entries of a 4-byte key length, the
+    UTF-8 key padded to 8 bytes and an 8-byte float. Entries are appended
+    before the used size is advanced, so readers never see a partial one.
+    """
+    INITIAL_SIZE = 1 << 16
+    
+    def __init__(self, path):
+        super().__init__()
+        self.path = path
+        self._file = open(path, 'a+b')
+        if os.fstat(self._file.fileno()).st_size == 0:
+            self._file.truncate(self.INITIAL_SIZE)
+        self._map = mmap.mmap(self._file.fileno(), 0)
+        self._used = struct.unpack_from('i', self._map, 0)[0] or 8
+        self._positions = {key: pos for key, value, pos in self.read_entries(self._map)}
+    
+    @staticmethod
+    def read_entries(data):
+        """(key, value, value offset) for every entry in a store's bytes"""
+        used = struct.unpack_from('i', data, 0)[0]
+        pos = 8
+        while pos < used:
+            length = struct.unpack_from('i', data, pos)[0]
+            key = bytes(data[pos + 4:pos + 4 + length]).decode()
+            pos += 4 + length + (-(4 + length) % 8)
+            yield key, struct.unpack_from('d', data, pos)[0], pos
+            pos += 8
+    
+    @classmethod
+    def read(cls, path):
+        with open(path, 'rb') as f:
+            data = f.read()
+        return [(key, value) for key, value, pos in cls.read_entries(data)] if data else []
+    
+    def _append(self, key):
+        encoded = key.encode()
+        padding = -(4 + len(encoded)) % 8
+        entry = struct.pack('i', len(encoded)) + encoded + b' ' * padding + struct.pack('d', 0.0)
+        if self._used + len(entry) > len(self._map):
+            size = len(self._map) * 2
+            while self._used + len(entry) > size:
+                size *= 2
+            self._map.close()
+            self._file.truncate(size)
+            self._map = mmap.mmap(self._file.fileno(), 0)
+        self._map[self._used:self._used + len(entry)] = entry
+        position = self._used + len(entry) - 8
+        self._used += len(entry)
+        struct.pack_into('i', self._map, 0, self._used)
+        self._positions[key] = position
+        return position
+    
+    def add(self, key, amount):
+        with self._lock:
+            position = self._positions.get(key)
+            if position is None:
+                position = self._append(key)
+            value = struct.unpack_from('d', self._map, position)[0]
+            struct.pack_into('d', self._map, position, value + amount)
+    
+    def items(self):
+        with self._lock:
+            return [(key, value) for key, value, pos in self.read_entries(self._map)]
+
+
+def multiproc_dir():
+    return getattr(settings, 'METRICS_MULTIPROC_DIR', None)
+
+
+def _get_store():
+    """This process's store; a forked worker or a changed setting gets a new one"""
+    global _store
+    directory = multiproc_dir()
+    pid = os.getpid()
+    store = _store
+    if store is not None and store.pid == pid and store.directory == directory:
+        return store
+    with _store_lock:
+        if _store is None or _store.pid != pid or _store.directory != directory:
+            if directory:
+                store = MmapStore(os.path.join(directory, f'metrics_{pid}.db'))
+            else:
+                store = MemoryStore()
+            store.pid, store.directory = pid, directory
+            _store = store
+        return _store
+
+
+def reset():
+    """Drop this process's values (tests)"""
+    global _store
+    with _store_lock:
+        if isinstance(_store, MmapStore):
+            _store._map.close()
+            _store._file.close()
+            os.remove(_store.path)
+        _store = None
+
+
+def collect():
+    """{key: value} summed over every process (or just this one)"""
+    directory = multiproc_dir()
+    if not directory:
+        return dict(_get_store().items())
+    totals = {}
+    for path in glob.glob(os.path.join(directory, 'metrics_*.db')):
+        for key, value in MmapStore.read(path):
+            totals[key] = totals.get(key, 0.0) + value
+    return totals
+
+
+# ---- metric types ----
+
+def _key(sample, labels):
+    return json.dumps([sample, labels], separators=(',', ':'))
+
+
+class Metric:
+    type = None
+    
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        _registry[name] = self
+    
+    def _labels(self, labels):
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} takes labels {self.labelnames}, got {tuple(labels)}.")
+        return [str(labels[name]) for name in self.labelnames]
+    
+    def labelnames_for(self, sample):
+        return self.labelnames
+
+
+class Counter(Metric):
+    """A value that only goes up"""
+    type = 'counter'
+    
+    def inc(self, amount=1, **labels):
+        if amount < 0:
+            raise ValueError("Counters can only increase.")
+        if amount:
+            _get_store().add(_key(self.name, self._labels(labels)), amount)
+    
+    def inc_on_commit(self, amount=1, **labels):
+        """inc() once the current transaction commits (now, outside one)"""
+        if amount:
+            self._labels(labels)
+            transaction.on_commit(lambda: self.inc(amount, **labels))
+    
+    def samples(self, values):
+        """(sample name, label values, value) to expose, from this metric's stored values"""
+        return sorted((self.name, list(labels), value) for (sample, labels), value in values)
+
+
+class Histogram(Metric):
+    """Observations counted into fixed buckets, with their sum"""
+    type = 'histogram'
+    
+    def __init__(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._bounds = [repr(float(bound)) for bound in self.buckets] + ['+Inf']
+    
+    def observe(self, value, **labels):
+        labels = self._labels(labels)
+        store = _get_store()
+        for bound, le in zip(self.buckets, self._bounds):
+            if value <= bound:
+                break
+        else:
+            le = '+Inf'
+        # Buckets are stored per bucket and made cumulative when exposed
+        store.add(_key(f'{self.name}_bucket', labels + [le]), 1)
+        store.add(_key(f'{self.name}_sum', labels), value)
+        store.add(_key(f'{self.name}_count', labels), 1)
+    
+    def samples(self, values):
+        values = dict(values)
+        series = sorted({
+            tuple(labels[:len(self.labelnames)])
+            for (sample, labels) in values if sample == f'{self.name}_count'
+        })
+        samples = []
+        for labels in series:
+            labels = list(labels)
+            running = 0
+            for le in self._bounds:
+                running += values.get((f'{self.name}_bucket', tuple(labels + [le])), 0)
+                samples.append((f'{self.name}_bucket', labels + [le], running))
+            samples.append((f'{self.name}_sum', labels, values.get((f'{self.name}_sum', tuple(labels)), 0)))
+            samples.append((f'{self.name}_count', labels, values.get((f'{self.name}_count', tuple(labels)), 0)))
+        return samples
+    
+    def labelnames_for(self, sample):
+        return self.labelnames + ('le',) if sample.endswith('_bucket') else self.labelnames
+
+
+# ---- exposition ----
+
+def _escape(value):
+    return value.replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _format_value(value):
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+def exposition():
+    """Every registered metric in the Prometheus text format"""
+    by_metric = {}
+    for key, value in collect().items():
+        sample, labels = json.loads(key)
+        name = sample
+        for suffix in ('_bucket', '_sum', '_count'):
+            if sample.endswith(suffix) and sample[:-len(suffix)] in _registry:
+                name = sample[:-len(suffix)]
+        by_metric.setdefault(name, []).append(((sample, tuple(labels)), value))
+    
+    lines = []
+    for name, metric in sorted(_registry.items()):
+        lines.append(f'# HELP {name} {metric.documentation}')
+        lines.append(f'# TYPE {name} {metric.type}')
+        for sample, labels, value in metric.samples(by_metric.get(name, [])):
+            label_text = ','.join(
+                f'{label}="{_escape(text)}"'
+                for label, text in zip(metric.labelnames_for(sample), labels)
+            )
+            if label_text:
+                sample = f'{sample}{{{label_text}}}'
+            lines.append(f'{sample} {_format_value(value)}')
+    return '\n'.join(lines) + '\n'
+
+
+def metrics_view(request):
+    """GET /metrics: Prometheus scrape endpoint"""
+    return HttpResponse(exposition(), content_type=CONTENT_TYPE)
+
+
+class MetricsMiddleware:
+    """Observe each request's latency by view name, method and status"""
+    sync_capable = True
+    async_capable = True
+    
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self._async = iscoroutinefunction(get_response)
+        if self._async:
+            markcoroutinefunction(self)
+    
+    def __call__(self, request):
+        if self._async:
+            return self.__acall__(request)
+        start = time.perf_counter()
+        response = self.get_response(request)
+        self.observe(request, response, start)
+        return response
+    
+    async def __acall__(self, request):
+        start = time.perf_counter()
+        response = await self.get_response(request)
+        self.observe(request, response, start)
+        return response
+    
+    def observe(self, request, response, start):
+        match = getattr(request, 'resolver_match', None)
+        REQUEST_DURATION.observe(
+            time.perf_counter() - start,
+            view=match.view_name if match else 'unmatched',
+            method=request.method,
+            status=response.status_code
+        )
+
+
+# ---- the booking metrics ----
+
+BOOKINGS_CREATED = Counter(
+    'booking_bookings_created_total', 'Bookings committed.'
+)
+BOOKING_CONFLICTS = Counter(
+    'booking_conflicts_total', 'Booking attempts rejected because the seat was taken.', ['reason']
+)
+BOOKINGS_CANCELLED = Counter(
+    'booking_bookings_cancelled_total', 'Bookings deleted.'
+)
+BOOKING_QUEUE = Counter(
+    'booking_queue_requests_total', 'Queued booking requests, by outcome.', ['result']
+)
+RESPONSE_CACHE = Counter(
+    'booking_response_cache_requests_total', 'Response cache lookups.', ['endpoint', 'result']
+)
+REQUEST_DURATION = Histogram(
+    'booking_http_request_duration_seconds', 'Request latency by view.', ['view', 'method', 'status']
+)
@@ -0,0 +1,35 @@
+# Generated by Django 5.2.7 on 2026-10-18 06:04
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('booking', '0003_seat_hold'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='booking',
+            options={'ordering': ['-booking_date', '-id']},
+        ),
+        migrations.AlterModelOptions(
+            name='movie',
+            options={'ordering': ['-release_date', '-id']},
+        ),
+        migrations.AddIndex(
+            model_name='booking',
+            index=models.Index(fields=['-booking_date', '-id'], name='booking_date_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='booking',
+            index=models.Index(fields=['user', '-booking_date', '-id'], name='booking_user_date_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='movie',
+            index=models.Index(fields=['-release_date', '-id'], name='movie_release_id_idx'),
+        ),
+    ]
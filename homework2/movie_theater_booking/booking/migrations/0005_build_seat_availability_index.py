@@ -0,0 +1,28 @@
+from django.db import migrations
+
+
+def build_indexes(apps, schema_editor):
+    """Create availability index rows for movies that predate the index"""
+    Movie = apps.get_model('booking', 'Movie')
+    Booking = apps.get_model('booking', 'Booking')
+    SeatAvailabilityIndex = apps.get_model('booking', 'SeatAvailabilityIndex')
+    
+    for movie_id in Movie.objects.filter(seat_index__isnull=True).values_list('id', flat=True):
+        bitmap = bytearray()
+        for seat_id in Booking.objects.filter(movie_id=movie_id).values_list('seat_id', flat=True):
+            byte_index, bit = divmod(seat_id, 8)
+            if byte_index >= len(bitmap):
+                bitmap.extend(b'\x00' * (byte_index + 1 - len(bitmap)))
+            bitmap[byte_index] |= (1 << bit)
+        SeatAvailabilityIndex.objects.create(movie_id=movie_id, bitmap=bytes(bitmap))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('booking', '0004_pagination_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(build_indexes, migrations.RunPython.noop),
+    ]
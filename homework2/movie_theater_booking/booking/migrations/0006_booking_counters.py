@@ -0,0 +1,40 @@
+# Generated by Django 5.2.7 on 2026-10-18 06:10
+
+from django.db import migrations, models
+
+
+def populate_counters(apps, schema_editor):
+    """Fill the new counters from the existing seat and booking rows"""
+    Movie = apps.get_model('booking', 'Movie')
+    Seat = apps.get_model('booking', 'Seat')
+    TheaterStats = apps.get_model('booking', 'TheaterStats')
+    
+    for movie in Movie.objects.annotate(total=models.Count('bookings')):
+        Movie.objects.filter(pk=movie.pk).update(booked_count=movie.total)
+    TheaterStats.objects.create(pk=1, seat_count=Seat.objects.count())
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('booking', '0005_build_seat_availability_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TheaterStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('seat_count', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'verbose_name_plural': 'theater stats',
+            },
+        ),
+        migrations.AddField(
+            model_name='movie',
+            name='booked_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(populate_counters, migrations.RunPython.noop),
+    ]
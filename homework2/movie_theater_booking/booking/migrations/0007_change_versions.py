@@ -0,0 +1,23 @@
+# Generated by Django 5.2.7 on 2026-10-18 06:23
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('booking', '0006_booking_counters'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='movie',
+            name='seat_version',
+            field=models.PositiveBigIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='theaterstats',
+            name='catalog_version',
+            field=models.PositiveBigIntegerField(default=0),
+        ),
+    ]
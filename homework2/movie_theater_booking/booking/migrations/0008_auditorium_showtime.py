@@ -0,0 +1,54 @@
+# Generated by Django 5.2.7 on 2026-10-18 06:40
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('booking', '0007_change_versions'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Auditorium',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100, unique=True)),
+                ('seat_count', models.PositiveIntegerField(default=0, editable=False)),
+            ],
+            options={
+                'ordering': ['name'],
+            },
+        ),
+        migrations.CreateModel(
+            name='Showtime',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('starts_at', models.DateTimeField()),
+                ('auditorium', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='showtimes', to='booking.auditorium')),
+                ('movie', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='showtimes', to='booking.movie')),
+            ],
+            options={
+                'ordering': ['starts_at', 'id'],
+                'indexes': [models.Index(fields=['starts_at', 'id'], name='showtime_starts_id_idx'), models.Index(fields=['movie', 'starts_at'], name='showtime_movie_starts_idx')],
+            },
+        ),
+        # Nullable until 0009 has filled them in
+        migrations.AddField(
+            model_name='seat',
+            name='auditorium',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.CASCADE, related_name='seats', to='booking.auditorium'),
+        ),
+        migrations.AddField(
+            model_name='booking',
+            name='showtime',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.CASCADE, related_name='bookings', to='booking.showtime'),
+        ),
+        migrations.AddField(
+            model_name='seathold',
+            name='showtime',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.CASCADE, related_name='holds', to='booking.showtime'),
+        ),
+    ]
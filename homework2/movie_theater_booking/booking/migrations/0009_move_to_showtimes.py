@@ -0,0 +1,39 @@
+import datetime
+from django.db import migrations
+from django.utils import timezone
+
+
+def move_to_showtimes(apps, schema_editor):
+    """
+    Put every existing seat in a default auditorium and give every movie one
+    showtime on its release date, then point bookings and holds at it.
+    """
+    Auditorium = apps.get_model('booking', 'Auditorium')
+    Showtime = apps.get_model('booking', 'Showtime')
+    Movie = apps.get_model('booking', 'Movie')
+    Seat = apps.get_model('booking', 'Seat')
+    Booking = apps.get_model('booking', 'Booking')
+    SeatHold = apps.get_model('booking', 'SeatHold')
+    
+    auditorium, _ = Auditorium.objects.get_or_create(name='Main')
+    Seat.objects.update(auditorium=auditorium)
+    Auditorium.objects.filter(pk=auditorium.pk).update(seat_count=Seat.objects.count())
+    
+    for movie in Movie.objects.all():
+        starts_at = timezone.make_aware(
+            datetime.datetime.combine(movie.release_date, datetime.time(19, 0))
+        )
+        showtime = Showtime.objects.create(movie=movie, auditorium=auditorium, starts_at=starts_at)
+        Booking.objects.filter(movie=movie).update(showtime=showtime)
+        SeatHold.objects.filter(movie=movie).update(showtime=showtime)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('booking', '0008_auditorium_showtime'),
+    ]
+
+    operations = [
+        migrations.RunPython(move_to_showtimes, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,79 @@
+# Generated by Django 5.2.7 on 2026-10-18 06:40
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def build_indexes(apps, schema_editor):
+    """Rebuild the availability index per showtime from the migrated bookings"""
+    Showtime = apps.get_model('booking', 'Showtime')
+    Booking = apps.get_model('booking', 'Booking')
+    SeatAvailabilityIndex = apps.get_model('booking', 'SeatAvailabilityIndex')
+    
+    for showtime_id in Showtime.objects.values_list('id', flat=True):
+        bitmap = bytearray()
+        for seat_id in Booking.objects.filter(showtime_id=showtime_id).values_list('seat_id', flat=True):
+            byte_index, bit = divmod(seat_id, 8)
+            if byte_index >= len(bitmap):
+                bitmap.extend(b'\x00' * (byte_index + 1 - len(bitmap)))
+            bitmap[byte_index] |= (1 << bit)
+        SeatAvailabilityIndex.objects.create(showtime_id=showtime_id, bitmap=bytes(bitmap))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('booking', '0009_move_to_showtimes'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='seat',
+            name='auditorium',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='seats', to='booking.auditorium'),
+        ),
+        migrations.AlterField(
+            model_name='seat',
+            name='seat_number',
+            field=models.CharField(max_length=10),
+        ),
+        migrations.AlterUniqueTogether(
+            name='seat',
+            unique_together={('auditorium', 'seat_number')},
+        ),
+        migrations.AlterField(
+            model_name='booking',
+            name='showtime',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='bookings', to='booking.showtime'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='booking',
+            unique_together={('showtime', 'seat')},
+        ),
+        migrations.AlterField(
+            model_name='seathold',
+            name='showtime',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='holds', to='booking.showtime'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='seathold',
+            unique_together={('showtime', 'seat')},
+        ),
+        migrations.AddIndex(
+            model_name='seathold',
+            index=models.Index(fields=['showtime', 'expires_at'], name='booking_sea_showtim_a2fbb1_idx'),
+        ),
+        # The index is derived data, so re-key it by dropping and rebuilding it
+        migrations.DeleteModel(
+            name='SeatAvailabilityIndex',
+        ),
+        migrations.CreateModel(
+            name='SeatAvailabilityIndex',
+            fields=[
+                ('showtime', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='seat_index', serialize=False, to='booking.showtime')),
+                ('bitmap', models.BinaryField(default=b'')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.RunPython(build_indexes, migrations.RunPython.noop),
+    ]
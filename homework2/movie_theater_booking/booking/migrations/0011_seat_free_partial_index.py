@@ -0,0 +1,17 @@
+# Generated by Django 5.2.7 on 2026-10-18 06:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('booking', '0010_showtime_constraints'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='seat',
+            index=models.Index(condition=models.Q(('is_booked', False)), fields=['seat_number'], name='seat_free_number_idx'),
+        ),
+    ]
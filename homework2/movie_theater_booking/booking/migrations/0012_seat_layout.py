@@ -0,0 +1,62 @@
+# Generated by Django 5.2.7 on 2026-10-18 07:07
+
+import re
+from django.db import migrations, models
+
+
+def fill_layout(apps, schema_editor):
+    """Derive row and column from existing seat numbers, like Seat.save() does"""
+    Seat = apps.get_model('booking', 'Seat')
+    seats = []
+    for seat in Seat.objects.all():
+        match = re.search(r'([A-Za-z]+)(\d+)$', seat.seat_number)
+        if match is None:
+            continue
+        row = 0
+        for char in match.group(1).upper():
+            row = row * 26 + ord(char) - ord('A') + 1
+        seat.row, seat.column = row, int(match.group(2))
+        seats.append(seat)
+    Seat.objects.bulk_update(seats, ['row', 'column'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('booking', '0011_seat_free_partial_index'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='seat',
+            options={'ordering': ['section', 'row', 'column', 'seat_number']},
+        ),
+        migrations.RemoveIndex(
+            model_name='seat',
+            name='seat_free_number_idx',
+        ),
+        migrations.AddField(
+            model_name='seat',
+            name='column',
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='seat',
+            name='row',
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='seat',
+            name='section',
+            field=models.CharField(blank=True, default='', max_length=50),
+        ),
+        migrations.AddIndex(
+            model_name='seat',
+            index=models.Index(fields=['auditorium', 'section', 'row', 'column'], name='seat_layout_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='seat',
+            index=models.Index(condition=models.Q(('is_booked', False)), fields=['section', 'row', 'column', 'seat_number'], name='seat_free_order_idx'),
+        ),
+        migrations.RunPython(fill_layout, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,40 @@
+from django.db import migrations, models
+
+
+def compact_bitmaps(apps, schema_editor):
+    """Drop the leading empty bytes of each bitmap into base_seat_id"""
+    SeatAvailabilityIndex = apps.get_model('booking', 'SeatAvailabilityIndex')
+
+    for index in SeatAvailabilityIndex.objects.all():
+        bitmap = bytes(index.bitmap)
+        trimmed = bitmap.lstrip(b'\x00')
+        if len(trimmed) == len(bitmap):
+            continue
+        index.base_seat_id = (len(bitmap) - len(trimmed)) * 8 if trimmed else 0
+        index.bitmap = trimmed
+        index.save(update_fields=['bitmap', 'base_seat_id'])
+
+
+def expand_bitmaps(apps, schema_editor):
+    """Put the base back as leading empty bytes, for bitmaps indexed from seat id 0"""
+    SeatAvailabilityIndex = apps.get_model('booking', 'SeatAvailabilityIndex')
+
+    for index in SeatAvailabilityIndex.objects.exclude(base_seat_id=0):
+        index.bitmap = bytes(index.base_seat_id // 8) + bytes(index.bitmap)
+        index.save(update_fields=['bitmap'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('booking', '0013_booking_request'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='seatavailabilityindex',
+            name='base_seat_id',
+            field=models.PositiveBigIntegerField(default=0),
+        ),
+        migrations.RunPython(compact_bitmaps, expand_bitmaps),
+    ]
@@ -1,39 +1,443 @@
+import datetime
+import uuid
 from django.db import models
 from django.contrib.auth.models import User
+from django.utils import timezone
 
 class Movie(models.Model):
     title = models.CharField(max_length=200)
     description = models.TextField()
     release_date = models.DateField()
     duration = models.IntegerField(help_text="Duration in minutes")
+    # Maintained by booking/counters.py; repair with `manage.py repair_counters`
+    booked_count = models.PositiveIntegerField(default=0, editable=False)
+    # Bumped on every booking or hold change; part of the seat map ETags
+    seat_version = models.PositiveBigIntegerField(default=0, editable=False)
+    
+    COUNTER_FIELDS = ('booked_count', 'seat_version')
     
     def __str__(self):
         return self.title
     
+    def save(self, *args, **kwargs):
+        # The counters move with F() updates; writing back a stale copy would undo them
+        if not self._state.adding and kwargs.get('update_fields') is None and not kwargs.get('force_insert'):
+            deferred = self.get_deferred_fields()
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name not in self.COUNTER_FIELDS
+                and field.attname not in deferred
+            ]
+        super().save(*args, **kwargs)
+    
+    class Meta:
+        ordering = ['-release_date', '-id']
+        indexes = [
+            # Supports cursor pagination over (release_date, id)
+            models.Index(fields=['-release_date', '-id'], name='movie_release_id_idx'),
+        ]
+
+
+class Auditorium(models.Model):
+    """A screening room; every seat belongs to exactly one auditorium"""
+    DEFAULT_NAME = 'Main'
+    
+    name = models.CharField(max_length=100, unique=True)
+    # Maintained by booking/counters.py; repair with `manage.py repair_counters`
+    seat_count = models.PositiveIntegerField(default=0, editable=False)
+    
+    def __str__(self):
+        return self.name
+    
+    @classmethod
+    def get_default(cls):
+        """The auditorium used when a seat or showtime does not name one"""
+        return cls.objects.get_or_create(name=cls.DEFAULT_NAME)[0]
+    
     class Meta:
-        ordering = ['-release_date']
+        ordering = ['name']
+
+
+class ShowtimeQuerySet(models.QuerySet):
+    """Queryset helpers for showtimes"""
+    
+    def primary_for(self, movie_id):
+        """
+        The movie's first showtime, which the movie-level endpoints (and
+        bookings made without a showtime) use.
+        """
+        return self.filter(movie_id=movie_id).select_related('movie', 'auditorium').order_by('id').first()
+    
+    async def aprimary_for(self, movie_id):
+        """Async variant of primary_for"""
+        return await self.filter(movie_id=movie_id).select_related('movie', 'auditorium').order_by('id').afirst()
+
+
+class Showtime(models.Model):
+    """One screening of a movie in an auditorium"""
+    # New movies get one showtime at this local time on their release date
+    DEFAULT_START = datetime.time(19, 0)
+    
+    movie = models.ForeignKey(Movie, on_delete=models.CASCADE, related_name='showtimes')
+    auditorium = models.ForeignKey(
+        Auditorium,
+        on_delete=models.CASCADE,
+        related_name='showtimes'
+    )
+    starts_at = models.DateTimeField()
+    
+    objects = ShowtimeQuerySet.as_manager()
+    
+    def __str__(self):
+        return f"{self.movie.title} at {self.starts_at:%Y-%m-%d %H:%M} ({self.auditorium.name})"
+    
+    @classmethod
+    def default_start(cls, release_date):
+        """Aware start time of a movie's default showtime"""
+        release_date = Movie._meta.get_field('release_date').to_python(release_date)
+        return timezone.make_aware(datetime.datetime.combine(release_date, cls.DEFAULT_START))
+    
+    def save(self, *args, **kwargs):
+        """Screen in the default auditorium unless one is given"""
+        if self.auditorium_id is None:
+            self.auditorium = Auditorium.get_default()
+        super().save(*args, **kwargs)
+    
+    class Meta:
+        ordering = ['starts_at', 'id']
+        indexes = [
+            # Supports cursor pagination over (starts_at, id)
+            models.Index(fields=['starts_at', 'id'], name='showtime_starts_id_idx'),
+            models.Index(fields=['movie', 'starts_at'], name='showtime_movie_starts_idx'),
+        ]
+
+
+class SeatQuerySet(models.QuerySet):
+    """Queryset helpers for per-showtime seat availability"""
+    
+    def with_availability(self, showtime):
+        """
+        The showtime's auditorium seats, each annotated with
+        is_available_for_movie using EXISTS subqueries. Seats with an active
+        hold count as unavailable.
+        """
+        booked = Booking.objects.filter(showtime_id=showtime.id, seat=models.OuterRef('pk'))
+        held = SeatHold.objects.active().filter(showtime_id=showtime.id, seat=models.OuterRef('pk'))
+        return self.filter(auditorium_id=showtime.auditorium_id).annotate(
+            is_available_for_movie=~models.Exists(booked) & ~models.Exists(held)
+        )
+    
+    def available_for(self, showtime, booked_seat_ids=None):
+        """
+        Only the showtime's auditorium seats that are free, read from the
+        availability index. Async callers pass booked_seat_ids from
+        availability.abooked_seat_ids().
+        """
+        if booked_seat_ids is None:
+            from .availability import booked_seat_ids as lookup
+            booked_seat_ids = lookup(showtime.id)
+        
+        held = SeatHold.objects.active().filter(showtime_id=showtime.id).values('seat_id')
+        return (
+            self.filter(auditorium_id=showtime.auditorium_id)
+            .exclude(id__in=booked_seat_ids)
+            .exclude(id__in=held)
+            .annotate(
+                is_available_for_movie=models.Value(True, output_field=models.BooleanField())
+            )
+        )
 
 
 class Seat(models.Model):
-    seat_number = models.CharField(max_length=10, unique=True)
+    auditorium = models.ForeignKey(
+        Auditorium,
+        on_delete=models.CASCADE,
+        related_name='seats'
+    )
+    seat_number = models.CharField(max_length=10)
     is_booked = models.BooleanField(default=False)
+    # Layout position. row and column are derived from seat_number ("B12" is
+    # row 2, column 12) so seats sort naturally; see booking/layouts.py
+    section = models.CharField(max_length=50, blank=True, default='')
+    row = models.PositiveIntegerField(null=True, blank=True, editable=False)
+    column = models.PositiveIntegerField(null=True, blank=True, editable=False)
+    
+    objects = SeatQuerySet.as_manager()
     
     def __str__(self):
         return f"Seat {self.seat_number}"
     
+    def save(self, *args, **kwargs):
+        """Keep row and column in step with seat_number; default to the default auditorium"""
+        from .layouts import parse_seat_number
+        if self.auditorium_id is None:
+            self.auditorium = Auditorium.get_default()
+        self.row, self.column = parse_seat_number(self.seat_number)
+        super().save(*args, **kwargs)
+    
     class Meta:
-        ordering = ['seat_number']
+        # Natural order: A2 before A10, rows after Z continue with AA
+        ordering = ['section', 'row', 'column', 'seat_number']
+        # Seat numbers repeat across rooms; the index also serves per-room seat maps
+        unique_together = ['auditorium', 'seat_number']
+        indexes = [
+            # Seat maps and layouts, per room in display order
+            models.Index(fields=['auditorium', 'section', 'row', 'column'], name='seat_layout_idx'),
+            # Partial index for GET /api/seats/available/, in display order
+            models.Index(
+                fields=['section', 'row', 'column', 'seat_number'],
+                condition=models.Q(is_booked=False),
+                name='seat_free_order_idx'
+            ),
+        ]
+
+
+class BookingQuerySet(models.QuerySet):
+    """Queryset helpers for bookings"""
+    
+    def with_related(self):
+        """Join the movie, seat and user so listing bookings is one query"""
+        return self.select_related('movie', 'seat', 'user')
+
+
+def _fill_showtime(instance):
+    """Default a booking or hold to the movie's primary showtime, and copy the movie from the showtime"""
+    if instance.showtime_id is None and instance.movie_id is not None:
+        instance.showtime = Showtime.objects.primary_for(instance.movie_id)
+    elif instance.movie_id is None and instance.showtime_id is not None:
+        instance.movie_id = instance.showtime.movie_id
 
 
 class Booking(models.Model):
+    # Denormalized from showtime.movie for per-movie counters, filters and events
     movie = models.ForeignKey(Movie, on_delete=models.CASCADE, related_name='bookings')
+    showtime = models.ForeignKey(Showtime, on_delete=models.CASCADE, related_name='bookings')
     seat = models.ForeignKey(Seat, on_delete=models.CASCADE, related_name='bookings')
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='bookings')
     booking_date = models.DateTimeField(auto_now_add=True)
     
+    objects = BookingQuerySet.as_manager()
+    
     def __str__(self):
         return f"{self.user.username} - {self.movie.title} - {self.seat.seat_number}"
     
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember where the booking is, so the post_save signal can tell a move
+        instance._saved_location = instance.location()
+        return instance
+    
+    def location(self):
+        """(movie_id, showtime_id, seat_id) as currently set on the instance"""
+        return tuple(self.__dict__.get(name) for name in ('movie_id', 'showtime_id', 'seat_id'))
+    
+    def save(self, *args, **kwargs):
+        _fill_showtime(self)
+        super().save(*args, **kwargs)
+    
+    class Meta:
+        ordering = ['-booking_date', '-id']
+        unique_together = ['showtime', 'seat']  # Prevent double-booking the same seat for a showtime
+        indexes = [
+            # Support cursor pagination over (booking_date, id), for staff and per user
+            models.Index(fields=['-booking_date', '-id'], name='booking_date_id_idx'),
+            models.Index(fields=['user', '-booking_date', '-id'], name='booking_user_date_id_idx'),
+        ]
+
+class SeatAvailabilityIndex(models.Model):
+    """
+    Per-showtime bitmap of booked seats.
+    Bit N is set when the seat with id base_seat_id + N is booked for the
+    showtime. Seat ids are global, so each room's seats sit in their own id
+    range; the base keeps the bitmap as long as the booked id range rather
+    than the highest seat id.
+    """
+    showtime = models.OneToOneField(
+        Showtime,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='seat_index'
+    )
+    bitmap = models.BinaryField(default=b'')
+    # Seat id of bit 0, a multiple of 8; set_seats() maintains it
+    base_seat_id = models.PositiveBigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    def __str__(self):
+        return f"Seat index for showtime {self.showtime_id}"
+    
+    def is_booked(self, seat_id):
+        """Check whether a single seat bit is set"""
+        byte_index, bit = divmod(seat_id - self.base_seat_id, 8)
+        bitmap = bytes(self.bitmap)
+        if not 0 <= byte_index < len(bitmap):
+            return False
+        return bool(bitmap[byte_index] & (1 << bit))
+    
+    def booked_seat_ids(self):
+        """Return the set of seat ids whose bits are set"""
+        booked = set()
+        for byte_index, byte in enumerate(bytes(self.bitmap)):
+            if not byte:
+                continue
+            for bit in range(8):
+                if byte & (1 << bit):
+                    booked.add(self.base_seat_id + byte_index * 8 + bit)
+        return booked
+    
+    def set_seats(self, seat_ids, booked=True):
+        """Set or clear the bits for the given seat ids"""
+        seat_ids = list(seat_ids)
+        bitmap = bytearray(self.bitmap)
+        base = self.base_seat_id if bitmap else None
+        if booked and seat_ids:
+            # Move the base down (or set it) to cover the lowest new seat
+            lowest = min(seat_ids) // 8 * 8
+            if base is None:
+                base = lowest
+            elif lowest < base:
+                bitmap[0:0] = bytes((base - lowest) // 8)
+                base = lowest
+        if base is None:
+            return
+        
+        for seat_id in seat_ids:
+            byte_index, bit = divmod(seat_id - base, 8)
+            if not 0 <= byte_index < len(bitmap):
+                if not booked:
+                    continue
+                bitmap.extend(b'\x00' * (byte_index + 1 - len(bitmap)))
+            if booked:
+                bitmap[byte_index] |= (1 << bit)
+            else:
+                bitmap[byte_index] &= ~(1 << bit) & 0xFF
+        
+        # Trim empty bytes at both ends, moving the base past leading ones
+        trimmed = bitmap.lstrip(b'\x00')
+        base += (len(bitmap) - len(trimmed)) * 8
+        self.bitmap = bytes(trimmed.rstrip(b'\x00'))
+        self.base_seat_id = base if self.bitmap else 0
+
+
+
+class SeatHoldQuerySet(models.QuerySet):
+    """Queryset helpers for seat holds"""
+    
+    def active(self):
+        """Holds that have not expired yet"""
+        return self.filter(expires_at__gt=timezone.now())
+    
+    def expired(self):
+        """Holds past their expiry time (removed lazily)"""
+        return self.filter(expires_at__lte=timezone.now())
+
+
+class SeatHold(models.Model):
+    """
+    Short-lived reservation of a seat for a showtime while a user checks out.
+    Expired holds are ignored by availability queries and deleted lazily.
+    """
+    # Denormalized from showtime.movie, like Booking.movie
+    movie = models.ForeignKey(Movie, on_delete=models.CASCADE, related_name='holds')
+    showtime = models.ForeignKey(Showtime, on_delete=models.CASCADE, related_name='holds')
+    seat = models.ForeignKey(Seat, on_delete=models.CASCADE, related_name='holds')
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='seat_holds')
+    created_at = models.DateTimeField(auto_now_add=True)
+    expires_at = models.DateTimeField()
+    
+    objects = SeatHoldQuerySet.as_manager()
+    
+    def __str__(self):
+        return f"{self.user.username} holds {self.seat.seat_number} for {self.movie.title}"
+    
+    @property
+    def is_active(self):
+        return self.expires_at > timezone.now()
+    
+    def save(self, *args, **kwargs):
+        _fill_showtime(self)
+        super().save(*args, **kwargs)
+    
+    class Meta:
+        ordering = ['expires_at']
+        unique_together = ['showtime', 'seat']  # At most one hold per seat per showtime
+        indexes = [
+            models.Index(fields=['movie', 'expires_at']),
+            models.Index(fields=['showtime', 'expires_at']),
+        ]
+
+
+
+class BookingRequestQuerySet(models.QuerySet):
+    """Queryset helpers for queued booking requests"""
+    
+    def pending(self):
+        """Requests the worker has not processed yet, in arrival order"""
+        return self.filter(status=BookingRequest.PENDING).order_by('id')
+
+
+class BookingRequest(models.Model):
+    """
+    A booking accepted in queued mode (settings.BOOKING_QUEUE_ENABLED) and
+    waiting for the process_booking_queue worker; see booking/bookingqueue.py.
+    The ticket is what the client polls the status endpoint with.
+    """
+    PENDING = 'pending'
+    BOOKED = 'booked'
+    REJECTED = 'rejected'
+    STATUS_CHOICES = [
+        (PENDING, 'Pending'),
+        (BOOKED, 'Booked'),
+        (REJECTED, 'Rejected'),
+    ]
+    
+    ticket = models.UUIDField(default=uuid.uuid4, unique=True, editable=False)
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='booking_requests')
+    # Plain references rather than constraints, so deleting a movie, seat or
+    # booking does not have to update this log. The worker rejects requests
+    # whose movie or seat is gone, and booking stays set after a cancellation.
+    movie = models.ForeignKey(
+        Movie, on_delete=models.DO_NOTHING, db_constraint=False, null=True, blank=True, related_name='+'
+    )
+    showtime = models.ForeignKey(
+        Showtime, on_delete=models.DO_NOTHING, db_constraint=False, null=True, blank=True, related_name='+'
+    )
+    seat = models.ForeignKey(Seat, on_delete=models.DO_NOTHING, db_constraint=False, related_name='+')
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=PENDING)
+    # Why a rejected request was rejected, as the booking endpoint would have said it
+    error = models.TextField(blank=True)
+    booking = models.ForeignKey(
+        Booking, on_delete=models.DO_NOTHING, db_constraint=False, null=True, blank=True, related_name='+'
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    processed_at = models.DateTimeField(null=True, blank=True)
+    
+    objects = BookingRequestQuerySet.as_manager()
+    
+    def __str__(self):
+        return f"Booking request {self.ticket} ({self.status})"
+    
+    class Meta:
+        ordering = ['id']
+        indexes = [
+            # The worker's scan: pending requests in arrival order
+            models.Index(fields=['id'], condition=models.Q(status='pending'), name='booking_request_pending_idx'),
+        ]
+
+
+
+class TheaterStats(models.Model):
+    """
+    Single-row table of theater-wide counters, so seat totals do not need a
+    COUNT over the seat table. Maintained by booking/counters.py.
+    """
+    seat_count = models.PositiveIntegerField(default=0)
+    # Bumped on every Movie or Seat edit; part of every ETag
+    catalog_version = models.PositiveBigIntegerField(default=0)
+    
+    def __str__(self):
+        return f"Theater stats ({self.seat_count} seats)"
+    
     class Meta:
-        ordering = ['-booking_date']
-        unique_together = ['movie', 'seat']  # Prevent double-booking the same seat for a movie
\ No newline at end of file
+        verbose_name_plural = 'theater stats'
@@ -0,0 +1,124 @@
+import json
+from asgiref.sync import sync_to_async
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import Cursor, CursorPagination
+
+
+def _reverse_ordering(ordering):
+    return tuple(item[1:] if item.startswith('-') else '-' + item for item in ordering)
+
+
+class KeysetCursorPagination(CursorPagination):
+    """
+    Keyset pagination over the whole ordering, e.g. (release_date, id).
+
+    DRF's CursorPagination only keeps the first column in the cursor and
+    skips rows that share its value with an OFFSET, which gets slower (and
+    past offset_cutoff, wrong) inside long runs of equal values. Here the
+    cursor holds every ordering column of the row at the page edge and the
+    page starts with WHERE (col, id) < (x, y), spelled out with Q objects,
+    so every page is one index range scan. The last ordering column must be
+    unique. Links, page sizes and the response shape are DRF's.
+    """
+    page_size = 50
+    page_size_query_param = 'page_size'
+    max_page_size = 500
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+
+        self.base_url = request.build_absolute_uri()
+        self.ordering = self.get_ordering(request, queryset, view)
+        self.cursor = self.decode_cursor(request)
+        reverse = self.cursor is not None and self.cursor.reverse
+        position = self._cursor_position()
+
+        ordering = _reverse_ordering(self.ordering) if reverse else self.ordering
+        queryset = queryset.order_by(*ordering)
+        if position is not None:
+            queryset = queryset.filter(self._after(ordering, position))
+
+        # One extra row tells whether there is another page in this direction
+        results = list(queryset[:self.page_size + 1])
+        self.page = results[:self.page_size]
+        has_more = len(results) > self.page_size
+        if reverse:
+            self.page.reverse()
+            self.has_next, self.has_previous = True, has_more
+        else:
+            self.has_next, self.has_previous = has_more, position is not None
+
+        if self.page:
+            self.next_position = self._position(self.page[-1])
+            self.previous_position = self._position(self.page[0])
+        else:
+            self.next_position = self.previous_position = position
+
+        if (self.has_previous or self.has_next) and self.template is not None:
+            self.display_page_controls = True
+        return self.page
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        """Async variant of paginate_queryset; the page query runs in the ORM's thread"""
+        return await sync_to_async(self.paginate_queryset)(queryset, request, view)
+
+    def _cursor_position(self):
+        if self.cursor is None or self.cursor.position is None:
+            return None
+        try:
+            position = json.loads(self.cursor.position)
+        except ValueError:
+            raise NotFound(self.invalid_cursor_message)
+        if not isinstance(position, list) or len(position) != len(self.ordering):
+            raise NotFound(self.invalid_cursor_message)
+        return position
+
+    def _position(self, instance):
+        """The instance's ordering values, as strings the ORM parses back"""
+        fields = [item.lstrip('-') for item in self.ordering]
+        if isinstance(instance, dict):
+            return [str(instance[field]) for field in fields]
+        return [str(getattr(instance, field)) for field in fields]
+
+    @staticmethod
+    def _after(ordering, position):
+        """Rows after position in ordering: (a, b) > (x, y) is a > x OR (a = x AND b > y)"""
+        condition = Q()
+        equal = {}
+        for item, value in zip(ordering, position):
+            field = item.lstrip('-')
+            lookup = 'lt' if item.startswith('-') else 'gt'
+            condition |= Q(**equal, **{f'{field}__{lookup}': value})
+            equal[field] = value
+        return condition
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        position = json.dumps(self.next_position) if self.next_position is not None else None
+        return self.encode_cursor(Cursor(offset=0, reverse=False, position=position))
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        position = json.dumps(self.previous_position) if self.previous_position is not None else None
+        return self.encode_cursor(Cursor(offset=0, reverse=True, position=position))
+
+
+class MovieCursorPagination(KeysetCursorPagination):
+    """Keyset pagination over (release_date, id), matching Movie.Meta.ordering"""
+    ordering = ('-release_date', '-id')
+
+
+class BookingCursorPagination(KeysetCursorPagination):
+    """Keyset pagination over (booking_date, id), matching Booking.Meta.ordering"""
+    ordering = ('-booking_date', '-id')
+
+
+class ShowtimeCursorPagination(KeysetCursorPagination):
+    """Keyset pagination over (starts_at, id), matching Showtime.Meta.ordering"""
+    ordering = ('starts_at', 'id')
@@ -0,0 +1,100 @@
+"""
+Per-endpoint SQL query budgets.
+
+Viewsets declare a maximum number of queries per action with
+QueryBudgetMixin.query_budgets, and function views use the @query_budget
+decorator. Budgets are only checked when settings.QUERY_BUDGETS_ENFORCED
+is on (it follows DEBUG by default), so production pays nothing for them.
+Queries on every database alias count, including reads that
+booking/dbrouter.py sends to a replica.
+"""
+from contextlib import ExitStack, contextmanager
+from functools import wraps
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.test.utils import CaptureQueriesContext
+
+
+class QueryBudgetExceeded(Exception):
+    """Raised when a view runs more SQL queries than its declared budget"""
+    
+    def __init__(self, label, budget, queries):
+        self.label = label
+        self.budget = budget
+        self.queries = queries
+        lines = [
+            f"{label} ran {len(queries)} queries, budget is {budget}:"
+        ]
+        for i, q in enumerate(queries, start=1):
+            alias = q.get('alias', DEFAULT_DB_ALIAS)
+            prefix = '' if alias == DEFAULT_DB_ALIAS else f"[{alias}] "
+            lines.append(f"{i}. {prefix}{q['sql']}")
+        super().__init__("\n".join(lines))
+
+
+def budgets_enforced():
+    return getattr(settings, 'QUERY_BUDGETS_ENFORCED', settings.DEBUG)
+
+
+@contextmanager
+def capture_queries():
+    """
+    Capture the queries run on every database alias. Yields a list that is
+    filled in when the block exits, each query tagged with its alias.
+    """
+    queries = []
+    with ExitStack() as stack:
+        contexts = {
+            alias: stack.enter_context(CaptureQueriesContext(connections[alias]))
+            for alias in connections
+        }
+        yield queries
+    for alias, ctx in contexts.items():
+        queries.extend(dict(query, alias=alias) for query in ctx.captured_queries)
+
+
+def check_budget(label, budget, queries):
+    """Raise QueryBudgetExceeded if more than budget queries were captured"""
+    if budget is not None and len(queries) > budget:
+        raise QueryBudgetExceeded(label, budget, list(queries))
+
+
+class QueryBudgetMixin:
+    """
+    ViewSet mixin enforcing a per-action query budget.
+    
+    query_budgets maps action names to the maximum number of queries the
+    whole request may run, including the two session authentication
+    queries. Actions without an entry are not checked.
+    """
+    query_budgets = {}
+    
+    def dispatch(self, request, *args, **kwargs):
+        if not budgets_enforced():
+            return super().dispatch(request, *args, **kwargs)
+        
+        with capture_queries() as queries:
+            response = super().dispatch(request, *args, **kwargs)
+        action = getattr(self, 'action', None)
+        check_budget(
+            f"{self.__class__.__name__}.{action}",
+            self.query_budgets.get(action),
+            queries
+        )
+        return response
+
+
+def query_budget(budget):
+    """Decorator enforcing a query budget on a function-based view"""
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if not budgets_enforced():
+                return view(request, *args, **kwargs)
+            
+            with capture_queries() as queries:
+                response = view(request, *args, **kwargs)
+            check_budget(view.__name__, budget, queries)
+            return response
+        return wrapper
+    return decorator
@@ -0,0 +1,111 @@
+"""
+Versioned cache for read responses, on top of Django's cache framework.
+
+Entries are keyed by the same version tags as the ETags in etags.py:
+TheaterStats.catalog_version for the movie list (bumped on every Movie,
+Showtime and Seat change) and the movie's seat_version for its detail.
+A change therefore makes new keys instead of invalidating old ones, and
+a plain per-process cache such as LocMemCache never serves stale data.
+The per-endpoint TTLs in settings.RESPONSE_CACHE_TTLS only bound how
+long unused versions linger.
+
+Hits and misses are counted per endpoint in this process (see stats()) and
+in booking_response_cache_requests_total at /metrics.
+"""
+import hashlib
+import threading
+from collections import Counter
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework.response import Response
+from . import metrics
+
+CACHE_ALIAS = 'responses'
+DEFAULT_TTL = 60
+
+_missing = object()
+_lock = threading.Lock()
+_hits = Counter()
+_misses = Counter()
+
+
+def _cache():
+    return caches[CACHE_ALIAS]
+
+
+def _key(endpoint, tag, variant):
+    digest = hashlib.sha256(f'{tag}|{variant}'.encode()).hexdigest()
+    return f'response:{endpoint}:{digest}'
+
+
+def _count(counter, endpoint):
+    with _lock:
+        counter[endpoint] += 1
+
+
+def get_or_set(endpoint, tag, variant, compute):
+    """
+    Return the cached value for endpoint at version tag, or compute(),
+    store and return it. variant separates entries of one version, e.g.
+    the request URL for a paginated list. compute() may return None to
+    skip caching.
+    """
+    key = _key(endpoint, tag, variant)
+    value = _cache().get(key, _missing)
+    if value is not _missing:
+        _count(_hits, endpoint)
+        metrics.RESPONSE_CACHE.inc(endpoint=endpoint, result='hit')
+        return value
+    
+    _count(_misses, endpoint)
+    metrics.RESPONSE_CACHE.inc(endpoint=endpoint, result='miss')
+    value = compute()
+    if value is not None:
+        ttl = getattr(settings, 'RESPONSE_CACHE_TTLS', {}).get(endpoint, DEFAULT_TTL)
+        _cache().set(key, value, ttl)
+    return value
+
+
+def stats():
+    """{endpoint: {'hits': n, 'misses': n}} for this process"""
+    with _lock:
+        endpoints = set(_hits) | set(_misses)
+        return {
+            endpoint: {'hits': _hits[endpoint], 'misses': _misses[endpoint]}
+            for endpoint in sorted(endpoints)
+        }
+
+
+def reset_stats():
+    with _lock:
+        _hits.clear()
+        _misses.clear()
+
+
+class ResponseCacheMixin:
+    """
+    Cache the response data of the actions listed in response_cache, which
+    maps an action name to an endpoint name for RESPONSE_CACHE_TTLS.
+    
+    Goes after ConditionalGetMixin and keys each entry by the ETag it
+    computed, so only responses that get an ETag are cached. Handlers opt
+    in by returning self.cached_response(handler, request, ...).
+    """
+    response_cache = {}
+    
+    def cached_response(self, handler, request, *args, **kwargs):
+        endpoint = self.response_cache.get(self.action)
+        tag = getattr(self, 'response_etag', None)
+        if endpoint is None or tag is None:
+            return handler(request, *args, **kwargs)
+        
+        response = None
+        
+        def compute():
+            nonlocal response
+            response = handler(request, *args, **kwargs)
+            return response.data if response.status_code == 200 else None
+        
+        # The URL keeps pages and hosts (in pagination links) apart
+        data = get_or_set(endpoint, tag, request.build_absolute_uri(), compute)
+        return response if response is not None else Response(data)
@@ -0,0 +1,148 @@
+"""
+Process-local cache of the seat table for the seat map reads.
+
+Seats change rarely, so each worker keeps all of them in memory, grouped
+by auditorium in display order. A seat map is then the cached seats
+of the showtime's auditorium minus the booked ids from the availability
+index and the active holds, worked out in Python instead of re-reading
+booking_seat on every request.
+
+The cache is tagged with TheaterStats.catalog_version, which every Seat
+change bumps. availability.get_index() reads the current version in the
+same query as the index, so changes made by other workers are noticed
+without an extra query; the Seat signals also drop this worker's copy
+straight away. A catalog read inside a transaction is used but never
+stored, since the transaction might still roll back.
+"""
+import copy
+from asgiref.sync import sync_to_async
+from django.db import connection
+from .models import Seat, SeatHold, TheaterStats
+from . import availability
+from . import counters
+
+_catalog = None
+
+
+class SeatCatalog:
+    """Every seat, by id and by auditorium in display order"""
+    
+    def __init__(self, version, seats):
+        self.version = version
+        self.by_id = {seat.id: seat for seat in seats}
+        self.by_auditorium = {}
+        for seat in seats:
+            self.by_auditorium.setdefault(seat.auditorium_id, []).append(seat)
+    
+    def seats_in(self, auditorium_id):
+        return self.by_auditorium.get(auditorium_id, [])
+
+
+def invalidate():
+    """Forget this worker's catalog; the next read reloads it"""
+    global _catalog
+    _catalog = None
+
+
+def _all_seats():
+    """Every seat in Seat.Meta.ordering order, id breaking ties"""
+    return Seat.objects.order_by(*Seat._meta.ordering, 'id')
+
+
+def _current_version():
+    return (
+        TheaterStats.objects.filter(pk=counters.STATS_PK)
+        .values_list('catalog_version', flat=True)
+        .first()
+    )
+
+
+def get_catalog(version=None):
+    """
+    The seat catalog as of version (the current catalog_version, read
+    here if not given), reloading the cached copy if it is older.
+    """
+    global _catalog
+    if version is None:
+        version = _current_version()
+    catalog = _catalog
+    if catalog is not None and version is not None and catalog.version == version:
+        return catalog
+    
+    # Read after the version, so a concurrent change can only make the
+    # cache look older than it is, never newer
+    catalog = SeatCatalog(version, list(_all_seats()))
+    if version is not None and not connection.in_atomic_block:
+        _catalog = catalog
+    return catalog
+
+
+async def aget_catalog(version=None):
+    """Async variant of get_catalog; a reload runs in a thread"""
+    catalog = _catalog
+    if catalog is not None and version is not None and catalog.version == version:
+        return catalog
+    return await sync_to_async(get_catalog)(version)
+
+
+def _with_availability(seats, unavailable):
+    """
+    Copies of the cached seats flagged with is_available_for_movie, like
+    Seat.objects.with_availability(); the cached instances stay untouched.
+    """
+    result = []
+    for seat in seats:
+        seat = copy.copy(seat)
+        seat.is_available_for_movie = seat.id not in unavailable
+        result.append(seat)
+    return result
+
+
+def _held_seat_ids(showtime):
+    return (
+        SeatHold.objects.active().filter(showtime_id=showtime.id)
+        .order_by()
+        .values_list('seat_id', flat=True)
+    )
+
+
+def _catalog_and_unavailable(showtime):
+    """The current catalog and the ids of the showtime's booked or held seats"""
+    index = availability.get_index(showtime.id)
+    catalog = get_catalog(getattr(index, 'catalog_version', None))
+    return catalog, index.booked_seat_ids() | set(_held_seat_ids(showtime))
+
+
+def seat_map(showtime):
+    """Every seat of the showtime's auditorium, flagged with is_available_for_movie"""
+    catalog, unavailable = _catalog_and_unavailable(showtime)
+    return _with_availability(catalog.seats_in(showtime.auditorium_id), unavailable)
+
+
+def availability_flags(showtime):
+    """
+    (catalog, flags): whether each seat of the showtime's auditorium is
+    available, in catalog.seats_in() order. No seat is copied.
+    """
+    catalog, unavailable = _catalog_and_unavailable(showtime)
+    return catalog, [seat.id not in unavailable for seat in catalog.seats_in(showtime.auditorium_id)]
+
+
+async def aseat_map(showtime):
+    """Async variant of seat_map"""
+    index = await availability.aget_index(showtime.id)
+    catalog = await aget_catalog(getattr(index, 'catalog_version', None))
+    unavailable = index.booked_seat_ids() | {
+        seat_id async for seat_id in _held_seat_ids(showtime)
+    }
+    return _with_availability(catalog.seats_in(showtime.auditorium_id), unavailable)
+
+
+def available_seats(showtime):
+    """The free seats of the showtime's auditorium, like Seat.objects.available_for()"""
+    return [seat for seat in seat_map(showtime) if seat.is_available_for_movie]
+
+
+async def aavailable_seats(showtime):
+    """Async variant of available_seats"""
+    return [seat for seat in await aseat_map(showtime) if seat.is_available_for_movie]
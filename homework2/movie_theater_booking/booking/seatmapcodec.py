@@ -0,0 +1,65 @@
+"""
+Compact encodings for seat availability vectors.
+
+A compact seat map sends the auditorium's seat order once (the layout,
+cacheable per catalog version) and the availability of each seat in that
+order as one of:
+
+- BITSET: base64 of one bit per seat, most significant bit first, 1 for
+  available. 500 seats take 84 characters.
+- RUNS: run lengths alternating available/unavailable, starting with an
+  available run (which may be 0). Short for mostly free or full rooms.
+
+The decoders are the reference for clients; seat_booking.html implements
+the same in JavaScript.
+"""
+import base64
+
+BITSET = 'bitset'
+RUNS = 'rle'
+ENCODINGS = (BITSET, RUNS)
+
+
+def encode_bitset(flags):
+    data = bytearray((len(flags) + 7) // 8)
+    for i, flag in enumerate(flags):
+        if flag:
+            data[i >> 3] |= 0x80 >> (i & 7)
+    return base64.b64encode(bytes(data)).decode('ascii')
+
+
+def decode_bitset(value, count):
+    data = base64.b64decode(value)
+    return [bool(data[i >> 3] & (0x80 >> (i & 7))) for i in range(count)]
+
+
+def encode_runs(flags):
+    runs = []
+    current = True
+    length = 0
+    for flag in flags:
+        if flag == current:
+            length += 1
+        else:
+            runs.append(length)
+            current = flag
+            length = 1
+    if length or not runs:
+        runs.append(length)
+    return runs
+
+
+def decode_runs(runs):
+    flags = []
+    for i, length in enumerate(runs):
+        flags.extend([i % 2 == 0] * length)
+    return flags
+
+
+def encode(flags, encoding):
+    """Encode flags with encoding (BITSET or RUNS)"""
+    if encoding == BITSET:
+        return encode_bitset(flags)
+    if encoding == RUNS:
+        return encode_runs(flags)
+    raise ValueError(f"Unknown seat map encoding: {encoding}")
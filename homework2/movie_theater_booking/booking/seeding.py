@@ -0,0 +1,212 @@
+"""
+Synthetic data at production scale, for reproducing slow paths locally.
+
+seed() inserts users, auditoriums full of seats, movies with showtimes and
+bookings with batched bulk_create. Rows are generated lazily and written
+batch by batch, so only the ids needed to link later tables (users,
+showtimes and the seats of each room) stay in memory, never the bookings.
+The same seed on the same starting database gives the same data.
+
+bulk_create skips the model signals, so the denormalized state they keep
+is written directly: each showtime's availability index is built from the
+seats chosen for it, Movie.booked_count from the per-movie totals, and the
+seat counts and catalog version are refreshed at the end.
+"""
+import random
+import time
+from collections import Counter
+from datetime import timedelta
+from itertools import islice
+from django.contrib.auth.hashers import UNUSABLE_PASSWORD_PREFIX
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.utils import timezone
+from .models import Movie, Auditorium, Showtime, Booking, SeatAvailabilityIndex, Seat
+from . import counters
+from . import layouts
+from . import seatcatalog
+
+BATCH_SIZE = 5000
+SEATS_PER_ROW = 25
+
+TITLE_WORDS = [
+    'Midnight', 'Return', 'Silent', 'Empire', 'Last', 'Star', 'River', 'Shadow', 'Golden',
+    'Iron', 'Lost', 'City', 'Winter', 'Dream', 'Storm', 'Secret', 'Machine', 'Ocean',
+    'Garden', 'Fire', 'Glass', 'Northern', 'Echo', 'Harbor', 'Signal', 'Paper', 'Wild',
+]
+
+
+class SeedError(ValueError):
+    """The database already holds data for this seed"""
+
+
+def batched(iterable, size):
+    """Lists of up to size items from iterable, consumed lazily"""
+    iterator = iter(iterable)
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+
+def bulk_insert(model, objects, batch_size=BATCH_SIZE):
+    """bulk_create objects batch by batch; returns the primary keys created"""
+    ids = []
+    for batch in batched(objects, batch_size):
+        ids.extend(obj.pk for obj in model.objects.bulk_create(batch))
+    return ids
+
+
+class Seeder:
+    """
+    One seeding run. Each step records how many rows it wrote and how long
+    it took in self.report.
+    """
+    
+    def __init__(self, seed=0, batch_size=BATCH_SIZE, progress=None):
+        self.seed = seed
+        self.rng = random.Random(seed)
+        self.batch_size = batch_size
+        self.progress = progress or (lambda step, result: None)
+        self.report = {}
+        self.today = timezone.now().date()
+    
+    def step(self, name, func, *args):
+        start = time.perf_counter()
+        with transaction.atomic():
+            rows = func(*args)
+        elapsed = time.perf_counter() - start
+        self.report[name] = {
+            'rows': rows,
+            'seconds': round(elapsed, 3),
+            'rows_per_second': round(rows / elapsed) if elapsed else None,
+        }
+        self.progress(name, self.report[name])
+    
+    def users(self, count):
+        password = f'{UNUSABLE_PASSWORD_PREFIX}seed'
+        self.user_ids = bulk_insert(User, (
+            User(username=f'seed{self.seed}_user{i}', password=password)
+            for i in range(count)
+        ), self.batch_size)
+        return len(self.user_ids)
+    
+    def seats(self, count, seats_per_room):
+        """Rooms of seats_per_room seats (the last one smaller) holding count seats"""
+        self.room_seat_ids = {}
+        created = 0
+        room = 0
+        while created < count:
+            room += 1
+            size = min(seats_per_room, count - created)
+            auditorium = Auditorium.objects.create(name=f'Seed {self.seed} room {room}')
+            rows = -(-size // SEATS_PER_ROW)
+            seats = layouts.layout_seats(auditorium, rows, SEATS_PER_ROW)[:size]
+            self.room_seat_ids[auditorium.id] = bulk_insert(Seat, seats, self.batch_size)
+            created += size
+        return created
+    
+    def movies(self, count, showtimes_per_movie):
+        """Movies released from half a year ago to a year ahead, each with its showtimes"""
+        rng = self.rng
+        room_ids = sorted(self.room_seat_ids) or [Auditorium.get_default().id]
+        
+        def movies():
+            for i in range(count):
+                title = ' '.join(rng.sample(TITLE_WORDS, rng.randint(1, 3)))
+                yield Movie(
+                    title=f'{title} {i}',
+                    description=f'Seeded movie {i}',
+                    release_date=self.today + timedelta(days=rng.randint(-180, 365)),
+                    duration=rng.randint(80, 180)
+                )
+        
+        self.showtimes = []  # (showtime id, movie id, auditorium id)
+        rows = 0
+        for batch in batched(movies(), self.batch_size):
+            batch = Movie.objects.bulk_create(batch)
+            showtimes = [
+                Showtime(
+                    movie=movie,
+                    auditorium_id=rng.choice(room_ids),
+                    starts_at=Showtime.default_start(movie.release_date) + timedelta(days=n)
+                )
+                for movie in batch
+                for n in range(showtimes_per_movie)
+            ]
+            for showtime in Showtime.objects.bulk_create(showtimes):
+                self.showtimes.append((showtime.id, showtime.movie_id, showtime.auditorium_id))
+            rows += len(batch)
+        return rows
+    
+    def bookings(self, count):
+        """
+        Spread count bookings evenly over the showtimes, each on distinct
+        seats of its room and by a random user, and build the index rows
+        """
+        rng = self.rng
+        showtimes = self.showtimes
+        if not self.user_ids:
+            count = 0
+        booked_counts = Counter()
+        indexes = []
+        
+        def bookings():
+            for position, (showtime_id, movie_id, auditorium_id) in enumerate(showtimes):
+                quota = count // len(showtimes) + (position < count % len(showtimes))
+                room = self.room_seat_ids.get(auditorium_id, [])
+                seat_ids = rng.sample(room, min(quota, len(room)))
+                
+                # Every showtime gets an index row, booked or not
+                index = SeatAvailabilityIndex(showtime_id=showtime_id)
+                index.set_seats(seat_ids, booked=True)
+                indexes.append(index)
+                booked_counts[movie_id] += len(seat_ids)
+                for seat_id in seat_ids:
+                    yield Booking(
+                        movie_id=movie_id,
+                        showtime_id=showtime_id,
+                        seat_id=seat_id,
+                        user_id=rng.choice(self.user_ids)
+                    )
+                if len(indexes) >= self.batch_size:
+                    SeatAvailabilityIndex.objects.bulk_create(indexes)
+                    indexes.clear()
+        
+        rows = 0
+        for batch in batched(bookings(), self.batch_size):
+            Booking.objects.bulk_create(batch)
+            rows += len(batch)
+        SeatAvailabilityIndex.objects.bulk_create(indexes)
+        Movie.objects.bulk_update(
+            [Movie(id=movie_id, booked_count=total) for movie_id, total in booked_counts.items() if total],
+            ['booked_count'],
+            batch_size=self.batch_size
+        )
+        return rows
+    
+    def finish(self):
+        """Refresh the seat counts and catalog version the signals would have kept"""
+        counters.repair_seat_count()
+        counters.bump_catalog()
+        seatcatalog.invalidate()
+
+
+def seed(users, movies, seats, bookings, showtimes_per_movie=1, seats_per_room=500,
+         seed=0, batch_size=BATCH_SIZE, progress=None):
+    """
+    Insert the given volumes of synthetic data; returns the per-step report.
+    progress(step, result) is called after each step.
+    """
+    if User.objects.filter(username=f'seed{seed}_user0').exists() or \
+            Auditorium.objects.filter(name=f'Seed {seed} room 1').exists():
+        raise SeedError(f"The database already holds data for seed {seed}; pick another --seed.")
+    
+    seeder = Seeder(seed, batch_size, progress)
+    seeder.step('users', seeder.users, users)
+    seeder.step('seats', seeder.seats, seats, seats_per_room)
+    seeder.step('movies', seeder.movies, movies, showtimes_per_movie)
+    seeder.step('bookings', seeder.bookings, bookings)
+    seeder.finish()
+    return seeder.report
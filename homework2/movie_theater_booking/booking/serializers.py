@@ -1,5 +1,12 @@
+from contextlib import contextmanager
 from rest_framework import serializers
-from .models import Movie, Seat, Booking
+from rest_framework.settings import api_settings
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from .models import Movie, Auditorium, Showtime, Seat, Booking, SeatHold, BookingRequest
+from . import counters
+from . import layouts
+from . import metrics
 from django.contrib.auth.models import User
 
 
@@ -18,19 +25,132 @@ class MovieSerializer(serializers.ModelSerializer):
         return value
 
 
+class AuditoriumSerializer(serializers.ModelSerializer):
+    """Serializer for Auditorium model"""
+    
+    class Meta:
+        model = Auditorium
+        fields = ['id', 'name', 'seat_count']
+        read_only_fields = ['id', 'seat_count']
+
+
+class CurrentOrDefaultAuditorium:
+    """
+    Serializer field default: the instance's own auditorium on updates,
+    otherwise the default auditorium.
+    """
+    requires_context = True
+    
+    def __call__(self, serializer_field):
+        instance = serializer_field.parent.instance
+        if instance is not None:
+            return instance.auditorium
+        return Auditorium.get_default()
+    
+    def __repr__(self):
+        return '%s()' % self.__class__.__name__
+
+
+class ShowtimeSerializer(serializers.ModelSerializer):
+    """Serializer for Showtime model"""
+    
+    auditorium = serializers.PrimaryKeyRelatedField(
+        queryset=Auditorium.objects.all(),
+        default=CurrentOrDefaultAuditorium()
+    )
+    
+    class Meta:
+        model = Showtime
+        fields = ['id', 'movie', 'auditorium', 'starts_at']
+        read_only_fields = ['id']
+
+
 class SeatSerializer(serializers.ModelSerializer):
     """Serializer for Seat model"""
     
+    auditorium = serializers.PrimaryKeyRelatedField(
+        queryset=Auditorium.objects.all(),
+        default=CurrentOrDefaultAuditorium()
+    )
+    
     class Meta:
         model = Seat
-        fields = ['id', 'seat_number', 'is_booked']
-        read_only_fields = ['id']
+        fields = ['id', 'seat_number', 'is_booked', 'auditorium', 'section', 'row', 'column']
+        read_only_fields = ['id', 'row', 'column']
     
     def validate_seat_number(self, value):
         """Ensure seat number is not empty"""
         if not value or not value.strip():
             raise serializers.ValidationError("Seat number cannot be empty.")
         return value.strip()
+    
+    def validate_auditorium(self, value):
+        """Seats keep their auditorium; bookings and seat counts depend on it"""
+        if self.instance is not None and value.pk != self.instance.auditorium_id:
+            raise serializers.ValidationError("Seats cannot move to another auditorium.")
+        return value
+
+
+def resolve_showtime(movie, showtime):
+    """
+    Return the showtime a request is for. A movie on its own stands for the
+    movie's primary showtime, which keeps the movie-level API working.
+    """
+    if showtime is not None:
+        if movie is not None and showtime.movie_id != movie.id:
+            raise serializers.ValidationError("This showtime is not for the selected movie.")
+        return showtime
+    if movie is None:
+        raise serializers.ValidationError("Either a showtime or a movie is required.")
+    showtime = Showtime.objects.primary_for(movie.id)
+    if showtime is None:
+        raise serializers.ValidationError("This movie has no showtimes.")
+    return showtime
+
+
+def _check_seat_free(showtime, seat, user=None):
+    """
+    Raise a ValidationError unless the seat can be booked for the showtime.
+    Existing bookings are not looked up here; see booking_write().
+    """
+    if seat.auditorium_id != showtime.auditorium_id:
+        raise serializers.ValidationError(
+            "This seat is not in the showtime's auditorium."
+        )
+    
+    if user is not None:
+        holds = SeatHold.objects.active().filter(showtime=showtime, seat=seat).exclude(user=user)
+        if holds.exists():
+            metrics.BOOKING_CONFLICTS.inc(reason='held')
+            raise serializers.ValidationError(
+                "This seat is currently held by another customer."
+            )
+
+
+@contextmanager
+def booking_write(showtime, seat, instance=None):
+    """
+    Run a booking insert or update of instance in its own transaction (a
+    savepoint inside an outer one) and turn a (showtime, seat) unique
+    violation into the usual "already booked" error. The constraint is what
+    actually prevents double-booking, so the write is attempted without an
+    exists() query first, which would cost a round trip and still race.
+    Other integrity errors (e.g. the seat was deleted meanwhile) propagate.
+    """
+    try:
+        with transaction.atomic():
+            yield
+    except IntegrityError:
+        # The savepoint is rolled back, so a booking found now is someone else's
+        taken = Booking.objects.filter(showtime=showtime, seat=seat)
+        if instance is not None:
+            taken = taken.exclude(pk=instance.pk)
+        if not taken.exists():
+            raise
+        metrics.BOOKING_CONFLICTS.inc(reason='booked')
+        raise serializers.ValidationError({
+            api_settings.NON_FIELD_ERRORS_KEY: ["This seat is already booked for this movie."]
+        })
 
 
 class BookingSerializer(serializers.ModelSerializer):
@@ -46,6 +166,7 @@ class BookingSerializer(serializers.ModelSerializer):
         fields = [
             'id', 
             'movie', 
+            'showtime',
             'seat', 
             'user',
             'movie_title',
@@ -54,26 +175,30 @@ class BookingSerializer(serializers.ModelSerializer):
             'booking_date'
         ]
         read_only_fields = ['id', 'user', 'booking_date']
+        extra_kwargs = {
+            'movie': {'required': False},
+            'showtime': {'required': False},
+        }
+        # (showtime, seat) uniqueness is enforced by the database on write,
+        # see booking_write()
+        validators = []
     
     def validate(self, data):
         """
-        Check that the seat is not already booked for this movie
+        Resolve the showtime and check the seat is in its auditorium
         """
-        movie = data.get('movie')
-        seat = data.get('seat')
-        
         # For updates, exclude the current instance
         instance = getattr(self, 'instance', None)
         
-        query = Booking.objects.filter(movie=movie, seat=seat)
-        if instance:
-            query = query.exclude(pk=instance.pk)
-        
-        if query.exists():
-            raise serializers.ValidationError(
-                "This seat is already booked for this movie."
-            )
+        movie = data.get('movie', instance.movie if instance else None)
+        showtime = data.get('showtime')
+        if showtime is None and instance and movie.id == instance.movie_id:
+            showtime = instance.showtime
+        seat = data.get('seat', instance.seat if instance else None)
         
+        data['showtime'] = resolve_showtime(movie, showtime)
+        data['movie'] = data['showtime'].movie
+        _check_seat_free(data['showtime'], seat)
         return data
     
     def create(self, validated_data):
@@ -81,7 +206,15 @@ class BookingSerializer(serializers.ModelSerializer):
         request = self.context.get('request')
         if request and hasattr(request, 'user'):
             validated_data['user'] = request.user
-        return super().create(validated_data)
+        with booking_write(validated_data['showtime'], validated_data['seat']):
+            return super().create(validated_data)
+    
+    def update(self, instance, validated_data):
+        """Move the booking, reporting a taken seat like create does"""
+        showtime = validated_data.get('showtime', instance.showtime)
+        seat = validated_data.get('seat', instance.seat)
+        with booking_write(showtime, seat, instance):
+            return super().update(instance, validated_data)
 
 
 class BookingCreateSerializer(serializers.ModelSerializer):
@@ -89,18 +222,24 @@ class BookingCreateSerializer(serializers.ModelSerializer):
     
     class Meta:
         model = Booking
-        fields = ['movie', 'seat']
+        fields = ['movie', 'showtime', 'seat']
+        extra_kwargs = {
+            'movie': {'required': False},
+            'showtime': {'required': False},
+        }
+        # (showtime, seat) uniqueness is enforced by the database on write,
+        # see booking_write()
+        validators = []
     
     def validate(self, data):
-        """Check that the seat is not already booked for this movie"""
-        movie = data.get('movie')
-        seat = data.get('seat')
-        
-        if Booking.objects.filter(movie=movie, seat=seat).exists():
-            raise serializers.ValidationError(
-                "This seat is already booked for this movie."
-            )
+        """Check that the seat is free for the showtime (or the movie's primary showtime)"""
+        showtime = resolve_showtime(data.get('movie'), data.get('showtime'))
+        request = self.context.get('request')
+        user = request.user if request and hasattr(request, 'user') else None
+        _check_seat_free(showtime, data['seat'], user=user)
         
+        data['showtime'] = showtime
+        data['movie'] = showtime.movie
         return data
     
     def create(self, validated_data):
@@ -108,7 +247,50 @@ class BookingCreateSerializer(serializers.ModelSerializer):
         request = self.context.get('request')
         if request and hasattr(request, 'user'):
             validated_data['user'] = request.user
-        return super().create(validated_data)
+        # The insert, the index update in the Booking signals and the hold
+        # cleanup share one transaction
+        with booking_write(validated_data['showtime'], validated_data['seat']):
+            booking = super().create(validated_data)
+            # The seat is booked now, so any hold on it has served its purpose
+            SeatHold.objects.filter(showtime=booking.showtime, seat=booking.seat).delete()
+        return booking
+
+
+class BookingRequestSerializer(serializers.ModelSerializer):
+    """
+    A queued booking request: the same input as BookingCreateSerializer,
+    and the ticket and outcome as output. Only the ids are checked on
+    intake; the worker validates the booking itself (see bookingqueue.py).
+    """
+    
+    queue_position = serializers.SerializerMethodField()
+    
+    class Meta:
+        model = BookingRequest
+        fields = [
+            'ticket',
+            'movie',
+            'showtime',
+            'seat',
+            'status',
+            'error',
+            'booking',
+            'queue_position',
+            'created_at',
+            'processed_at'
+        ]
+        read_only_fields = ['ticket', 'status', 'error', 'booking', 'created_at', 'processed_at']
+    
+    def validate(self, data):
+        if data.get('movie') is None and data.get('showtime') is None:
+            raise serializers.ValidationError("Either a showtime or a movie is required.")
+        return data
+    
+    def get_queue_position(self, obj):
+        """Pending requests ahead of this one plus one, or None once processed"""
+        if obj.status != BookingRequest.PENDING:
+            return None
+        return BookingRequest.objects.pending().filter(id__lt=obj.id).count() + 1
 
 
 class MovieDetailSerializer(MovieSerializer):
@@ -122,13 +304,15 @@ class MovieDetailSerializer(MovieSerializer):
     
     def get_available_seats_count(self, obj):
         """Get count of available seats for this movie"""
-        booked_seats = Booking.objects.filter(movie=obj).count()
-        total_seats = Seat.objects.count()
-        return total_seats - booked_seats
+        # total_seats (seats across all showtimes) is annotated by MovieViewSet
+        total_seats = getattr(obj, 'total_seats', None)
+        if total_seats is None:
+            total_seats = counters.get_capacity(obj.id)
+        return total_seats - obj.booked_count
     
     def get_total_bookings(self, obj):
         """Get total number of bookings for this movie"""
-        return Booking.objects.filter(movie=obj).count()
+        return obj.booked_count
 
 
 class SeatAvailabilitySerializer(serializers.ModelSerializer):
@@ -142,7 +326,76 @@ class SeatAvailabilitySerializer(serializers.ModelSerializer):
     
     def get_is_available_for_movie(self, obj):
         """Check if seat is available for a specific movie (from context)"""
-        movie_id = self.context.get('movie_id')
-        if movie_id:
-            return not Booking.objects.filter(movie_id=movie_id, seat=obj).exists()
-        return not obj.is_booked
\ No newline at end of file
+        # Querysets from Seat.objects.with_availability() / available_for()
+        # already carry the answer, so no per-seat query is needed
+        annotated = getattr(obj, 'is_available_for_movie', None)
+        if annotated is not None:
+            return annotated
+        showtime_id = self.context.get('showtime_id')
+        if showtime_id:
+            return not Booking.objects.filter(showtime_id=showtime_id, seat=obj).exists()
+        return not obj.is_booked
+
+class ShowtimeTargetSerializer(serializers.Serializer):
+    """
+    Input naming a showtime, or a movie standing for its primary showtime.
+    The resolved Showtime ends up in validated_data['showtime'].
+    """
+    
+    movie = serializers.PrimaryKeyRelatedField(queryset=Movie.objects.all(), required=False)
+    showtime = serializers.PrimaryKeyRelatedField(
+        queryset=Showtime.objects.select_related('movie'),
+        required=False
+    )
+    
+    def validate(self, data):
+        data['showtime'] = resolve_showtime(data.get('movie'), data.get('showtime'))
+        return data
+
+
+class BulkBookingSerializer(ShowtimeTargetSerializer):
+    """Input serializer for booking several seats for one showtime at once"""
+    
+    seats = serializers.ListField(
+        child=serializers.IntegerField(min_value=1),
+        allow_empty=False,
+        max_length=100
+    )
+
+
+
+class SeatHoldSerializer(BulkBookingSerializer):
+    """Input serializer for holding seats for a showtime during checkout"""
+    
+    seconds = serializers.IntegerField(
+        min_value=1,
+        max_value=settings.SEAT_HOLD_MAX_SECONDS,
+        required=False
+    )
+
+
+class SeatReleaseSerializer(BulkBookingSerializer):
+    """Input serializer for releasing held seats"""
+
+
+class BookFromHoldSerializer(ShowtimeTargetSerializer):
+    """Input serializer for converting a user's holds into bookings"""
+
+
+class SeatLayoutSerializer(serializers.Serializer):
+    """Input serializer for generating an auditorium's seats row by row"""
+    
+    rows = serializers.IntegerField(min_value=1, max_value=702)  # A to ZZ
+    seats_per_row = serializers.IntegerField(min_value=1, max_value=999)
+    section = serializers.CharField(max_length=50, required=False, allow_blank=True, default='')
+    first_row = serializers.IntegerField(min_value=1, max_value=702, default=1)
+    
+    def validate(self, data):
+        """Keep the layout within the size and row label limits"""
+        if data['rows'] * data['seats_per_row'] > layouts.MAX_LAYOUT_SEATS:
+            raise serializers.ValidationError(
+                f"A layout can have at most {layouts.MAX_LAYOUT_SEATS} seats."
+            )
+        if data['first_row'] + data['rows'] - 1 > 702:
+            raise serializers.ValidationError("Rows cannot go past ZZ.")
+        return data
@@ -0,0 +1,210 @@
+"""
+Booking write operations shared by the REST API and the template views.
+"""
+from datetime import timedelta
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from .models import Seat, Booking, SeatHold
+from . import availability
+from . import counters
+from . import events
+from . import metrics
+
+# Seat statuses reported by book_seats() and hold_seats()
+BOOKED = 'booked'
+HELD = 'held'
+CONFLICT = 'conflict'
+NOT_FOUND = 'not_found'
+
+
+def _run_with_retry(func, *args, max_attempts=3):
+    """
+    Run func inside a transaction, retrying when a concurrent request wins
+    the race on a unique constraint between our read and our insert.
+    """
+    for attempt in range(max_attempts):
+        try:
+            with transaction.atomic():
+                return func(*args)
+        except IntegrityError:
+            if attempt == max_attempts - 1:
+                raise
+
+
+def _held_by_others(showtime, seat_ids, user):
+    """Seat ids with an active hold by a different user"""
+    return set(
+        SeatHold.objects.active()
+        .filter(showtime=showtime, seat_id__in=seat_ids)
+        .exclude(user=user)
+        .order_by()
+        .values_list('seat_id', flat=True)
+    )
+
+
+def _result(seat_id, seat, status, **extra):
+    result = {
+        'seat_id': seat_id,
+        'seat_number': seat.seat_number if seat else None,
+        'status': status,
+    }
+    result.update(extra)
+    return result
+
+
+def _auditorium_seats(showtime, seat_ids):
+    """The requested seats that exist in the showtime's auditorium, by id"""
+    return Seat.objects.filter(auditorium_id=showtime.auditorium_id).in_bulk(seat_ids)
+
+
+def book_seats(showtime, seat_ids, user):
+    """
+    Book several seats for a showtime in one transaction.
+    
+    All seats are validated with one query, free seats are inserted with a
+    single bulk_create, and the availability index is updated in the same
+    transaction. Seats outside the showtime's auditorium are not_found and
+    seats held by another user count as conflicts; the user's own holds on
+    the booked seats are released. Returns a list of per-seat results in
+    request order: {'seat_id', 'seat_number', 'status', 'booking_id'}.
+    """
+    # Drop duplicates but keep the order the seats were requested in
+    seat_ids = list(dict.fromkeys(seat_ids))
+    return _run_with_retry(_book_seats_once, showtime, seat_ids, user)
+
+
+def _book_seats_once(showtime, seat_ids, user):
+    seats = _auditorium_seats(showtime, seat_ids)
+    booked = set(
+        Booking.objects.filter(showtime=showtime, seat_id__in=seats.keys())
+        .order_by()
+        .values_list('seat_id', flat=True)
+    )
+    held = _held_by_others(showtime, seats.keys(), user) - booked
+    taken = booked | held
+    
+    new_bookings = [
+        Booking(movie_id=showtime.movie_id, showtime=showtime, seat=seats[seat_id], user=user)
+        for seat_id in seat_ids
+        if seat_id in seats and seat_id not in taken
+    ]
+    created = Booking.objects.bulk_create(new_bookings)
+    # bulk_create skips the post_save signal, so update the index and
+    # counter and notify listeners here
+    booked_ids = [booking.seat_id for booking in created]
+    availability.mark_booked(showtime.id, booked_ids)
+    counters.adjust_booked_count(showtime.movie_id, len(created))
+    events.publish_on_commit(showtime.id, booked_ids, events.BOOKED)
+    # A retried attempt rolls back, taking its on_commit callbacks with it
+    metrics.BOOKINGS_CREATED.inc_on_commit(len(created))
+    metrics.BOOKING_CONFLICTS.inc_on_commit(len(booked), reason='booked')
+    metrics.BOOKING_CONFLICTS.inc_on_commit(len(held), reason='held')
+    if booked_ids:
+        SeatHold.objects.filter(showtime=showtime, seat_id__in=booked_ids).delete()
+    created_by_seat = {booking.seat_id: booking for booking in created}
+    
+    results = []
+    for seat_id in seat_ids:
+        seat = seats.get(seat_id)
+        if seat is None:
+            status = NOT_FOUND
+        elif seat_id in taken:
+            status = CONFLICT
+        else:
+            status = BOOKED
+        booking = created_by_seat.get(seat_id)
+        results.append(_result(seat_id, seat, status, booking_id=booking.pk if booking else None))
+    return results
+
+
+def hold_seats(showtime, seat_ids, user, seconds=None):
+    """
+    Hold seats for a user for a limited time so checkout cannot be beaten
+    to the seat. Holding a seat the user already holds extends it.
+    Returns per-seat results: {'seat_id', 'seat_number', 'status', 'expires_at'}.
+    """
+    if seconds is None:
+        seconds = settings.SEAT_HOLD_SECONDS
+    seat_ids = list(dict.fromkeys(seat_ids))
+    return _run_with_retry(_hold_seats_once, showtime, seat_ids, user, seconds)
+
+
+def _hold_seats_once(showtime, seat_ids, user, seconds):
+    now = timezone.now()
+    expires_at = now + timedelta(seconds=seconds)
+    
+    # Lazy expiry: clear out this showtime's stale holds before taking new ones,
+    # and tell live clients those seats are free again
+    expired = dict(
+        SeatHold.objects.filter(showtime=showtime).expired()
+        .order_by().values_list('pk', 'seat_id')
+    )
+    if expired:
+        SeatHold.objects.filter(pk__in=expired).delete()
+        events.publish_on_commit(showtime.id, expired.values(), events.RELEASED)
+    
+    seats = _auditorium_seats(showtime, seat_ids)
+    taken = availability.booked_seat_ids(showtime.id)
+    taken |= _held_by_others(showtime, seats.keys(), user)
+    
+    wanted = [seat_id for seat_id in seat_ids if seat_id in seats and seat_id not in taken]
+    own = set(
+        SeatHold.objects.filter(showtime=showtime, user=user, seat_id__in=wanted)
+        .values_list('seat_id', flat=True)
+    )
+    if own:
+        SeatHold.objects.filter(showtime=showtime, user=user, seat_id__in=own).update(expires_at=expires_at)
+    SeatHold.objects.bulk_create([
+        SeatHold(
+            movie_id=showtime.movie_id,
+            showtime=showtime,
+            seat=seats[seat_id],
+            user=user,
+            expires_at=expires_at
+        )
+        for seat_id in wanted
+        if seat_id not in own
+    ])
+    new_holds = [seat_id for seat_id in wanted if seat_id not in own]
+    if new_holds or expired:
+        counters.bump_seat_version(showtime.movie_id)
+    # Extended holds are sent again so clients move their expiry timers
+    events.publish_on_commit(
+        showtime.id, wanted, events.HELD, expires_at=expires_at.isoformat(), holder_id=user.id
+    )
+    
+    results = []
+    for seat_id in seat_ids:
+        seat = seats.get(seat_id)
+        if seat is None:
+            results.append(_result(seat_id, seat, NOT_FOUND, expires_at=None))
+        elif seat_id in taken:
+            results.append(_result(seat_id, seat, CONFLICT, expires_at=None))
+        else:
+            results.append(_result(seat_id, seat, HELD, expires_at=expires_at))
+    return results
+
+
+def release_holds(showtime, seat_ids, user):
+    """Release a user's holds on the given seats; returns the number released"""
+    with transaction.atomic():
+        holds = SeatHold.objects.filter(showtime=showtime, user=user, seat_id__in=seat_ids)
+        released = list(holds.values_list('seat_id', flat=True))
+        holds.delete()
+        if released:
+            counters.bump_seat_version(showtime.movie_id)
+        events.publish_on_commit(showtime.id, released, events.RELEASED)
+    return len(released)
+
+
+def book_held_seats(showtime, user):
+    """Convert all of a user's active holds for a showtime into bookings"""
+    held_ids = list(
+        SeatHold.objects.active()
+        .filter(showtime=showtime, user=user)
+        .values_list('seat_id', flat=True)
+    )
+    if not held_ids:
+        return []
+    return book_seats(showtime, held_ids, user)
@@ -0,0 +1,98 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from .models import Movie, Showtime, Seat, Booking, SeatAvailabilityIndex
+from . import availability
+from . import counters
+from . import events
+from . import metrics
+from . import seatcatalog
+
+
+@receiver(post_save, sender=Movie)
+def movie_saved(sender, instance, created, raw=False, **kwargs):
+    """Schedule a default showtime with every new movie; bump the catalog"""
+    if raw:
+        return
+    if created:
+        Showtime.objects.create(
+            movie=instance,
+            starts_at=Showtime.default_start(instance.release_date)
+        )
+    counters.bump_catalog()
+
+
+@receiver(post_delete, sender=Movie)
+def movie_deleted(sender, instance, **kwargs):
+    """Bump the catalog version for a removed movie"""
+    counters.bump_catalog()
+
+
+@receiver(post_save, sender=Showtime)
+def showtime_saved(sender, instance, created, raw=False, **kwargs):
+    """Create an empty availability index with every new showtime; bump the catalog"""
+    if raw:
+        return
+    if created:
+        SeatAvailabilityIndex.objects.create(showtime=instance)
+    counters.bump_catalog()
+
+
+@receiver(post_delete, sender=Showtime)
+def showtime_deleted(sender, instance, **kwargs):
+    """Bump the catalog version for a removed showtime"""
+    if not availability.updates_suspended():
+        counters.bump_catalog()
+
+
+@receiver(post_save, sender=Seat)
+def seat_saved(sender, instance, created, raw=False, **kwargs):
+    """Count a new seat, bump the catalog version and drop the cached seat catalog"""
+    seatcatalog.invalidate()
+    if not raw:
+        counters.bump_catalog(seat_delta=1 if created else 0, auditorium_id=instance.auditorium_id)
+
+
+@receiver(post_delete, sender=Seat)
+def seat_deleted(sender, instance, **kwargs):
+    """Uncount a removed seat, bump the catalog version and drop the cached seat catalog"""
+    if availability.updates_suspended():
+        return
+    seatcatalog.invalidate()
+    counters.bump_catalog(seat_delta=-1, auditorium_id=instance.auditorium_id)
+
+
+@receiver(post_save, sender=Booking)
+def booking_saved(sender, instance, created, raw=False, **kwargs):
+    """Set the seat bit, bump the counter and notify listeners of a new or moved booking"""
+    if raw:
+        return
+    previous = getattr(instance, '_saved_location', None)
+    instance._saved_location = instance.location()
+    if created:
+        availability.mark_booked(instance.showtime_id, [instance.seat_id])
+        counters.adjust_booked_count(instance.movie_id, 1)
+        events.publish_on_commit(instance.showtime_id, [instance.seat_id], events.BOOKED)
+        metrics.BOOKINGS_CREATED.inc_on_commit()
+    elif previous is not None and previous != instance._saved_location:
+        # Moved to another seat or showtime: release the old one, book the new one
+        movie_id, showtime_id, seat_id = previous
+        availability.mark_released(showtime_id, [seat_id])
+        availability.mark_booked(instance.showtime_id, [instance.seat_id])
+        if movie_id != instance.movie_id:
+            counters.adjust_booked_count(movie_id, -1)
+            counters.adjust_booked_count(instance.movie_id, 1)
+        else:
+            counters.bump_seat_version(movie_id)
+        events.publish_on_commit(showtime_id, [seat_id], events.RELEASED)
+        events.publish_on_commit(instance.showtime_id, [instance.seat_id], events.BOOKED)
+
+
+@receiver(post_delete, sender=Booking)
+def booking_deleted(sender, instance, **kwargs):
+    """Clear the seat bit, drop the counter and notify listeners of a removed booking"""
+    if availability.updates_suspended():
+        return
+    availability.mark_released(instance.showtime_id, [instance.seat_id])
+    counters.adjust_booked_count(instance.movie_id, -1)
+    events.publish_on_commit(instance.showtime_id, [instance.seat_id], events.RELEASED)
+    metrics.BOOKINGS_CANCELLED.inc_on_commit()
@@ -0,0 +1,35 @@
+"""
+SQLite settings for running the site on SQLite under concurrent requests.
+
+Stock SQLite lets one writer in at a time and starts transactions
+DEFERRED: two requests that both read and then write deadlock on the lock
+upgrade, and one fails at once with "database is locked" whatever the
+timeout. With settings.SQLITE_TUNED (the default outside production):
+
+- transactions start with BEGIN IMMEDIATE (the transaction_mode option in
+  settings.DATABASES), so writers take the lock up front and wait for it
+- every new connection gets settings.SQLITE_PRAGMAS: WAL, so readers no
+  longer block the writer or each other; busy_timeout, for how long a
+  writer waits; synchronous=NORMAL, which is durable enough in WAL mode
+  and saves an fsync per commit; and mmap_size for faster reads
+
+WAL mode is stored in the database file, so it stays on after
+SQLITE_TUNED is turned off; bench_sqlite switches it explicitly.
+"""
+from django.conf import settings
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+
+def tuning_enabled():
+    return getattr(settings, 'SQLITE_TUNED', False)
+
+
+@receiver(connection_created, dispatch_uid='booking.sqlitetuning')
+def tune_sqlite(sender, connection, **kwargs):
+    """Apply SQLITE_PRAGMAS to a new SQLite connection"""
+    if connection.vendor != 'sqlite' or not tuning_enabled():
+        return
+    # On the driver connection: setup, not queries of the request that opened it
+    for name, value in getattr(settings, 'SQLITE_PRAGMAS', {}).items():
+        connection.connection.execute(f'PRAGMA {name} = {value}')
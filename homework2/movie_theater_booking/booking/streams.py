@@ -0,0 +1,82 @@
+import json
+import time
+from django.conf import settings
+from django.http import Http404, StreamingHttpResponse
+from .models import Showtime
+from .events import broker
+
+
+def _format_event(event, data):
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+def _client_event(event, user_id):
+    """A hold event tells the client whether the hold is its own, not whose it is"""
+    if 'holder_id' not in event:
+        return event
+    event = dict(event)
+    event['own'] = event.pop('holder_id') == user_id
+    return event
+
+
+async def _event_stream(subscription, lifetime, keepalive, user_id=None):
+    """Yield server-sent events until the stream lifetime runs out"""
+    deadline = time.monotonic() + lifetime
+    try:
+        yield _format_event('ready', {'showtime_id': subscription.showtime_id})
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            event = await subscription.get(timeout=min(keepalive, remaining))
+            if subscription.overflowed:
+                # Events were dropped; tell the client to refetch the seat map
+                subscription.overflowed = False
+                yield _format_event('reset', {'showtime_id': subscription.showtime_id})
+            if event is None:
+                yield ": keepalive\n\n"
+            else:
+                yield _format_event('seat', _client_event(event, user_id))
+    finally:
+        subscription.close()
+
+
+async def _stream_response(request, showtime_id):
+    user = await request.auser()
+    subscription = broker.subscribe(showtime_id)
+    response = StreamingHttpResponse(
+        _event_stream(
+            subscription,
+            settings.SEAT_EVENTS_STREAM_SECONDS,
+            settings.SEAT_EVENTS_KEEPALIVE_SECONDS,
+            user.id
+        ),
+        content_type='text/event-stream'
+    )
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+
+async def showtime_seat_events(request, showtime_id):
+    """
+    Stream seat booked/released/held changes for a showtime as server-sent events
+    GET /api/showtimes/{id}/events/
+    
+    The stream closes after SEAT_EVENTS_STREAM_SECONDS; EventSource clients
+    reconnect automatically.
+    """
+    if not await Showtime.objects.filter(pk=showtime_id).aexists():
+        raise Http404("Showtime not found")
+    return await _stream_response(request, showtime_id)
+
+
+async def seat_events(request, movie_id):
+    """
+    Stream seat changes for a movie's primary showtime
+    GET /api/movies/{id}/events/
+    """
+    showtime = await Showtime.objects.aprimary_for(movie_id)
+    if showtime is None:
+        raise Http404("Movie not found")
+    return await _stream_response(request, showtime.id)
\ No newline at end of file
@@ -1,35 +1,74 @@
-from django.shortcuts import render, redirect, get_object_or_404
+from django import shortcuts
+from django.shortcuts import redirect, get_object_or_404
+from django.http import Http404
 from django.contrib import messages
 from django.utils import timezone
-from .models import Movie, Seat, Booking
+from django.views.decorators.http import condition
+from .models import Movie, Showtime, Booking
+from . import services
+from . import seatcatalog
+from . import responsecache
+from . import timing
+from .querybudget import query_budget
+from .dbrouter import read_replica
+from .etags import template_etag, catalog_tag, movie_tag
 from django.contrib.auth.models import User
 
 
+def render(request, template_name, context=None):
+    """django.shortcuts.render, timed as template for the Server-Timing header"""
+    with timing.section('template'):
+        return shortcuts.render(request, template_name, context)
+
+
+@read_replica
+@query_budget(2)
+@condition(etag_func=template_etag(lambda request: catalog_tag()))
 def movie_list(request):
     """Display list of all movies"""
-    movies = Movie.objects.all().order_by('-release_date')
+    tag = getattr(request, 'version_tag', None)
+    if tag is None:
+        movies = Movie.objects.all().order_by('-release_date')
+    else:
+        movies = responsecache.get_or_set(
+            'movie-list-page', tag, '',
+            lambda: list(Movie.objects.all().order_by('-release_date'))
+        )
     return render(request, 'booking/movie_list.html', {
         'movies': movies
     })
 
 
+@read_replica
+@query_budget(5)
+@condition(etag_func=template_etag(lambda request, pk: movie_tag(pk, seat_map=True)))
 def movie_detail(request, pk):
     """Display details of a specific movie"""
-    movie = get_object_or_404(Movie, pk=pk)
-    
-    # Get available seats for this movie
-    booked_seats = Booking.objects.filter(movie=movie).values_list('seat_id', flat=True)
-    available_seats = Seat.objects.exclude(id__in=booked_seats)
+    # The pages book the movie's primary showtime
+    showtime = Showtime.objects.primary_for(pk)
+    if showtime is None:
+        movie = get_object_or_404(Movie, pk=pk)
+        available_seats = []
+    else:
+        movie = showtime.movie
+        available_seats = seatcatalog.available_seats(showtime)
     
     return render(request, 'booking/movie_detail.html', {
         'movie': movie,
+        'showtime': showtime,
         'available_seats': available_seats
     })
 
 
+@read_replica
+@query_budget(17)
+@condition(etag_func=template_etag(lambda request, movie_id: movie_tag(movie_id, seat_map=True)))
 def seat_booking(request, movie_id):
     """Display seat booking interface and handle booking submission"""
-    movie = get_object_or_404(Movie, pk=movie_id)
+    showtime = Showtime.objects.primary_for(movie_id)
+    if showtime is None:
+        raise Http404("No showtime is scheduled for this movie.")
+    movie = showtime.movie
     
     if request.method == 'POST':
         seat_ids = request.POST.get('seat_ids', '')
@@ -50,29 +89,14 @@ def seat_booking(request, movie_id):
             defaults={'first_name': guest_name}
         )
         
-        # Create bookings for selected seats
-        successful_bookings = []
-        failed_seats = []
-        
-        for seat_id in seat_id_list:
-            try:
-                seat = Seat.objects.get(pk=seat_id)
-                
-                # Check if seat is already booked for this movie
-                if Booking.objects.filter(movie=movie, seat=seat).exists():
-                    failed_seats.append(seat.seat_number)
-                    continue
-                
-                # Create booking
-                Booking.objects.create(
-                    movie=movie,
-                    seat=seat,
-                    user=guest_user
-                )
-                successful_bookings.append(seat.seat_number)
-                
-            except Seat.DoesNotExist:
-                continue
+        # Create bookings for selected seats in one transaction
+        results = services.book_seats(showtime, seat_id_list, guest_user)
+        successful_bookings = [
+            r['seat_number'] for r in results if r['status'] == services.BOOKED
+        ]
+        failed_seats = [
+            r['seat_number'] for r in results if r['status'] == services.CONFLICT
+        ]
         
         # Display appropriate messages
         if successful_bookings:
@@ -96,16 +120,17 @@ def seat_booking(request, movie_id):
         return redirect('booking_confirmation', movie_id=movie_id)
     
     # GET request - display booking page
-    all_seats = Seat.objects.all().order_by('seat_number')
-    booked_seats = Booking.objects.filter(movie=movie).values_list('seat_id', flat=True)
+    all_seats = seatcatalog.seat_map(showtime)
     
     return render(request, 'booking/seat_booking.html', {
         'movie': movie,
-        'all_seats': all_seats,
-        'booked_seat_ids': list(booked_seats)
+        'showtime': showtime,
+        'all_seats': all_seats
     })
 
 
+@read_replica
+@query_budget(1)
 def booking_confirmation(request, movie_id):
     """Display booking confirmation"""
     movie = get_object_or_404(Movie, pk=movie_id)
@@ -115,9 +140,11 @@ def booking_confirmation(request, movie_id):
     })
 
 
+@read_replica
+@query_budget(2)
 def all_bookings(request):
     """Display all bookings (no authentication needed)"""
-    bookings = Booking.objects.all().order_by('-booking_date')
+    bookings = Booking.objects.with_related().order_by('-booking_date')
     
     # Count upcoming bookings
     today = timezone.now().date()
@@ -130,10 +157,11 @@ def all_bookings(request):
     })
 
 
+@query_budget(7)
 def cancel_booking(request, booking_id):
     """Cancel a booking (no authentication needed)"""
     if request.method == 'POST':
-        booking = get_object_or_404(Booking, pk=booking_id)
+        booking = get_object_or_404(Booking.objects.with_related(), pk=booking_id)
         
         # Store info before deleting
         movie_title = booking.movie.title
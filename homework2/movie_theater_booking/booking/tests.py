@@ -1,10 +1,52 @@
-from django.test import TestCase, Client, override_settings
+from django.test import TestCase, TransactionTestCase, Client, RequestFactory, override_settings
+from django.conf import settings
+from django.core.cache import caches
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.http import HttpResponse
+from django.db import IntegrityError, connection, connections, transaction
+from django.test.utils import CaptureQueriesContext
 from django.contrib.auth.models import User
+from django.template.base import Template
 from django.urls import reverse
+from django.utils import timezone
 from rest_framework import status
 from rest_framework.test import APITestCase, APIClient
+from rest_framework.exceptions import ValidationError
+from rest_framework.serializers import Serializer, ListSerializer
 from datetime import date, timedelta
-from .models import Movie, Seat, Booking
+from io import StringIO
+from types import SimpleNamespace
+from .models import (
+    Movie, Auditorium, Showtime, Seat, Booking, SeatAvailabilityIndex, SeatHold, TheaterStats,
+    BookingRequest
+)
+from . import availability
+from . import services
+from . import events
+from . import indexaudit
+from . import seatcatalog
+from . import responsecache
+from .fastlist import ValuesRepresentation
+from . import seatmapcodec
+from . import layouts
+from . import seeding
+from . import counters
+from . import metrics
+from . import bookingqueue
+from . import dbrouter
+from . import template_views
+from . import streams
+from .events import SeatEventBroker
+from .benchmarking import percentile, summarize, run_users, summarize_steps, count_queries
+from .querybudget import QueryBudgetExceeded, query_budget
+from .views import MovieViewSet, BookingViewSet
+from .serializers import BookingCreateSerializer, MovieDetailSerializer
+from unittest.mock import patch, call
+import asyncio
+import json
+import tempfile
 
 
 # ==================== MODEL TESTS ====================
@@ -86,6 +128,13 @@ class SeatModelTest(TestCase):
         with self.assertRaises(Exception):
             Seat.objects.create(seat_number="A1", is_booked=False)
     
+    def test_seat_default_auditorium(self):
+        """Test an unsaved seat does not touch the database; saving puts it in the default auditorium"""
+        with self.assertNumQueries(0):
+            seat = Seat(seat_number="B1")
+        seat.save()
+        self.assertEqual(seat.auditorium, Auditorium.get_default())
+    
     def test_seat_default_is_booked(self):
         """Test that is_booked defaults to False"""
         seat = Seat.objects.create(seat_number="B1")
@@ -207,9 +256,9 @@ class MovieAPITest(APITestCase):
         response = self.client.get(url)
         
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertIsInstance(response.data, list)
-        self.assertEqual(len(response.data), 1)
-        self.assertEqual(response.data[0]['title'], "Test Movie")
+        self.assertIsInstance(response.data['results'], list)
+        self.assertEqual(len(response.data['results']), 1)
+        self.assertEqual(response.data['results'][0]['title'], "Test Movie")
     
     def test_retrieve_movie(self):
         """Test GET /api/movies/{id}/ returns a specific movie"""
@@ -425,8 +474,8 @@ class BookingAPITest(APITestCase):
         response = self.client.get(url)
         
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertIsInstance(response.data, list)
-        self.assertEqual(len(response.data), 1)
+        self.assertIsInstance(response.data['results'], list)
+        self.assertEqual(len(response.data['results']), 1)
     
     def test_list_bookings_unauthenticated(self):
         """Test GET /api/bookings/ requires authentication"""
@@ -504,13 +553,31 @@ class BookingAPITest(APITestCase):
         self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
         self.assertEqual(Booking.objects.count(), 0)
     
+    def test_move_booking_updates_availability(self):
+        """Test PATCH /api/bookings/{id}/ to another seat frees the old seat and books the new one"""
+        seat2 = Seat.objects.create(seat_number="A2")
+        available_url = reverse('api-movie-available-seats', args=[self.movie.id])
+        self.client.get(available_url)
+        version = Movie.objects.get(pk=self.movie.pk).seat_version
+        
+        url = reverse('api-booking-detail', args=[self.booking.id])
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.patch(url, {'seat': seat2.id}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        
+        response = self.client.get(available_url)
+        self.assertEqual([seat['id'] for seat in response.data], [self.seat.id])
+        self.movie.refresh_from_db()
+        self.assertEqual(self.movie.booked_count, 1)
+        self.assertGreater(self.movie.seat_version, version)
+    
     def test_my_bookings(self):
         """Test GET /api/bookings/my_bookings/ returns user's bookings"""
         url = reverse('api-booking-my-bookings')
         response = self.client.get(url)
         
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(response.data), 1)
+        self.assertEqual(len(response.data['results']), 1)
     
     def test_upcoming_bookings(self):
         """Test GET /api/bookings/upcoming/ returns upcoming bookings"""
@@ -518,7 +585,7 @@ class BookingAPITest(APITestCase):
         response = self.client.get(url)
         
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(response.data), 1)
+        self.assertEqual(len(response.data['results']), 1)
 
 
 # ==================== TEMPLATE VIEW TESTS ====================
@@ -593,4 +660,2048 @@ class TemplateViewsTest(TestCase):
         response = self.client.post(reverse('cancel_booking', args=[booking.id]))
         
         self.assertEqual(response.status_code, 302)  # Redirect after cancel
-        self.assertEqual(Booking.objects.count(), 0)
\ No newline at end of file
+        self.assertEqual(Booking.objects.count(), 0)
+
+# ==================== AVAILABILITY INDEX TESTS ====================
+
+class SeatAvailabilityIndexTest(TestCase):
+    """Tests for the per-showtime seat availability bitmap"""
+    
+    def setUp(self):
+        """Set up test data"""
+        self.user = User.objects.create_user(username="testuser", password="pass")
+        self.movie = Movie.objects.create(
+            title="Test Movie",
+            description="Test Description",
+            release_date=date.today() + timedelta(days=7),
+            duration=120
+        )
+        self.showtime = self.movie.showtimes.get()
+        self.seat1 = Seat.objects.create(seat_number="A1")
+        self.seat2 = Seat.objects.create(seat_number="A2")
+    
+    def test_missing_index_read_from_bookings(self):
+        """Test a showtime without an index row is read from Booking rows without writing one"""
+        Booking.objects.create(movie=self.movie, seat=self.seat1, user=self.user)
+        SeatAvailabilityIndex.objects.all().delete()
+        
+        self.assertEqual(availability.booked_seat_ids(self.showtime.id), {self.seat1.id})
+        self.assertFalse(SeatAvailabilityIndex.objects.filter(showtime=self.showtime).exists())
+        
+        # Bookings made meanwhile are not lost
+        Booking.objects.create(movie=self.movie, seat=self.seat2, user=self.user)
+        self.assertEqual(availability.booked_seat_ids(self.showtime.id), {self.seat1.id, self.seat2.id})
+        availability.rebuild([self.showtime.id])
+        self.assertEqual(availability.booked_seat_ids(self.showtime.id), {self.seat1.id, self.seat2.id})
+    
+    def test_index_created_with_movie(self):
+        """Test a new movie's default showtime gets an empty index row straight away"""
+        index = SeatAvailabilityIndex.objects.get(showtime__movie=self.movie)
+        self.assertEqual(index.booked_seat_ids(), set())
+    
+    def test_bitmap_spans_booked_ids_only(self):
+        """Test the bitmap size follows the booked id range, not the highest seat id"""
+        high_seat = Seat.objects.create(id=800000, seat_number="Z1")
+        next_seat = Seat.objects.create(id=800013, seat_number="Z2")
+        booking = Booking.objects.create(movie=self.movie, seat=high_seat, user=self.user)
+        Booking.objects.create(movie=self.movie, seat=next_seat, user=self.user)
+        
+        index = SeatAvailabilityIndex.objects.get(showtime=self.showtime)
+        self.assertLessEqual(len(index.bitmap), 2)
+        self.assertEqual(index.booked_seat_ids(), {800000, 800013})
+        self.assertFalse(index.is_booked(self.seat1.id))
+        self.assertFalse(index.is_booked(900000))
+        
+        # A lower seat moves the base down; clearing it moves it back
+        low_booking = Booking.objects.create(movie=self.movie, seat=self.seat1, user=self.user)
+        self.assertEqual(
+            availability.booked_seat_ids(self.showtime.id), {self.seat1.id, 800000, 800013}
+        )
+        low_booking.delete()
+        booking.delete()
+        index.refresh_from_db()
+        self.assertEqual(index.booked_seat_ids(), {800013})
+        self.assertEqual(len(index.bitmap), 1)
+        self.assertTrue(index.is_booked(800013))
+    
+    def test_index_tracks_booking_create_and_delete(self):
+        """Test booking writes keep the index in sync"""
+        self.assertEqual(availability.booked_seat_ids(self.showtime.id), set())
+        
+        booking = Booking.objects.create(movie=self.movie, seat=self.seat2, user=self.user)
+        self.assertTrue(availability.is_seat_booked(self.showtime.id, self.seat2.id))
+        self.assertFalse(availability.is_seat_booked(self.showtime.id, self.seat1.id))
+        
+        booking.delete()
+        self.assertEqual(availability.booked_seat_ids(self.showtime.id), set())
+    
+    def test_index_for_unknown_showtime(self):
+        """Test an unknown showtime reports no booked seats without creating a row"""
+        self.assertEqual(availability.booked_seat_ids(9999), set())
+        self.assertFalse(SeatAvailabilityIndex.objects.filter(showtime_id=9999).exists())
+    
+    def test_rebuild_command(self):
+        """Test rebuild_seat_index regenerates a stale index"""
+        availability.booked_seat_ids(self.showtime.id)
+        Booking.objects.bulk_create([
+            Booking(movie=self.movie, showtime=self.showtime, seat=self.seat1, user=self.user)
+        ])
+        self.assertEqual(availability.booked_seat_ids(self.showtime.id), set())
+        
+        call_command('rebuild_seat_index', stdout=StringIO())
+        self.assertEqual(availability.booked_seat_ids(self.showtime.id), {self.seat1.id})
+
+
+class SeatAvailabilityQuerySetTest(APITestCase):
+    """Tests for the shared seat availability queryset layer"""
+    
+    def setUp(self):
+        """Set up test data"""
+        self.user = User.objects.create_user(username="testuser", password="pass")
+        self.movie = Movie.objects.create(
+            title="Test Movie",
+            description="Test Description",
+            release_date=date.today() + timedelta(days=7),
+            duration=120
+        )
+        self.showtime = self.movie.showtimes.get()
+        self.seats = [Seat.objects.create(seat_number=f"A{n}") for n in range(1, 21)]
+        Booking.objects.create(movie=self.movie, seat=self.seats[0], user=self.user)
+    
+    def test_with_availability_annotation(self):
+        """Test with_availability flags booked and free seats"""
+        seats = {s.seat_number: s.is_available_for_movie
+                 for s in Seat.objects.with_availability(self.showtime)}
+        self.assertFalse(seats['A1'])
+        self.assertTrue(seats['A2'])
+    
+    def test_available_for_excludes_booked(self):
+        """Test available_for only returns free seats"""
+        seat_numbers = [s.seat_number for s in Seat.objects.available_for(self.showtime)]
+        self.assertNotIn('A1', seat_numbers)
+        self.assertEqual(len(seat_numbers), 19)
+    
+    def test_movie_available_seats_constant_queries(self):
+        """Test /api/movies/{id}/available_seats/ does not query per seat"""
+        url = reverse('api-movie-available-seats', args=[self.movie.id])
+        self.client.get(url)  # Build the availability index
+        # ETag lookup, showtime and movie, index, holds, and the seat catalog,
+        # which is never cached inside the test transaction
+        with self.assertNumQueries(5):
+            response = self.client.get(url)
+        self.assertEqual(len(response.data), 19)
+        self.assertTrue(all(s['is_available_for_movie'] for s in response.data))
+    
+    def test_seat_booking_page_constant_queries(self):
+        """Test the seat booking page renders the seat map with constant queries"""
+        # ETag lookup, showtime and movie, index, holds, seat catalog
+        with self.assertNumQueries(5):
+            response = self.client.get(reverse('seat_booking', args=[self.movie.id]))
+        self.assertContains(response, 'class="seat booked"', count=1)
+
+
+# ==================== BULK BOOKING TESTS ====================
+
+class BulkBookingAPITest(APITestCase):
+    """Integration tests for POST /api/bookings/bulk/"""
+    
+    def setUp(self):
+        """Set up test data and API client"""
+        self.user = User.objects.create_user(username="testuser", password="pass")
+        self.client.force_authenticate(user=self.user)
+        self.movie = Movie.objects.create(
+            title="Test Movie",
+            description="Test Description",
+            release_date=date.today() + timedelta(days=7),
+            duration=120
+        )
+        self.seats = [Seat.objects.create(seat_number=f"A{n}") for n in range(1, 11)]
+        self.url = reverse('api-booking-bulk')
+    
+    def test_bulk_booking_creates_all_seats(self):
+        """Test booking a group of seats in one request"""
+        data = {'movie': self.movie.id, 'seats': [s.id for s in self.seats]}
+        # One extra query resolves the movie's primary showtime
+        with self.assertNumQueries(14):
+            response = self.client.post(self.url, data, format='json')
+        
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(Booking.objects.filter(movie=self.movie).count(), 10)
+        self.assertTrue(all(r['status'] == 'booked' for r in response.data['results']))
+        self.assertTrue(all(r['booking_id'] for r in response.data['results']))
+    
+    def test_bulk_booking_reports_conflicts(self):
+        """Test already booked and unknown seats are reported per seat"""
+        Booking.objects.create(movie=self.movie, seat=self.seats[0], user=self.user)
+        data = {'movie': self.movie.id, 'seats': [self.seats[0].id, self.seats[1].id, 9999]}
+        response = self.client.post(self.url, data, format='json')
+        
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        statuses = [r['status'] for r in response.data['results']]
+        self.assertEqual(statuses, ['conflict', 'booked', 'not_found'])
+        showtime = self.movie.showtimes.get()
+        self.assertFalse(availability.is_seat_booked(showtime.id, 9999))
+        self.assertTrue(availability.is_seat_booked(showtime.id, self.seats[1].id))
+    
+    def test_bulk_booking_all_conflicts(self):
+        """Test a request with no free seats returns 409"""
+        Booking.objects.create(movie=self.movie, seat=self.seats[0], user=self.user)
+        data = {'movie': self.movie.id, 'seats': [self.seats[0].id]}
+        response = self.client.post(self.url, data, format='json')
+        
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+    
+    def test_bulk_booking_requires_seats(self):
+        """Test an empty seat list is rejected"""
+        response = self.client.post(self.url, {'movie': self.movie.id, 'seats': []}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+# ==================== SEAT HOLD TESTS ====================
+
+class SeatHoldAPITest(APITestCase):
+    """Integration tests for seat holds"""
+    
+    def setUp(self):
+        """Set up test data and API client"""
+        self.user = User.objects.create_user(username="testuser", password="pass")
+        self.other_user = User.objects.create_user(username="otheruser", password="pass")
+        self.client.force_authenticate(user=self.user)
+        self.movie = Movie.objects.create(
+            title="Test Movie",
+            description="Test Description",
+            release_date=date.today() + timedelta(days=7),
+            duration=120
+        )
+        self.seat1 = Seat.objects.create(seat_number="A1")
+        self.seat2 = Seat.objects.create(seat_number="A2")
+    
+    def hold(self, seats, user=None):
+        """Hold seats as the given user (defaults to self.user)"""
+        self.client.force_authenticate(user=user or self.user)
+        return self.client.post(
+            reverse('api-seat-hold'),
+            {'movie': self.movie.id, 'seats': [s.id for s in seats]},
+            format='json'
+        )
+    
+    def test_hold_seats(self):
+        """Test holding a seat makes it unavailable to others"""
+        response = self.hold([self.seat1])
+        
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['results'][0]['status'], 'held')
+        available = self.client.get(reverse('api-movie-available-seats', args=[self.movie.id]))
+        self.assertEqual([s['seat_number'] for s in available.data], ['A2'])
+    
+    def test_hold_conflict(self):
+        """Test a seat held by another user cannot be held or booked"""
+        self.hold([self.seat1], user=self.other_user)
+        
+        response = self.hold([self.seat1])
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+        
+        response = self.client.post(
+            reverse('api-booking-list'),
+            {'movie': self.movie.id, 'seat': self.seat1.id},
+            format='json'
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('held', str(response.data))
+    
+    def test_expired_hold_is_ignored(self):
+        """Test expired holds no longer block the seat and are cleaned up lazily"""
+        SeatHold.objects.create(
+            movie=self.movie,
+            seat=self.seat1,
+            user=self.other_user,
+            expires_at=timezone.now() - timedelta(seconds=1)
+        )
+        
+        response = self.hold([self.seat1])
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(SeatHold.objects.get().user, self.user)
+    
+    def test_hold_changes_published_on_commit(self):
+        """Test clearing an expired hold publishes a release, and new holds carry their expiry"""
+        SeatHold.objects.create(
+            movie=self.movie,
+            seat=self.seat1,
+            user=self.other_user,
+            expires_at=timezone.now() - timedelta(seconds=1)
+        )
+        showtime_id = self.movie.showtimes.get().id
+        with patch.object(events.broker, 'publish') as publish:
+            with self.captureOnCommitCallbacks(execute=True):
+                self.hold([self.seat2])
+        
+        expires_at = SeatHold.objects.get().expires_at.isoformat()
+        publish.assert_has_calls([
+            call(showtime_id, [self.seat1.id], 'released'),
+            call(showtime_id, [self.seat2.id], 'held', expires_at=expires_at, holder_id=self.user.id),
+        ])
+        event = {'showtime_id': showtime_id, 'seat_id': self.seat2.id, 'status': 'held', 'holder_id': self.user.id}
+        self.assertTrue(streams._client_event(event, self.user.id)['own'])
+        self.assertNotIn('holder_id', streams._client_event(event, None))
+    
+    def test_book_from_hold(self):
+        """Test converting holds into bookings"""
+        self.hold([self.seat1, self.seat2])
+        response = self.client.post(
+            reverse('api-booking-from-hold'), {'movie': self.movie.id}, format='json'
+        )
+        
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(Booking.objects.filter(user=self.user).count(), 2)
+        self.assertFalse(SeatHold.objects.exists())
+    
+    def test_book_from_hold_without_holds(self):
+        """Test converting with no active holds returns 400"""
+        response = self.client.post(
+            reverse('api-booking-from-hold'), {'movie': self.movie.id}, format='json'
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+    
+    def test_release_hold(self):
+        """Test releasing a hold frees the seat"""
+        self.hold([self.seat1])
+        response = self.client.post(
+            reverse('api-seat-release'),
+            {'movie': self.movie.id, 'seats': [self.seat1.id]},
+            format='json'
+        )
+        
+        self.assertEqual(response.data['released'], 1)
+        self.assertFalse(SeatHold.objects.exists())
+
+
+# ==================== PAGINATION TESTS ====================
+
+class CursorPaginationTest(APITestCase):
+    """Tests for keyset pagination on movie and booking lists"""
+    
+    def setUp(self):
+        """Set up test data and API client"""
+        self.user = User.objects.create_user(username="testuser", password="pass")
+        self.client.force_authenticate(user=self.user)
+        for n in range(5):
+            Movie.objects.create(
+                title=f"Movie {n}",
+                description="Test",
+                release_date=date.today(),  # Same date so the id tiebreak is used
+                duration=100
+            )
+        movie = Movie.objects.first()
+        for n in range(5):
+            seat = Seat.objects.create(seat_number=f"A{n}")
+            Booking.objects.create(movie=movie, seat=seat, user=self.user)
+    
+    def collect(self, url):
+        """Follow next links and return every result"""
+        results = []
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            results.extend(response.data['results'])
+            url = response.data['next']
+        return results
+    
+    def test_movie_pages_cover_all_rows(self):
+        """Test walking the movie cursor returns every movie once, in order"""
+        results = self.collect(reverse('api-movie-list') + '?page_size=2')
+        self.assertEqual(
+            [m['id'] for m in results],
+            list(Movie.objects.values_list('id', flat=True))
+        )
+    
+    def test_booking_pages_cover_all_rows(self):
+        """Test walking the booking cursor returns every booking once"""
+        results = self.collect(reverse('api-booking-my-bookings') + '?page_size=2')
+        self.assertEqual(len(results), 5)
+        self.assertEqual(len({b['id'] for b in results}), 5)
+    
+    def test_long_run_of_ties(self):
+        """Test paging through more than offset_cutoff movies with one release_date"""
+        Movie.objects.bulk_create([
+            Movie(title=f"Tied {n}", description="Test", release_date=date.today(), duration=100)
+            for n in range(1200)
+        ])
+        expected = list(Movie.objects.values_list('id', flat=True))
+        url = reverse('api-movie-list') + '?page_size=500'
+        self.assertEqual([m['id'] for m in self.collect(url)], expected)
+        
+        # Walk back from the last page with previous links
+        first = self.client.get(url).data
+        second = self.client.get(first['next']).data
+        last = self.client.get(second['next']).data
+        self.assertIsNone(last['next'])
+        back = self.client.get(last['previous']).data
+        self.assertEqual([m['id'] for m in back['results']], expected[500:1000])
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(back['previous'])
+        self.assertNotIn('OFFSET', ' '.join(q['sql'] for q in queries))
+
+
+# ==================== QUERY BUDGET TESTS ====================
+
+@override_settings(QUERY_BUDGETS_ENFORCED=True)
+class QueryBudgetTest(APITestCase):
+    """
+    Every route in booking/urls.py must stay within its declared query
+    budget. Each test uses several rows so per-row queries would show up.
+    """
+    
+    def setUp(self):
+        """Set up enough data that N+1 patterns exceed the budgets"""
+        self.user = User.objects.create_user(username="testuser", password="pass")
+        # Log in with a session like the browser and templates do, so budgets include auth
+        self.client.force_login(self.user)
+        self.movies = [
+            Movie.objects.create(
+                title=f"Movie {n}",
+                description="Test",
+                release_date=date.today() + timedelta(days=n),
+                duration=100
+            )
+            for n in range(5)
+        ]
+        self.movie = self.movies[0]
+        self.seats = [Seat.objects.create(seat_number=f"A{n}") for n in range(1, 11)]
+        for seat in self.seats[:5]:
+            Booking.objects.create(movie=self.movie, seat=seat, user=self.user)
+        self.booking = Booking.objects.filter(user=self.user).first()
+        # Budgets describe the steady state, after the index has been built
+        availability.rebuild()
+    
+    def assertWithinBudget(self, method, url, data=None):
+        """Request a route and check it succeeds without exceeding its budget"""
+        response = getattr(self.client, method)(url, data, format='json')
+        self.assertLess(response.status_code, 400, getattr(response, 'data', response))
+        return response
+    
+    def test_movie_routes(self):
+        """Test movie API routes stay within budget"""
+        detail = reverse('api-movie-detail', args=[self.movie.id])
+        movie_data = {
+            'title': 'New Movie',
+            'description': 'Test',
+            'release_date': str(date.today()),
+            'duration': 90
+        }
+        self.assertWithinBudget('get', reverse('api-movie-list'))
+        self.assertWithinBudget('post', reverse('api-movie-list'), movie_data)
+        self.assertWithinBudget('get', detail)
+        self.assertWithinBudget('put', detail, movie_data)
+        self.assertWithinBudget('patch', detail, {'duration': 95})
+        self.assertWithinBudget('get', reverse('api-movie-available-seats', args=[self.movie.id]))
+        self.assertWithinBudget('get', reverse('api-movie-seatmap', args=[self.movie.id]))
+        self.assertWithinBudget('delete', detail)
+    
+    def test_seat_routes(self):
+        """Test seat API routes stay within budget"""
+        seat = self.seats[-1]
+        detail = reverse('api-seat-detail', args=[seat.id])
+        self.assertWithinBudget('get', reverse('api-seat-list'))
+        self.assertWithinBudget('post', reverse('api-seat-list'), {'seat_number': 'Z1'})
+        self.assertWithinBudget('get', detail)
+        self.assertWithinBudget('put', detail, {'seat_number': 'Z2', 'is_booked': False})
+        self.assertWithinBudget('patch', detail, {'is_booked': False})
+        self.assertWithinBudget('get', reverse('api-seat-available'))
+        self.assertWithinBudget('get', reverse('api-seat-available'), {'movie_id': self.movie.id})
+        self.assertWithinBudget(
+            'get', reverse('api-seat-check-availability', args=[seat.id]), {'movie_id': self.movie.id}
+        )
+        hold = {'movie': self.movies[1].id, 'seats': [s.id for s in self.seats]}
+        self.assertWithinBudget('post', reverse('api-seat-hold'), hold)
+        self.assertWithinBudget('post', reverse('api-seat-release'), hold)
+        self.assertWithinBudget('delete', detail)
+    
+    def test_hold_with_expired_holds(self):
+        """Test a hold that clears other users' expired holds stays within budget"""
+        other_user = User.objects.create_user(username="otheruser", password="pass")
+        showtime = self.movies[1].showtimes.get()
+        for seat in self.seats[:5]:
+            SeatHold.objects.create(
+                movie=self.movies[1],
+                showtime=showtime,
+                seat=seat,
+                user=other_user,
+                expires_at=timezone.now() - timedelta(seconds=1)
+            )
+        hold = {'movie': self.movies[1].id, 'seats': [s.id for s in self.seats[5:8]]}
+        self.assertWithinBudget('post', reverse('api-seat-hold'), hold)
+        self.assertEqual(SeatHold.objects.filter(user=other_user).count(), 0)
+    
+    def test_auditorium_routes(self):
+        """Test auditorium API routes stay within budget"""
+        self.assertWithinBudget('get', reverse('api-auditorium-list'))
+        response = self.assertWithinBudget('post', reverse('api-auditorium-list'), {'name': 'Screen 2'})
+        detail = reverse('api-auditorium-detail', args=[response.data['id']])
+        Seat.objects.create(seat_number="A1", auditorium_id=response.data['id'])
+        self.assertWithinBudget('get', detail)
+        layout = self.assertWithinBudget('get', reverse('api-auditorium-layout', args=[response.data['id']]))
+        self.assertWithinBudget('get', layout['Location'])
+        self.assertWithinBudget('put', detail, {'name': 'Screen 3'})
+        self.assertWithinBudget('patch', detail, {'name': 'Screen 4'})
+        self.assertWithinBudget('delete', detail)
+    
+    def test_showtime_routes(self):
+        """Test showtime API routes stay within budget"""
+        showtime = self.movie.showtimes.get()
+        detail = reverse('api-showtime-detail', args=[showtime.id])
+        starts_at = (timezone.now() + timedelta(days=1)).isoformat()
+        self.assertWithinBudget('get', reverse('api-showtime-list'))
+        self.assertWithinBudget('get', reverse('api-showtime-list'), {'movie_id': self.movie.id})
+        self.assertWithinBudget(
+            'post', reverse('api-showtime-list'), {'movie': self.movie.id, 'starts_at': starts_at}
+        )
+        self.assertWithinBudget('get', detail)
+        self.assertWithinBudget('put', detail, {'movie': self.movie.id, 'starts_at': starts_at})
+        self.assertWithinBudget('patch', detail, {'starts_at': starts_at})
+        self.assertWithinBudget('get', reverse('api-showtime-available-seats', args=[showtime.id]))
+        self.assertWithinBudget('delete', detail)
+    
+    def test_booking_routes(self):
+        """Test booking API routes stay within budget"""
+        other_movie = self.movies[1]
+        self.assertWithinBudget('get', reverse('api-booking-list'))
+        self.assertWithinBudget('get', reverse('api-booking-my-bookings'))
+        self.assertWithinBudget('get', reverse('api-booking-upcoming'))
+        self.assertWithinBudget('get', reverse('api-booking-detail', args=[self.booking.id]))
+        self.assertWithinBudget(
+            'post', reverse('api-booking-list'), {'movie': other_movie.id, 'seat': self.seats[0].id}
+        )
+        self.assertWithinBudget(
+            'post',
+            reverse('api-booking-bulk'),
+            {'movie': other_movie.id, 'seats': [s.id for s in self.seats[1:5]]}
+        )
+        self.client.post(
+            reverse('api-seat-hold'),
+            {'movie': other_movie.id, 'seats': [s.id for s in self.seats[5:]]},
+            format='json'
+        )
+        self.assertWithinBudget('post', reverse('api-booking-from-hold'), {'movie': other_movie.id})
+        self.assertWithinBudget('delete', reverse('api-booking-detail', args=[self.booking.id]))
+    
+    def test_template_routes(self):
+        """Test template views stay within budget"""
+        self.assertWithinBudget('get', reverse('movie_list'))
+        self.assertWithinBudget('get', reverse('movie_detail', args=[self.movie.id]))
+        self.assertWithinBudget('get', reverse('seat_booking', args=[self.movie.id]))
+        response = self.client.post(
+            reverse('seat_booking', args=[self.movie.id]),
+            {'seat_ids': ','.join(str(s.id) for s in self.seats), 'guest_name': 'Test User'}
+        )
+        self.assertEqual(response.status_code, 302)
+        self.assertWithinBudget('get', reverse('booking_confirmation', args=[self.movie.id]))
+        self.assertWithinBudget('get', reverse('all_bookings'))
+        response = self.client.post(reverse('cancel_booking', args=[self.booking.id]))
+        self.assertEqual(response.status_code, 302)
+    
+    def test_budget_exceeded_reports_sql(self):
+        """Test exceeding a budget raises with the offending SQL"""
+        with patch.dict(MovieViewSet.query_budgets, {'list': 0}):
+            with self.assertRaises(QueryBudgetExceeded) as ctx:
+                self.client.get(reverse('api-movie-list'))
+        self.assertIn('MovieViewSet.list', str(ctx.exception))
+        self.assertIn('SELECT', str(ctx.exception))
+
+
+
+# ==================== COUNTER TESTS ====================
+
+class BookingCounterTest(APITestCase):
+    """Tests for the denormalized booking and seat counters"""
+    
+    def setUp(self):
+        """Set up test data"""
+        self.user = User.objects.create_user(username="testuser", password="pass")
+        self.movie = Movie.objects.create(
+            title="Test Movie",
+            description="Test Description",
+            release_date=date.today() + timedelta(days=7),
+            duration=120
+        )
+        self.seats = [Seat.objects.create(seat_number=f"A{n}") for n in range(1, 6)]
+    
+    def test_counters_follow_bookings_and_seats(self):
+        """Test counters track booking and seat creates and deletes"""
+        booking = Booking.objects.create(movie=self.movie, seat=self.seats[0], user=self.user)
+        services.book_seats(self.movie.showtimes.get(), [s.id for s in self.seats[1:3]], self.user)
+        self.movie.refresh_from_db()
+        self.assertEqual(self.movie.booked_count, 3)
+        
+        booking.delete()
+        self.seats[1].delete()  # Cascades to its booking
+        self.movie.refresh_from_db()
+        self.assertEqual(self.movie.booked_count, 1)
+        self.assertEqual(TheaterStats.objects.get().seat_count, 4)
+    
+    def test_movie_save_keeps_counters(self):
+        """Test saving a movie loaded before a booking does not overwrite its counters"""
+        stale = Movie.objects.get(pk=self.movie.pk)
+        Booking.objects.create(movie=self.movie, seat=self.seats[0], user=self.user)
+        stale.title = "Renamed"
+        stale.save()
+        
+        self.movie.refresh_from_db()
+        self.assertEqual(self.movie.title, "Renamed")
+        self.assertEqual(self.movie.booked_count, 1)
+        self.assertEqual(self.movie.seat_version, 1)
+    
+    def test_movie_detail_reads_counters(self):
+        """Test movie retrieve is one query after the ETag lookup and uses the counters"""
+        Booking.objects.create(movie=self.movie, seat=self.seats[0], user=self.user)
+        url = reverse('api-movie-detail', args=[self.movie.id])
+        with self.assertNumQueries(2):
+            response = self.client.get(url)
+        self.assertEqual(response.data['total_bookings'], 1)
+        self.assertEqual(response.data['available_seats_count'], 4)
+    
+    def test_repair_counters_command(self):
+        """Test repair_counters fixes drifted counters"""
+        Booking.objects.create(movie=self.movie, seat=self.seats[0], user=self.user)
+        Movie.objects.filter(pk=self.movie.pk).update(booked_count=7)
+        TheaterStats.objects.update(seat_count=0)
+        
+        call_command('repair_counters', stdout=StringIO())
+        self.movie.refresh_from_db()
+        self.assertEqual(self.movie.booked_count, 1)
+        self.assertEqual(TheaterStats.objects.get().seat_count, 5)
+
+
+# ==================== LIVE SEAT EVENT TESTS ====================
+
+class SeatEventBrokerTest(TestCase):
+    """Tests for the in-process seat event broker"""
+    
+    def setUp(self):
+        """Set up test data"""
+        self.user = User.objects.create_user(username="testuser", password="pass")
+        self.movie = Movie.objects.create(
+            title="Test Movie",
+            description="Test Description",
+            release_date=date.today() + timedelta(days=7),
+            duration=120
+        )
+        self.seat = Seat.objects.create(seat_number="A1")
+    
+    def test_fan_out_to_subscribers(self):
+        """Test every subscriber of a showtime receives its events"""
+        showtime_id = self.movie.showtimes.get().id
+        
+        async def scenario():
+            broker = SeatEventBroker()
+            first = broker.subscribe(showtime_id)
+            second = broker.subscribe(showtime_id)
+            other = broker.subscribe(showtime_id + 1)
+            
+            broker.publish(showtime_id, [self.seat.id], 'booked')
+            received = [await first.get(timeout=1), await second.get(timeout=1)]
+            missed = await other.get(timeout=0.01)
+            
+            first.close()
+            return received, missed, broker.subscriber_count(showtime_id)
+        
+        received, missed, remaining = asyncio.run(scenario())
+        expected = {'showtime_id': showtime_id, 'seat_id': self.seat.id, 'status': 'booked'}
+        self.assertEqual(received, [expected, expected])
+        self.assertIsNone(missed)
+        self.assertEqual(remaining, 1)
+    
+    def test_booking_changes_published_on_commit(self):
+        """Test booking create and delete publish after the transaction commits"""
+        with patch.object(events.broker, 'publish') as publish:
+            with self.captureOnCommitCallbacks(execute=True):
+                booking = Booking.objects.create(movie=self.movie, seat=self.seat, user=self.user)
+            with self.captureOnCommitCallbacks(execute=True):
+                booking.delete()
+        
+        publish.assert_has_calls([
+            call(booking.showtime_id, [self.seat.id], 'booked'),
+            call(booking.showtime_id, [self.seat.id], 'released'),
+        ])
+    
+    def test_event_stream_unknown_movie(self):
+        """Test the event stream returns 404 for an unknown movie"""
+        response = self.client.get(reverse('api-movie-seat-events', args=[9999]))
+        self.assertEqual(response.status_code, 404)
+
+
+# ==================== ASYNC READ PATH TESTS ====================
+
+class AsyncReadViewsTest(TestCase):
+    """The async read endpoints must return exactly what the viewsets return"""
+    
+    def setUp(self):
+        """Set up test data and log in with a session"""
+        self.user = User.objects.create_user(username="testuser", password="pass")
+        self.client.force_login(self.user)
+        self.movies = [
+            Movie.objects.create(
+                title=f"Movie {n}",
+                description="Test",
+                release_date=date.today() + timedelta(days=n),
+                duration=100
+            )
+            for n in range(3)
+        ]
+        self.movie = self.movies[0]
+        self.seats = [Seat.objects.create(seat_number=f"A{n}") for n in range(1, 6)]
+        Booking.objects.create(movie=self.movie, seat=self.seats[0], user=self.user)
+        Booking.objects.create(movie=self.movies[1], seat=self.seats[1], user=self.user)
+    
+    def assertSameResponse(self, sync_url, async_url, params=None):
+        """Fetch both URLs and compare status and body"""
+        sync_response = self.client.get(sync_url, params, HTTP_ACCEPT='application/json')
+        async_response = self.client.get(async_url, params, HTTP_ACCEPT='application/json')
+        self.assertEqual(async_response.status_code, sync_response.status_code)
+        self.assertEqual(async_response.json(), sync_response.json())
+    
+    def test_movie_endpoints(self):
+        """Test async movie list, detail and available seats match the viewset"""
+        self.assertSameResponse(reverse('api-movie-list'), reverse('api-async-movie-list'))
+        self.assertSameResponse(
+            reverse('api-movie-detail', args=[self.movie.id]),
+            reverse('api-async-movie-detail', args=[self.movie.id])
+        )
+        self.assertSameResponse(
+            reverse('api-movie-detail', args=[9999]),
+            reverse('api-async-movie-detail', args=[9999])
+        )
+        self.assertSameResponse(
+            reverse('api-movie-available-seats', args=[self.movie.id]),
+            reverse('api-async-movie-available-seats', args=[self.movie.id])
+        )
+    
+    def test_movie_list_pages(self):
+        """Test async cursor pages match the viewset's pages"""
+        sync_page = self.client.get(reverse('api-movie-list'), {'page_size': 2}).json()
+        async_page = self.client.get(reverse('api-async-movie-list'), {'page_size': 2}).json()
+        self.assertEqual(async_page['results'], sync_page['results'])
+        
+        # Page links point back at the endpoint that served them
+        self.assertEqual(async_page['next'].replace('/api/async/', '/api/'), sync_page['next'])
+        
+        sync_page = self.client.get(sync_page['next']).json()
+        async_page = self.client.get(async_page['next']).json()
+        self.assertEqual(async_page['results'], sync_page['results'])
+        self.assertEqual(async_page['previous'].replace('/api/async/', '/api/'), sync_page['previous'])
+    
+    def test_check_availability(self):
+        """Test async check_availability matches the viewset"""
+        for seat in self.seats[:2]:
+            self.assertSameResponse(
+                reverse('api-seat-check-availability', args=[seat.id]),
+                reverse('api-async-seat-check-availability', args=[seat.id]),
+                {'movie_id': self.movie.id}
+            )
+        self.assertSameResponse(
+            reverse('api-seat-check-availability', args=[self.seats[0].id]),
+            reverse('api-async-seat-check-availability', args=[self.seats[0].id])
+        )
+    
+    def test_booking_endpoints(self):
+        """Test async my_bookings and upcoming match the viewset"""
+        self.assertSameResponse(
+            reverse('api-booking-my-bookings'), reverse('api-async-booking-my-bookings')
+        )
+        self.assertSameResponse(
+            reverse('api-booking-upcoming'), reverse('api-async-booking-upcoming')
+        )
+    
+    def test_booking_endpoints_require_login(self):
+        """Test async booking reads reject anonymous users like the viewset"""
+        self.client.logout()
+        self.assertSameResponse(
+            reverse('api-booking-my-bookings'), reverse('api-async-booking-my-bookings')
+        )
+
+
+class BenchmarkingHelpersTest(TestCase):
+    """Unit tests for the benchmark statistics helpers"""
+    
+    def test_percentile(self):
+        """Test nearest-rank percentiles"""
+        values = list(range(1, 101))
+        self.assertEqual(percentile(values, 50), 50)
+        self.assertEqual(percentile(values, 99), 99)
+        self.assertEqual(percentile(values, 100), 100)
+        self.assertIsNone(percentile([], 50))
+    
+    def test_summarize(self):
+        """Test load summaries count errors and convert to milliseconds"""
+        summary = summarize([0.010, 0.020, 0.030, 0.040], 2.0, [200, 201, 409, 500])
+        self.assertEqual(summary['requests'], 4)
+        self.assertEqual(summary['errors'], 1)
+        self.assertEqual(summary['throughput_rps'], 2.0)
+        self.assertEqual(summary['p50_ms'], 20.0)
+    
+    def test_run_users_and_summarize_steps(self):
+        """Test per-user flows are collected and summarized per step"""
+        def flow(i):
+            return [('list', 0.010, 200), ('book', 0.020, 201 if i == 0 else 400)]
+        
+        records, elapsed = run_users(flow, 3)
+        self.assertEqual(len(records), 6)
+        steps = summarize_steps(records, 2.0)
+        self.assertEqual(steps['list']['requests'], 3)
+        self.assertEqual(steps['book']['p50_ms'], 20.0)
+        self.assertEqual(steps['book']['errors'], 0)
+    
+    def test_count_queries(self):
+        """Test queries run by a callable are counted"""
+        self.assertEqual(count_queries(lambda: list(Movie.objects.all())), 1)
+
+
+# ==================== CONDITIONAL GET TESTS ====================
+
+class ConditionalGetTest(APITestCase):
+    """Integration tests for ETags and If-None-Match"""
+    
+    def setUp(self):
+        """Set up test data and API client"""
+        self.user = User.objects.create_user(username="testuser", password="pass")
+        self.client.force_authenticate(user=self.user)
+        self.movie = Movie.objects.create(
+            title="Test Movie",
+            description="Test Description",
+            release_date=date.today() + timedelta(days=7),
+            duration=120
+        )
+        self.seat1 = Seat.objects.create(seat_number="A1")
+        self.seat2 = Seat.objects.create(seat_number="A2")
+    
+    def etag(self, url):
+        """GET url and return its ETag"""
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn('ETag', response)
+        return response['ETag']
+    
+    def test_matching_etag_returns_304(self):
+        """Test a matching If-None-Match is answered without running the view"""
+        url = reverse('api-movie-available-seats', args=[self.movie.id])
+        etag = self.etag(url)
+        
+        with self.assertNumQueries(1):
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response.content, b'')
+    
+    def test_booking_changes_seat_map_etag(self):
+        """Test booking a seat changes the seat map ETag but not the catalog ETag"""
+        seat_map_url = reverse('api-movie-available-seats', args=[self.movie.id])
+        list_url = reverse('api-movie-list')
+        seat_map_etag = self.etag(seat_map_url)
+        list_etag = self.etag(list_url)
+        
+        Booking.objects.create(movie=self.movie, seat=self.seat1, user=self.user)
+        
+        response = self.client.get(seat_map_url, HTTP_IF_NONE_MATCH=seat_map_etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data), 1)
+        response = self.client.get(list_url, HTTP_IF_NONE_MATCH=list_etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+    
+    def test_hold_changes_seat_map_etag(self):
+        """Test holding a seat changes the availability check ETag"""
+        url = reverse('api-seat-check-availability', args=[self.seat1.id]) + f'?movie_id={self.movie.id}'
+        etag = self.etag(url)
+        
+        services.hold_seats(self.movie.showtimes.get(), [self.seat1.id], self.user)
+        
+        self.assertNotEqual(self.etag(url), etag)
+    
+    def test_catalog_edit_changes_etags(self):
+        """Test editing a movie or seat changes every ETag"""
+        movie_url = reverse('api-movie-detail', args=[self.movie.id])
+        seat_url = reverse('api-seat-list')
+        movie_etag = self.etag(movie_url)
+        seat_etag = self.etag(seat_url)
+        
+        self.movie.title = "Renamed"
+        self.movie.save()
+        self.assertNotEqual(self.etag(movie_url), movie_etag)
+        
+        seat_etag_after_movie = self.etag(seat_url)
+        self.assertNotEqual(seat_etag_after_movie, seat_etag)
+        Seat.objects.create(seat_number="A3")
+        self.assertNotEqual(self.etag(seat_url), seat_etag_after_movie)
+    
+    def test_movie_etag_ignores_foreign_showtime(self):
+        """Test ?showtime_id= of another movie does not tag a movie detail with that movie's version"""
+        other = Movie.objects.create(
+            title="Other Movie",
+            description="Test Description",
+            release_date=date.today() + timedelta(days=7),
+            duration=120
+        )
+        url = reverse('api-movie-detail', args=[self.movie.id]) + f'?showtime_id={other.showtimes.get().id}'
+        etag = self.etag(url)
+        
+        Booking.objects.create(movie=self.movie, seat=self.seat1, user=self.user)
+        
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['total_bookings'], 1)
+    
+    def test_browsable_api_is_not_tagged(self):
+        """Test the browsable API, which embeds user data, gets no ETag"""
+        url = reverse('api-movie-detail', args=[self.movie.id])
+        self.assertTrue(self.etag(url).endswith('-json"'))
+        self.assertNotIn('ETag', self.client.get(url, HTTP_ACCEPT='text/html'))
+    
+    def test_template_views_conditional_get(self):
+        """Test template pages answer If-None-Match with 304"""
+        client = Client()
+        for url in [reverse('movie_list'), reverse('movie_detail', args=[self.movie.id]),
+                    reverse('seat_booking', args=[self.movie.id])]:
+            client.get(url)  # Pick up the CSRF cookie, which is part of the page ETag
+            response = client.get(url)
+            self.assertIn('ETag', response)
+            response = client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+            self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+    
+    def test_writes_are_not_tagged(self):
+        """Test POST responses never get an ETag"""
+        response = self.client.post(
+            reverse('api-seat-hold'),
+            {'movie': self.movie.id, 'seats': [self.seat1.id]},
+            format='json'
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertNotIn('ETag', response)
+
+
+
+# ==================== SHOWTIME TESTS ====================
+
+class ShowtimeTest(APITestCase):
+    """Tests for auditoriums, showtimes and per-showtime bookings"""
+    
+    def setUp(self):
+        """Set up a movie with two showtimes in different auditoriums"""
+        self.user = User.objects.create_user(username="testuser", password="pass")
+        self.client.force_authenticate(user=self.user)
+        self.movie = Movie.objects.create(
+            title="Test Movie",
+            description="Test Description",
+            release_date=date.today() + timedelta(days=7),
+            duration=120
+        )
+        self.main = Auditorium.get_default()
+        self.small = Auditorium.objects.create(name="Small")
+        self.seat = Seat.objects.create(seat_number="A1")
+        self.small_seat = Seat.objects.create(seat_number="A1", auditorium=self.small)
+        self.evening = self.movie.showtimes.get()
+        self.late = Showtime.objects.create(
+            movie=self.movie,
+            auditorium=self.main,
+            starts_at=self.evening.starts_at + timedelta(hours=3)
+        )
+        self.matinee = Showtime.objects.create(
+            movie=self.movie,
+            auditorium=self.small,
+            starts_at=self.evening.starts_at - timedelta(hours=5)
+        )
+    
+    def test_movie_gets_default_showtime(self):
+        """Test a new movie is scheduled once in the main auditorium"""
+        self.assertEqual(self.evening.auditorium, self.main)
+        self.assertEqual(timezone.localtime(self.evening.starts_at).date(), self.movie.release_date)
+        self.assertEqual(Showtime.objects.primary_for(self.movie.id), self.evening)
+        self.assertEqual(self.main.seats.count(), 1)
+        self.main.refresh_from_db()
+        self.assertEqual(self.main.seat_count, 1)
+    
+    def test_same_seat_books_per_showtime(self):
+        """Test one seat can be booked once for each showtime in its auditorium"""
+        services.book_seats(self.evening, [self.seat.id], self.user)
+        results = services.book_seats(self.late, [self.seat.id], self.user)
+        self.assertEqual(results[0]['status'], 'booked')
+        self.assertEqual(Booking.objects.filter(seat=self.seat).count(), 2)
+        self.assertTrue(all(b.movie_id == self.movie.id for b in Booking.objects.all()))
+        
+        results = services.book_seats(self.late, [self.seat.id], self.user)
+        self.assertEqual(results[0]['status'], 'conflict')
+    
+    def test_seat_from_other_auditorium_not_found(self):
+        """Test a showtime only books seats from its own auditorium"""
+        data = {'showtime': self.matinee.id, 'seats': [self.seat.id, self.small_seat.id]}
+        response = self.client.post(reverse('api-booking-bulk'), data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        statuses = [r['status'] for r in response.data['results']]
+        self.assertEqual(statuses, ['not_found', 'booked'])
+    
+    def test_showtime_available_seats(self):
+        """Test a showtime lists only its auditorium's free seats"""
+        url = reverse('api-showtime-available-seats', args=[self.matinee.id])
+        response = self.client.get(url)
+        self.assertEqual([s['id'] for s in response.data], [self.small_seat.id])
+        
+        services.book_seats(self.evening, [self.seat.id], self.user)
+        response = self.client.get(reverse('api-showtime-available-seats', args=[self.late.id]))
+        self.assertEqual([s['id'] for s in response.data], [self.seat.id])
+    
+    def test_book_explicit_showtime(self):
+        """Test the booking API accepts a showtime and rejects a mismatched movie"""
+        other = Movie.objects.create(
+            title="Other", description="Test", release_date=date.today(), duration=90
+        )
+        url = reverse('api-booking-list')
+        response = self.client.post(url, {'showtime': self.late.id, 'seat': self.seat.id}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['movie'], self.movie.id)
+        self.assertEqual(response.data['showtime'], self.late.id)
+        
+        response = self.client.post(
+            url, {'showtime': self.late.id, 'movie': other.id, 'seat': self.seat.id}, format='json'
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+    
+    def test_showtime_update_only_moves_start(self):
+        """Test a showtime cannot change movie or auditorium once scheduled"""
+        url = reverse('api-showtime-detail', args=[self.late.id])
+        response = self.client.patch(url, {'auditorium': self.small.id}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        
+        starts_at = self.late.starts_at + timedelta(minutes=30)
+        response = self.client.patch(url, {'starts_at': starts_at.isoformat()}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.late.refresh_from_db()
+        self.assertEqual(self.late.starts_at, starts_at)
+    
+    def test_delete_showtime_uncounts_bookings(self):
+        """Test deleting a showtime drops its bookings from the movie counter"""
+        services.book_seats(self.evening, [self.seat.id], self.user)
+        services.book_seats(self.late, [self.seat.id], self.user)
+        response = self.client.delete(reverse('api-showtime-detail', args=[self.late.id]))
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        self.movie.refresh_from_db()
+        self.assertEqual(self.movie.booked_count, 1)
+        self.assertEqual(Booking.objects.get().showtime, self.evening)
+
+
+
+# ==================== INDEX AUDIT TESTS ====================
+
+class IndexAuditTest(TestCase):
+    """Tests for the EXPLAIN-based index audit"""
+    
+    def test_hot_queries_use_indexes(self):
+        """Test no audited endpoint query needs an unexpected sequential scan"""
+        out = StringIO()
+        call_command('audit_indexes', '--strict', stdout=out)
+        self.assertIn('0 with unexpected sequential scans', out.getvalue())
+    
+    def test_free_seats_use_partial_index(self):
+        """Test the catalog's available seats are read from the partial index"""
+        plan = indexaudit.explain(Seat.objects.filter(is_booked=False))
+        self.assertIn('seat_free_order_idx', '\n'.join(plan))
+    
+    def test_sequential_scan_detection(self):
+        """Test SQLite and PostgreSQL plans are parsed for sequential scans"""
+        sqlite_plan = [
+            '3 0 0 SCAN booking_seat',
+            '5 0 0 SCAN booking_movie USING INDEX movie_release_id_idx',
+            '9 0 0 SEARCH booking_booking USING INDEX booking_user_date_id_idx (user_id=?)',
+        ]
+        postgres_plan = [
+            'Nested Loop  (cost=0.29..16.34 rows=1 width=8)',
+            '  ->  Seq Scan on booking_seat  (cost=0.00..1.01 rows=1 width=8)',
+            '  ->  Index Scan using booking_movie_pkey on booking_movie  (cost=0.29..8.30 rows=1 width=8)',
+        ]
+        self.assertEqual(indexaudit.sequential_scans(sqlite_plan, 'sqlite'), ['booking_seat'])
+        self.assertEqual(indexaudit.sequential_scans(postgres_plan, 'postgresql'), ['booking_seat'])
+
+
+
+# ==================== OPTIMISTIC BOOKING TESTS ====================
+
+class OptimisticBookingTest(APITestCase):
+    """Tests for booking inserts guarded by the unique constraint alone"""
+    
+    def setUp(self):
+        """Set up test data"""
+        self.user = User.objects.create_user(username="testuser", password="pass")
+        self.other_user = User.objects.create_user(username="otheruser", password="pass")
+        self.movie = Movie.objects.create(
+            title="Test Movie",
+            description="Test Description",
+            release_date=date.today() + timedelta(days=7),
+            duration=120
+        )
+        self.seat = Seat.objects.create(seat_number="A1")
+    
+    def serializer_for(self, user):
+        """A validated, unsaved booking request for the seat by user"""
+        serializer = BookingCreateSerializer(
+            data={'movie': self.movie.id, 'seat': self.seat.id},
+            context={'request': SimpleNamespace(user=user)}
+        )
+        self.assertTrue(serializer.is_valid(), serializer.errors)
+        return serializer
+    
+    def test_racing_bookings_create_one(self):
+        """Test two requests that both passed validation cannot double-book"""
+        first = self.serializer_for(self.user)
+        second = self.serializer_for(self.other_user)
+        
+        first.save()
+        with self.assertRaises(ValidationError) as ctx:
+            second.save()
+        
+        self.assertIn('already booked', str(ctx.exception.detail['non_field_errors'][0]))
+        self.assertEqual(Booking.objects.filter(seat=self.seat).count(), 1)
+        self.movie.refresh_from_db()
+        self.assertEqual(self.movie.booked_count, 1)
+        self.assertEqual(availability.booked_seat_ids(self.movie.showtimes.get().id), {self.seat.id})
+    
+    def test_create_does_not_look_up_bookings(self):
+        """Test the API inserts without first querying for an existing booking"""
+        self.client.force_authenticate(user=self.user)
+        url = reverse('api-booking-list')
+        data = {'movie': self.movie.id, 'seat': self.seat.id}
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(url, data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertFalse([
+            q['sql'] for q in queries if q['sql'].startswith('SELECT') and '"booking_booking"' in q['sql']
+        ])
+        
+        response = self.client.post(url, data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(
+            response.data, {'non_field_errors': ['This seat is already booked for this movie.']}
+        )
+    
+    def test_other_integrity_errors_propagate(self):
+        """Test an integrity error other than a taken seat is not reported as one"""
+        serializer = BookingCreateSerializer(
+            data={'movie': self.movie.id, 'seat': self.seat.id}, context={'request': SimpleNamespace()}
+        )
+        self.assertTrue(serializer.is_valid(), serializer.errors)
+        with self.assertRaises(IntegrityError):
+            serializer.save()  # No user
+
+
+
+# ==================== SEAT CATALOG CACHE TESTS ====================
+
+class SeatCatalogTest(TransactionTestCase):
+    """
+    Tests for the process-local seat catalog. These run outside a test
+    transaction, since catalogs read inside one are never cached.
+    """
+    
+    def setUp(self):
+        """Set up a movie and seats with an empty cache"""
+        seatcatalog.invalidate()
+        self.movie = Movie.objects.create(
+            title="Test Movie",
+            description="Test Description",
+            release_date=date.today() + timedelta(days=7),
+            duration=120
+        )
+        self.seats = [Seat.objects.create(seat_number=f"A{n}") for n in range(1, 6)]
+        self.url = reverse('api-movie-available-seats', args=[self.movie.id])
+    
+    def tearDown(self):
+        """Leave no catalog behind for other tests"""
+        seatcatalog.invalidate()
+    
+    def seat_queries(self):
+        """GET the seat map; returns the response and the queries that read booking_seat"""
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.url)
+        return response, [q['sql'] for q in queries if 'FROM "booking_seat"' in q['sql']]
+    
+    def test_seat_map_reads_cached_catalog(self):
+        """Test the seat table is read once, then served from the cache"""
+        response, first = self.seat_queries()
+        response, second = self.seat_queries()
+        self.assertEqual(len(first), 1)
+        self.assertEqual(second, [])
+        self.assertEqual(len(response.data), 5)
+    
+    def test_seat_signals_invalidate(self):
+        """Test adding or removing a seat reloads the catalog"""
+        self.seat_queries()
+        Seat.objects.create(seat_number="A6")
+        self.seats[0].delete()
+        response, queries = self.seat_queries()
+        self.assertEqual(len(queries), 1)
+        self.assertEqual([s['seat_number'] for s in response.data], ['A2', 'A3', 'A4', 'A5', 'A6'])
+    
+    def test_other_worker_change_reloads(self):
+        """Test a seat change made by another process is noticed through the catalog version"""
+        self.seat_queries()
+        stale = seatcatalog._catalog
+        Seat.objects.create(seat_number="A6")
+        seatcatalog._catalog = stale  # This worker never saw the signal
+        response, queries = self.seat_queries()
+        self.assertEqual(len(queries), 1)
+        self.assertEqual(len(response.data), 6)
+    
+    def test_booked_and_held_seats_excluded(self):
+        """Test the Python join leaves out booked and held seats without touching the cache"""
+        user = User.objects.create_user(username="testuser", password="pass")
+        showtime = self.movie.showtimes.get()
+        services.book_seats(showtime, [self.seats[0].id], user)
+        services.hold_seats(showtime, [self.seats[1].id], user)
+        self.assertEqual(
+            [s.seat_number for s in seatcatalog.available_seats(showtime)], ['A3', 'A4', 'A5']
+        )
+        cached = seatcatalog.get_catalog().by_id[self.seats[0].id]
+        self.assertFalse(hasattr(cached, 'is_available_for_movie'))
+    
+    def test_not_cached_inside_transaction(self):
+        """Test a catalog read inside a transaction is not kept"""
+        with transaction.atomic():
+            catalog = seatcatalog.get_catalog()
+        self.assertEqual(len(catalog.by_id), 5)
+        self.assertIsNone(seatcatalog._catalog)
+
+
+# ==================== RESPONSE CACHE TESTS ====================
+
+class ResponseCacheTest(APITestCase):
+    """Tests for the versioned movie list and detail response cache"""
+    
+    def setUp(self):
+        """Set up a movie with an empty cache and counters"""
+        caches[responsecache.CACHE_ALIAS].clear()
+        responsecache.reset_stats()
+        self.user = User.objects.create_user(username="testuser", password="pass")
+        self.movie = Movie.objects.create(
+            title="Test Movie",
+            description="Test Description",
+            release_date=date.today() + timedelta(days=7),
+            duration=120
+        )
+        self.seat = Seat.objects.create(seat_number="A1")
+        self.list_url = reverse('api-movie-list')
+        self.detail_url = reverse('api-movie-detail', args=[self.movie.id])
+    
+    def get(self, url):
+        """GET url; returns the response and its query count"""
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response, len(queries)
+    
+    def test_list_served_from_cache(self):
+        """Test a repeated list is served from the cache with only the version query"""
+        first, first_queries = self.get(self.list_url)
+        second, second_queries = self.get(self.list_url)
+        self.assertEqual(second.data, first.data)
+        self.assertEqual(second['ETag'], first['ETag'])
+        self.assertEqual(second_queries, 1)
+        self.assertLess(second_queries, first_queries)
+        self.assertEqual(responsecache.stats()['movie-list'], {'hits': 1, 'misses': 1})
+    
+    def test_movie_change_misses(self):
+        """Test editing a movie changes the key, so the list is rebuilt"""
+        self.get(self.list_url)
+        self.movie.title = "Renamed"
+        self.movie.save()
+        response, _ = self.get(self.list_url)
+        self.assertEqual(response.data['results'][0]['title'], "Renamed")
+        self.assertEqual(responsecache.stats()['movie-list'], {'hits': 0, 'misses': 2})
+    
+    def test_detail_follows_bookings(self):
+        """Test a booking changes the cached detail counts"""
+        first, _ = self.get(self.detail_url)
+        services.book_seats(self.movie.showtimes.get(), [self.seat.id], self.user)
+        second, _ = self.get(self.detail_url)
+        self.assertEqual(second.data['total_bookings'], first.data['total_bookings'] + 1)
+        self.assertEqual(second.data['available_seats_count'], first.data['available_seats_count'] - 1)
+        self.get(self.detail_url)
+        self.assertEqual(responsecache.stats()['movie-detail'], {'hits': 1, 'misses': 2})
+    
+    def test_errors_not_cached(self):
+        """Test a 404 is never stored"""
+        url = reverse('api-movie-detail', args=[self.movie.id + 100])
+        self.assertEqual(self.client.get(url).status_code, status.HTTP_404_NOT_FOUND)
+        self.assertEqual(responsecache.stats(), {})
+    
+    def test_template_list_served_from_cache(self):
+        """Test the movie list page reads the movies once per catalog version"""
+        client = Client()
+        client.get(reverse('movie_list'))
+        with CaptureQueriesContext(connection) as queries:
+            response = client.get(reverse('movie_list'))
+        self.assertContains(response, "Test Movie")
+        self.assertFalse(any('FROM "booking_movie"' in q['sql'] for q in queries))
+        self.assertEqual(responsecache.stats()['movie-list-page'], {'hits': 1, 'misses': 1})
+
+
+# ==================== FAST LIST TESTS ====================
+
+class FastListTest(APITestCase):
+    """Tests for the .values() list fast path"""
+    
+    def setUp(self):
+        """Set up movies, seats and bookings with a staff client"""
+        caches[responsecache.CACHE_ALIAS].clear()
+        self.staff = User.objects.create_user(username="staff", password="pass", is_staff=True)
+        self.client.force_authenticate(user=self.staff)
+        self.movies = [
+            Movie.objects.create(
+                title=f"Movie {n}",
+                description="Test Description",
+                release_date=date.today() + timedelta(days=n % 2),
+                duration=100 + n
+            )
+            for n in range(5)
+        ]
+        self.seats = [Seat.objects.create(seat_number=f"A{n}") for n in range(1, 6)]
+        services.book_seats(
+            self.movies[0].showtimes.get(), [seat.id for seat in self.seats[:3]], self.staff
+        )
+    
+    def both_paths(self, url):
+        """GET url with the serializers and with the fast path; returns both bodies"""
+        bodies = []
+        for enabled in (False, True):
+            caches[responsecache.CACHE_ALIAS].clear()
+            with override_settings(FAST_LIST_RESPONSES=enabled):
+                response = self.client.get(url, HTTP_ACCEPT='application/json')
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            bodies.append(response.content)
+        return bodies
+    
+    def test_output_is_byte_identical(self):
+        """Test each list renders the same bytes on both paths"""
+        for name in ('api-movie-list', 'api-seat-list', 'api-booking-list'):
+            serializer_body, values_body = self.both_paths(reverse(name))
+            self.assertEqual(values_body, serializer_body, name)
+    
+    def test_cursor_pages_identical(self):
+        """Test cursor links and following pages match, ties on the ordering field included"""
+        url = reverse('api-movie-list') + '?page_size=2'
+        serializer_body, values_body = self.both_paths(url)
+        self.assertEqual(values_body, serializer_body)
+        next_url = json.loads(values_body)['next']
+        serializer_body, values_body = self.both_paths(next_url)
+        self.assertEqual(values_body, serializer_body)
+        self.assertEqual(len(json.loads(values_body)['results']), 2)
+    
+    def test_method_fields_rejected(self):
+        """Test serializers with method fields cannot use the fast path"""
+        with self.assertRaises(ImproperlyConfigured):
+            ValuesRepresentation(MovieDetailSerializer)
+
+
+# ==================== COMPACT SEAT MAP TESTS ====================
+
+class SeatMapCodecTest(TestCase):
+    """Unit tests for the seat availability encodings"""
+    
+    def test_round_trips(self):
+        """Test both encodings decode back to the same flags"""
+        for flags in ([], [True], [False], [True] * 9, [False, False, True] * 7 + [True]):
+            bitset = seatmapcodec.encode_bitset(flags)
+            self.assertEqual(seatmapcodec.decode_bitset(bitset, len(flags)), flags)
+            self.assertEqual(seatmapcodec.decode_runs(seatmapcodec.encode_runs(flags)), flags)
+    
+    def test_known_encodings(self):
+        """Test the bit order and that runs start with an available run"""
+        flags = [True, False, False, True, True, True, True, True, False]
+        self.assertEqual(seatmapcodec.encode_bitset(flags), 'nwA=')  # 0b10011111, 0b00000000
+        self.assertEqual(seatmapcodec.encode_runs(flags), [1, 2, 5, 1])
+        self.assertEqual(seatmapcodec.encode_runs([False, True]), [0, 1, 1])
+
+
+class CompactSeatMapAPITest(APITestCase):
+    """Integration tests for /api/movies/{id}/seatmap/ and auditorium layouts"""
+    
+    def setUp(self):
+        """Set up a movie with seats and one booking"""
+        self.user = User.objects.create_user(username="testuser", password="pass")
+        self.movie = Movie.objects.create(
+            title="Test Movie",
+            description="Test Description",
+            release_date=date.today() + timedelta(days=7),
+            duration=120
+        )
+        self.seats = [Seat.objects.create(seat_number=f"A{n}") for n in range(1, 10)]
+        self.showtime = self.movie.showtimes.get()
+        services.book_seats(self.showtime, [self.seats[1].id], self.user)
+        self.url = reverse('api-movie-seatmap', args=[self.movie.id])
+    
+    def decoded(self, url=None, **params):
+        """GET the seat map and its layout; returns {seat_number: available}"""
+        seat_map = self.client.get(url or self.url, params).data
+        layout = self.client.get(seat_map['layout_url'])
+        self.assertEqual(layout.status_code, status.HTTP_200_OK)
+        if seat_map['encoding'] == seatmapcodec.BITSET:
+            flags = seatmapcodec.decode_bitset(seat_map['availability'], seat_map['seat_count'])
+        else:
+            flags = seatmapcodec.decode_runs(seat_map['availability'])
+        return {number: flag for (_, number), flag in zip(layout.data['seats'], flags)}
+    
+    def test_matches_available_seats(self):
+        """Test both encodings agree with the available_seats endpoint"""
+        expected = {seat.seat_number: seat.id != self.seats[1].id for seat in self.seats}
+        self.assertEqual(self.decoded(), expected)
+        self.assertEqual(self.decoded(encoding='rle'), expected)
+        
+        available = self.client.get(reverse('api-movie-available-seats', args=[self.movie.id])).data
+        self.assertEqual(
+            {s['seat_number'] for s in available}, {n for n, free in expected.items() if free}
+        )
+    
+    def test_held_seats_unavailable(self):
+        """Test held seats are flagged like booked ones"""
+        services.hold_seats(self.showtime, [self.seats[2].id], self.user)
+        decoded = self.decoded()
+        self.assertFalse(decoded['A2'])
+        self.assertFalse(decoded['A3'])
+        self.assertTrue(decoded['A4'])
+    
+    def test_layout_versioned_and_immutable(self):
+        """Test the layout URL is cacheable forever and changes with the catalog"""
+        layout_url = self.client.get(self.url).data['layout_url']
+        response = self.client.get(layout_url)
+        self.assertIn('immutable', response['Cache-Control'])
+        
+        Seat.objects.create(seat_number="B1")
+        stale = self.client.get(layout_url)
+        self.assertEqual(stale.status_code, status.HTTP_302_FOUND)
+        self.assertNotEqual(stale['Location'], layout_url)
+        self.assertEqual(self.client.get(self.url).data['layout_url'], stale['Location'])
+        self.assertEqual(len(self.client.get(stale['Location']).data['seats']), 10)
+    
+    def test_etag_per_encoding(self):
+        """Test the encodings have distinct ETags and a booking changes them"""
+        bitset = self.client.get(self.url)['ETag']
+        rle = self.client.get(self.url, {'encoding': 'rle'})['ETag']
+        self.assertNotEqual(bitset, rle)
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=bitset)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        
+        services.book_seats(self.showtime, [self.seats[3].id], self.user)
+        self.assertNotEqual(self.client.get(self.url)['ETag'], bitset)
+    
+    def test_unknown_encoding_and_movie(self):
+        """Test bad encodings are rejected and unknown movies or auditoriums are 404"""
+        self.assertEqual(
+            self.client.get(self.url, {'encoding': 'png'}).status_code, status.HTTP_400_BAD_REQUEST
+        )
+        missing = reverse('api-movie-seatmap', args=[self.movie.id + 100])
+        self.assertEqual(self.client.get(missing).status_code, status.HTTP_404_NOT_FOUND)
+        layout = reverse('api-auditorium-layout', args=[self.showtime.auditorium_id + 100])
+        self.assertEqual(self.client.get(layout).status_code, status.HTTP_404_NOT_FOUND)
+    
+    def test_payload_smaller(self):
+        """Test the compact map is a fraction of the per-seat JSON"""
+        for n in range(10, 200):
+            Seat.objects.create(seat_number=f"A{n}")
+        full = self.client.get(reverse('api-movie-available-seats', args=[self.movie.id]))
+        compact = self.client.get(self.url)
+        self.assertLess(len(compact.content) * 10, len(full.content))
+
+
+# ==================== SEAT LAYOUT TESTS ====================
+
+class SeatLayoutTest(APITestCase):
+    """Tests for seat rows and columns and generated layouts"""
+    
+    def setUp(self):
+        """Set up an authenticated client and an empty auditorium"""
+        self.user = User.objects.create_user(username="testuser", password="pass")
+        self.client.force_authenticate(user=self.user)
+        self.auditorium = Auditorium.objects.create(name="Screen 2")
+        self.generate_url = reverse('api-auditorium-generate-seats', args=[self.auditorium.id])
+    
+    def test_row_labels(self):
+        """Test rows are labelled A-Z then AA onwards, and seat numbers parse back"""
+        self.assertEqual([layouts.row_label(n) for n in (1, 26, 27, 40, 702)], ['A', 'Z', 'AA', 'AN', 'ZZ'])
+        for n in (1, 26, 27, 40, 702):
+            self.assertEqual(layouts.row_index(layouts.row_label(n)), n)
+        self.assertEqual(layouts.parse_seat_number('AB12'), (28, 12))
+        self.assertEqual(layouts.parse_seat_number('VIP'), (None, None))
+    
+    def test_natural_order(self):
+        """Test seats sort by row and column rather than lexically"""
+        for number in ("A10", "B1", "A2", "A1"):
+            Seat.objects.create(seat_number=number, auditorium=self.auditorium)
+        seat = Seat.objects.get(seat_number="A10")
+        self.assertEqual((seat.row, seat.column), (1, 10))
+        self.assertEqual(
+            [s.seat_number for s in self.auditorium.seats.all()], ["A1", "A2", "A10", "B1"]
+        )
+        seat.seat_number = "C3"
+        seat.save()
+        self.assertEqual((seat.row, seat.column), (3, 3))
+    
+    def test_generate_seats(self):
+        """Test a 2,000-seat room is built with batched inserts"""
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(
+                self.generate_url, {'rows': 40, 'seats_per_row': 50, 'section': 'Stalls'}, format='json'
+            )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data, {'created': 2000, 'seat_count': 2000})
+        # A few batched INSERTs (SQLite caps the parameters per query), not one per seat
+        inserts = [q for q in queries if q['sql'].startswith('INSERT')]
+        self.assertLessEqual(len(inserts), 15)
+        self.assertLessEqual(len(queries) - len(inserts), 10)
+        
+        seats = list(self.auditorium.seats.all())
+        self.assertEqual(seats[0].seat_number, "A1")
+        self.assertEqual(seats[49].seat_number, "A50")
+        self.assertEqual(seats[-1].seat_number, "AN50")
+        self.assertEqual((seats[-1].section, seats[-1].row, seats[-1].column), ('Stalls', 40, 50))
+        self.assertEqual(counters.get_seat_count(), Seat.objects.count())
+    
+    def test_generate_second_section(self):
+        """Test a further section continues below the existing rows"""
+        layouts.generate_layout(self.auditorium, 2, 3)
+        response = self.client.post(
+            self.generate_url, {'rows': 1, 'seats_per_row': 3, 'section': 'Balcony', 'first_row': 3},
+            format='json'
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(
+            [s.seat_number for s in self.auditorium.seats.filter(section='Balcony')], ["C1", "C2", "C3"]
+        )
+    
+    def test_generate_rejects_clashes_and_oversize(self):
+        """Test existing seat numbers and oversized layouts are refused"""
+        Seat.objects.create(seat_number="B2", auditorium=self.auditorium)
+        response = self.client.post(self.generate_url, {'rows': 2, 'seats_per_row': 2}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("B2", response.data['error'])
+        self.assertEqual(self.auditorium.seats.count(), 1)
+        
+        response = self.client.post(self.generate_url, {'rows': 200, 'seats_per_row': 100}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+    
+    def test_generated_seats_in_seat_map(self):
+        """Test generated seats show up in the catalog-backed seat maps"""
+        movie = Movie.objects.create(
+            title="Test Movie",
+            description="Test Description",
+            release_date=date.today() + timedelta(days=7),
+            duration=120
+        )
+        Showtime.objects.create(movie=movie, auditorium=self.auditorium, starts_at=timezone.now())
+        seatcatalog.get_catalog()
+        layouts.generate_layout(self.auditorium, 3, 4)
+        showtime = movie.showtimes.get(auditorium=self.auditorium)
+        self.assertEqual(len(seatcatalog.available_seats(showtime)), 12)
+    
+    def test_delete_auditorium(self):
+        """Test deleting a room runs no per-seat queries and keeps the counters right"""
+        movie = Movie.objects.create(
+            title="Test Movie",
+            description="Test Description",
+            release_date=date.today() + timedelta(days=7),
+            duration=120
+        )
+        query_counts = []
+        for rows in (1, 40):
+            auditorium = Auditorium.objects.create(name=f"Screen {rows + 10}")
+            layouts.generate_layout(auditorium, rows, 10)
+            showtime = Showtime.objects.create(movie=movie, auditorium=auditorium, starts_at=timezone.now())
+            for seat in auditorium.seats.all()[:3]:
+                Booking.objects.create(movie=movie, showtime=showtime, seat=seat, user=self.user)
+            
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.delete(reverse('api-auditorium-detail', args=[auditorium.id]))
+            self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+            # Seats are deleted 100 per query; everything else is independent of the room size
+            seat_deletes = [q for q in queries if q['sql'].startswith('DELETE FROM "booking_seat" ')]
+            self.assertLessEqual(len(seat_deletes), rows // 10 + 1)
+            query_counts.append(len(queries) - len(seat_deletes))
+            
+            movie.refresh_from_db()
+            self.assertEqual(movie.booked_count, 0)
+            self.assertEqual(counters.get_seat_count(), Seat.objects.count())
+        self.assertEqual(query_counts[0], query_counts[1])
+    
+    def test_command(self):
+        """Test the generate_layout management command"""
+        out = StringIO()
+        call_command('generate_layout', 'Screen 3', '--rows', '5', '--seats-per-row', '10', stdout=out)
+        self.assertIn('50 seats in rows A-E', out.getvalue())
+        self.assertEqual(Auditorium.objects.get(name='Screen 3').seat_count, 50)
+
+
+# ==================== SCALE SEEDING TESTS ====================
+
+class SeedScaleTest(TestCase):
+    """Tests for the synthetic data seeding"""
+    
+    def seed_snapshot(self, seed=0):
+        """Seed small volumes in a rolled-back transaction; returns what was created"""
+        with transaction.atomic():
+            seeding.seed(users=20, movies=10, seats=120, bookings=300, seats_per_room=50,
+                         seed=seed, batch_size=7)
+            snapshot = {
+                'titles': list(Movie.objects.order_by('id').values_list('title', 'release_date')),
+                'bookings': sorted(Booking.objects.values_list(
+                    'movie__title', 'seat__seat_number', 'user__username'
+                )),
+            }
+            transaction.set_rollback(True)
+        return snapshot
+    
+    def test_volumes_and_denormalized_state(self):
+        """Test the requested rows exist and the counters and indexes agree with them"""
+        report = seeding.seed(users=20, movies=10, seats=150, bookings=300, seats_per_room=50, batch_size=7)
+        self.assertEqual({step: r['rows'] for step, r in report.items()},
+                         {'users': 20, 'seats': 150, 'movies': 10, 'bookings': 300})
+        self.assertEqual(Auditorium.objects.filter(name__startswith='Seed 0 room').count(), 3)
+        self.assertEqual(counters.repair_booked_counts(), 0)
+        self.assertEqual(counters.get_seat_count(), Seat.objects.count())
+        for showtime in Showtime.objects.all():
+            self.assertEqual(
+                availability.booked_seat_ids(showtime.id),
+                set(Booking.objects.filter(showtime=showtime).values_list('seat_id', flat=True))
+            )
+    
+    def test_deterministic_by_seed(self):
+        """Test the same seed gives the same data and another seed does not"""
+        first = self.seed_snapshot()
+        self.assertEqual(self.seed_snapshot(), first)
+        self.assertNotEqual(self.seed_snapshot(seed=1)['bookings'], first['bookings'])
+    
+    def test_full_rooms_and_reseeding(self):
+        """Test bookings stop at room capacity and a seed cannot be applied twice"""
+        report = seeding.seed(users=5, movies=2, seats=10, bookings=1000)
+        self.assertEqual(report['bookings']['rows'], 20)
+        with self.assertRaises(seeding.SeedError):
+            seeding.seed(users=5, movies=2, seats=10, bookings=10)
+    
+    def test_command(self):
+        """Test the seed_scale management command"""
+        out = StringIO()
+        call_command('seed_scale', '--users', '3', '--movies', '2', '--seats', '30',
+                     '--bookings', '10', '--seed', '7', stdout=out)
+        self.assertIn('Seeding complete', out.getvalue())
+        self.assertEqual(Booking.objects.count(), 10)
+
+
+# ==================== SERVER TIMING TESTS ====================
+
+class ServerTimingTest(APITestCase):
+    """Tests for the Server-Timing middleware"""
+    
+    def setUp(self):
+        """Set up a movie with an empty response cache"""
+        caches[responsecache.CACHE_ALIAS].clear()
+        self.movie = Movie.objects.create(
+            title="Test Movie",
+            description="Test Description",
+            release_date=date.today() + timedelta(days=7),
+            duration=120
+        )
+        Seat.objects.create(seat_number="A1")
+    
+    def get_timings(self, url):
+        """GET url; returns the Server-Timing entries by name and the query count"""
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        timings = {}
+        for entry in response['Server-Timing'].split(', '):
+            name, *params = entry.split(';')
+            timings[name] = dict(param.split('=', 1) for param in params)
+        return timings, len(queries)
+    
+    def test_api_header(self):
+        """Test an API response reports its queries and serializer time"""
+        timings, queries = self.get_timings(reverse('api-movie-detail', args=[self.movie.id]))
+        self.assertEqual(set(timings), {'db', 'serialize', 'template', 'total'})
+        self.assertEqual(timings['db']['desc'], f'"{queries} queries"')
+        self.assertGreater(float(timings['serialize']['dur']), 0)
+        self.assertEqual(float(timings['template']['dur']), 0)
+        self.assertGreaterEqual(float(timings['total']['dur']), float(timings['db']['dur']))
+    
+    def test_template_and_async_views(self):
+        """Test template rendering is timed and async views count their queries"""
+        timings, queries = self.get_timings(reverse('movie_detail', args=[self.movie.id]))
+        self.assertGreater(float(timings['template']['dur']), 0)
+        self.assertEqual(timings['db']['desc'], f'"{queries} queries"')
+        
+        timings, queries = self.get_timings(reverse('api-async-movie-detail', args=[self.movie.id]))
+        self.assertGreater(queries, 0)
+        self.assertEqual(timings['db']['desc'], f'"{queries} queries"')
+        self.assertGreater(float(timings['serialize']['dur']), 0)
+    
+    def test_library_classes_not_patched(self):
+        """Test timing wraps the views only, not DRF serializers or Django templates"""
+        for cls in (Serializer, ListSerializer):
+            self.assertEqual(cls.data.fget.__module__, 'rest_framework.serializers')
+        self.assertEqual(Template.render.__module__, 'django.template.base')
+        
+        # A many=True list serializer from get_serializer()
+        timings, queries = self.get_timings(reverse('api-showtime-list'))
+        self.assertGreater(float(timings['serialize']['dur']), 0)
+    
+    def test_sampled_log_line(self):
+        """Test sampled requests are logged as JSON and unsampled ones are not"""
+        url = reverse('api-movie-list')
+        with self.settings(SERVER_TIMING_LOG_SAMPLE_RATE=1.0):
+            with self.assertLogs('booking.timing', level='INFO') as logs:
+                self.client.get(url)
+        line = json.loads(logs.records[0].getMessage())
+        self.assertEqual((line['method'], line['path'], line['status']), ('GET', url, 200))
+        self.assertGreater(line['queries'], 0)
+        
+        with self.assertNoLogs('booking.timing', level='INFO'):
+            self.client.get(url)
+    
+    @override_settings(SERVER_TIMING=False)
+    def test_disabled(self):
+        """Test no header is sent when SERVER_TIMING is off"""
+        response = self.client.get(reverse('api-movie-list'))
+        self.assertNotIn('Server-Timing', response)
+
+
+# ==================== METRICS TESTS ====================
+
+class MetricsTest(APITestCase):
+    """Tests for the metrics registry and the /metrics endpoint"""
+    
+    def setUp(self):
+        """Set up a user, a movie and seats with empty metrics"""
+        metrics.reset()
+        self.addCleanup(metrics.reset)
+        self.user = User.objects.create_user(username="testuser", password="pass")
+        self.client.force_authenticate(user=self.user)
+        self.movie = Movie.objects.create(
+            title="Test Movie",
+            description="Test Description",
+            release_date=date.today() + timedelta(days=7),
+            duration=120
+        )
+        self.seats = [Seat.objects.create(seat_number=f"A{n}") for n in range(1, 4)]
+    
+    def scrape(self):
+        """GET /metrics; returns {sample with labels: value}"""
+        response = self.client.get('/metrics')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response['Content-Type'].startswith('text/plain; version=0.0.4'))
+        samples = {}
+        for line in response.content.decode().splitlines():
+            if not line.startswith('#'):
+                sample, value = line.rsplit(' ', 1)
+                samples[sample] = float(value)
+        return samples
+    
+    def test_booking_counters(self):
+        """Test bookings, conflicts and cancellations are counted once committed"""
+        url = reverse('api-booking-list')
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(url, {'movie': self.movie.id, 'seat': self.seats[0].id})
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(url, {'movie': self.movie.id, 'seat': self.seats[0].id})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        
+        with self.captureOnCommitCallbacks(execute=True):
+            services.book_seats(self.movie.showtimes.get(), [s.id for s in self.seats], self.user)
+        with self.captureOnCommitCallbacks(execute=True):
+            Booking.objects.get(seat=self.seats[0]).delete()
+        
+        samples = self.scrape()
+        self.assertEqual(samples['booking_bookings_created_total'], 3)
+        self.assertEqual(samples['booking_conflicts_total{reason="booked"}'], 2)
+        self.assertEqual(samples['booking_bookings_cancelled_total'], 1)
+    
+    def test_rolled_back_booking_not_counted(self):
+        """Test a booking whose transaction rolls back is not counted"""
+        with self.captureOnCommitCallbacks(execute=True):
+            with transaction.atomic():
+                Booking.objects.create(movie=self.movie, seat=self.seats[0], user=self.user)
+                transaction.set_rollback(True)
+        self.assertNotIn('booking_bookings_created_total', self.scrape())
+    
+    def test_latency_histogram(self):
+        """Test request latency is exposed as a cumulative histogram per view"""
+        for _ in range(2):
+            self.client.get(reverse('api-movie-list'))
+        samples = self.scrape()
+        labels = 'view="api-movie-list",method="GET",status="200"'
+        self.assertEqual(samples[f'booking_http_request_duration_seconds_count{{{labels}}}'], 2)
+        self.assertEqual(samples[f'booking_http_request_duration_seconds_bucket{{{labels},le="+Inf"}}'], 2)
+        buckets = [
+            samples[f'booking_http_request_duration_seconds_bucket{{{labels},le="{bound!r}"}}']
+            for bound in metrics.LATENCY_BUCKETS
+        ]
+        self.assertEqual(buckets, sorted(buckets))
+        self.assertGreater(samples[f'booking_http_request_duration_seconds_sum{{{labels}}}'], 0)
+    
+    def test_multiprocess_files_are_summed(self):
+        """Test a scrape adds up the files of every worker process"""
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        with self.settings(METRICS_MULTIPROC_DIR=directory.name):
+            metrics.BOOKINGS_CREATED.inc(2)
+            # Another worker, with enough keys to grow its file
+            other = metrics.MmapStore(f'{directory.name}/metrics_1.db')
+            other.add(metrics._key('booking_bookings_created_total', []), 5)
+            for n in range(2000):
+                other.add(metrics._key('booking_conflicts_total', [f'reason{n}']), 1)
+            self.assertGreater(len(other._map), metrics.MmapStore.INITIAL_SIZE)
+            
+            totals = metrics.collect()
+            self.assertEqual(totals[metrics._key('booking_bookings_created_total', [])], 7)
+            self.assertEqual(totals[metrics._key('booking_conflicts_total', ['reason1999'])], 1)
+            # Values survive reopening the file, as after a restart with the same pid
+            self.assertEqual(
+                dict(metrics.MmapStore(other.path).items()),
+                dict(metrics.MmapStore.read(other.path))
+            )
+            metrics.reset()
+    
+    def test_labels_checked(self):
+        """Test a metric rejects missing or unknown labels and negative increments"""
+        with self.assertRaises(ValueError):
+            metrics.BOOKING_CONFLICTS.inc()
+        with self.assertRaises(ValueError):
+            metrics.BOOKINGS_CREATED.inc(-1)
+
+
+# ==================== BOOKING QUEUE TESTS ====================
+
+@override_settings(BOOKING_QUEUE_ENABLED=True)
+class BookingQueueTest(APITestCase):
+    """Tests for queued booking intake and the queue worker"""
+    
+    def setUp(self):
+        """Set up two users, a movie and seats"""
+        self.user = User.objects.create_user(username="testuser", password="pass")
+        self.other = User.objects.create_user(username="otheruser", password="pass")
+        self.movie = Movie.objects.create(
+            title="Test Movie",
+            description="Test Description",
+            release_date=date.today() + timedelta(days=7),
+            duration=120
+        )
+        self.seats = [Seat.objects.create(seat_number=f"A{n}") for n in range(1, 3)]
+        self.url = reverse('api-booking-list')
+    
+    def request_seat(self, user, seat):
+        """Queue a booking of seat for user; returns the response"""
+        self.client.force_authenticate(user=user)
+        response = self.client.post(self.url, {'movie': self.movie.id, 'seat': seat.id})
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        return response
+    
+    def test_post_is_queued(self):
+        """Test a queued POST answers 202 with a ticket and books nothing yet"""
+        response = self.request_seat(self.user, self.seats[0])
+        self.assertEqual(response.data['status'], 'pending')
+        self.assertEqual(response.data['queue_position'], 1)
+        self.assertEqual(response['Location'], response.data['status_url'])
+        self.assertFalse(Booking.objects.exists())
+        
+        second = self.request_seat(self.other, self.seats[1])
+        self.assertEqual(second.data['queue_position'], 2)
+        status_response = self.client.get(second.data['status_url'])
+        self.assertEqual(status_response.data['ticket'], second.data['ticket'])
+    
+    def test_drain_in_arrival_order(self):
+        """Test the worker books the first request for a seat and rejects the later one"""
+        first = self.request_seat(self.user, self.seats[0])
+        second = self.request_seat(self.other, self.seats[0])
+        
+        processed = bookingqueue.drain()
+        self.assertEqual([r.status for r in processed], ['booked', 'rejected'])
+        self.assertEqual(bookingqueue.drain(), [])
+        
+        self.client.force_authenticate(user=self.user)
+        response = self.client.get(first.data['status_url'])
+        booking = Booking.objects.get()
+        self.assertEqual((response.data['status'], response.data['booking']), ('booked', booking.id))
+        self.assertIsNone(response.data['queue_position'])
+        self.assertEqual(booking.user, self.user)
+        
+        self.client.force_authenticate(user=self.other)
+        response = self.client.get(second.data['status_url'])
+        self.assertEqual(response.data['status'], 'rejected')
+        self.assertEqual(response.data['error'], "This seat is already booked for this movie.")
+    
+    def test_status_is_private(self):
+        """Test users only see their own tickets"""
+        response = self.request_seat(self.user, self.seats[0])
+        self.client.force_authenticate(user=self.other)
+        self.assertEqual(self.client.get(response.data['status_url']).status_code, status.HTTP_404_NOT_FOUND)
+    
+    def test_intake_validation(self):
+        """Test a request naming no movie or showtime is refused up front"""
+        self.client.force_authenticate(user=self.user)
+        response = self.client.post(self.url, {'seat': self.seats[0].id})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(BookingRequest.objects.exists())
+    
+    def test_command(self):
+        """Test the process_booking_queue management command"""
+        for seat in self.seats:
+            self.request_seat(self.user, seat)
+        out = StringIO()
+        call_command('process_booking_queue', '--once', '--batch-size', '1', stdout=out)
+        self.assertIn('Done: 2 booked, 0 rejected', out.getvalue())
+        self.assertEqual(Booking.objects.count(), 2)
+    
+    @override_settings(BOOKING_QUEUE_ENABLED=False)
+    def test_disabled_books_directly(self):
+        """Test POST books immediately when the queue is off"""
+        self.client.force_authenticate(user=self.user)
+        response = self.client.post(self.url, {'movie': self.movie.id, 'seat': self.seats[0].id})
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+
+# ==================== READ REPLICA TESTS ====================
+
+@override_settings(DATABASE_REPLICAS=['replica1'])
+class ReadReplicaRoutingTest(TransactionTestCase):
+    """
+    Tests for the read replica middleware and router. Not a TestCase: the
+    router keeps reads on default inside its transaction.
+    """
+    
+    def route(self, view, method='get', cookies=None):
+        """
+        Run a request for view through ReplicaMiddleware; returns the alias
+        its reads were routed to and the response
+        """
+        request = getattr(RequestFactory(), method)('/')
+        request.COOKIES.update(cookies or {})
+        seen = {}
+        
+        def get_response(request):
+            middleware.process_view(request, view, (), {})
+            seen['alias'] = self.router.db_for_read(Movie)
+            return HttpResponse()
+        
+        middleware = dbrouter.ReplicaMiddleware(get_response)
+        response = middleware(request)
+        self.assertIsNone(dbrouter.current_read_alias())
+        return seen['alias'], response
+    
+    def setUp(self):
+        self.router = dbrouter.ReplicaRouter()
+    
+    def test_reads_of_marked_views(self):
+        """Test GETs of marked template views and viewsets read from a replica"""
+        self.assertEqual(self.route(template_views.movie_list)[0], 'replica1')
+        self.assertEqual(self.route(MovieViewSet.as_view({'get': 'list'}))[0], 'replica1')
+        self.assertIsNone(self.route(BookingViewSet.as_view({'get': 'list'}))[0])
+        self.assertIsNone(self.route(template_views.movie_list, method='post')[0])
+    
+    def test_writes_pin_to_primary(self):
+        """Test a successful write sets the sticky cookie and pinned reads use default"""
+        alias, response = self.route(BookingViewSet.as_view({'post': 'create'}), method='post')
+        cookie = response.cookies[dbrouter.STICKY_COOKIE]
+        self.assertEqual(cookie['max-age'], settings.READ_REPLICA_STICKY_SECONDS)
+        
+        alias, response = self.route(template_views.movie_list, cookies={dbrouter.STICKY_COOKIE: '1'})
+        self.assertIsNone(alias)
+    
+    def test_transactions_and_writes_use_default(self):
+        """Test reads inside a transaction and all writes go to default"""
+        token = dbrouter._read_alias.set('replica1')
+        try:
+            self.assertEqual(self.router.db_for_read(Movie), 'replica1')
+            with transaction.atomic():
+                self.assertIsNone(self.router.db_for_read(Movie))
+            self.assertEqual(self.router.db_for_write(Movie), 'default')
+        finally:
+            dbrouter._read_alias.reset(token)
+        self.assertFalse(self.router.allow_migrate('replica1', 'booking'))
+    
+    @override_settings(DATABASE_REPLICAS=[])
+    def test_no_replicas(self):
+        """Test nothing is routed or pinned without replicas"""
+        self.assertIsNone(self.route(template_views.movie_list)[0])
+        alias, response = self.route(BookingViewSet.as_view({'post': 'create'}), method='post')
+        self.assertNotIn(dbrouter.STICKY_COOKIE, response.cookies)
+        with self.assertRaises(CommandError):
+            call_command('sync_sqlite_replicas')
+
+
+
+@override_settings(DATABASE_REPLICAS=['replica1'])
+class ReplicaQueryBudgetTest(TransactionTestCase):
+    """Tests that query budgets count the reads routed to a replica"""
+    
+    def setUp(self):
+        """Add a 'replica1' alias reading the test database, like a TEST MIRROR"""
+        connections.settings['replica1'] = connections['default'].settings_dict
+        # Connected here: the test case only allows connections to its own databases
+        connections['replica1'].connect()
+        self.addCleanup(connections.settings.pop, 'replica1')
+        self.addCleanup(connections.__delitem__, 'replica1')
+        self.addCleanup(connections['replica1'].close)
+        Movie.objects.create(
+            title="Test Movie",
+            description="Test Description",
+            release_date=date.today() + timedelta(days=7),
+            duration=120
+        )
+    
+    def test_viewset_counts_replica_reads(self):
+        """Test a replica-routed viewset read is counted against the budget"""
+        with patch.dict(MovieViewSet.query_budgets, {'list': 0}):
+            with self.assertRaises(QueryBudgetExceeded) as ctx:
+                self.client.get(reverse('api-movie-list'))
+        self.assertIn('replica1', {q['alias'] for q in ctx.exception.queries})
+        self.assertIn('[replica1] SELECT', str(ctx.exception))
+    
+    def test_decorator_counts_replica_reads(self):
+        """Test @query_budget counts queries on every alias"""
+        def view(request):
+            list(Movie.objects.all())
+            list(Movie.objects.using('default'))
+            return HttpResponse()
+        
+        token = dbrouter._read_alias.set('replica1')
+        try:
+            with self.assertRaises(QueryBudgetExceeded) as ctx:
+                query_budget(1)(view)(RequestFactory().get('/'))
+        finally:
+            dbrouter._read_alias.reset(token)
+        self.assertEqual([q['alias'] for q in ctx.exception.queries], ['default', 'replica1'])
+
+
+# ==================== SQLITE TUNING TESTS ====================
+
+class SqliteTuningTest(TestCase):
+    """Tests for the SQLite concurrency settings"""
+    
+    def open_file_database(self):
+        """A new connection to a temporary database file; returns its driver connection"""
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        wrapper = type(connections['default'])(
+            dict(connection.settings_dict, NAME=f'{directory.name}/tuning.sqlite3'), alias='tuning'
+        )
+        wrapper.ensure_connection()
+        self.addCleanup(wrapper.close)
+        return wrapper.connection
+    
+    def pragma(self, db, name):
+        return db.execute(f'PRAGMA {name}').fetchone()[0]
+    
+    def test_new_connections_are_tuned(self):
+        """Test a new connection gets WAL, busy_timeout, synchronous=NORMAL and IMMEDIATE transactions"""
+        db = self.open_file_database()
+        self.assertEqual(self.pragma(db, 'journal_mode'), 'wal')
+        self.assertEqual(self.pragma(db, 'busy_timeout'), settings.SQLITE_PRAGMAS['busy_timeout'])
+        self.assertEqual(self.pragma(db, 'synchronous'), 1)
+        self.assertEqual(self.pragma(db, 'mmap_size'), settings.SQLITE_PRAGMAS['mmap_size'])
+        self.assertEqual(connection.settings_dict['OPTIONS'].get('transaction_mode'), 'IMMEDIATE')
+    
+    @override_settings(SQLITE_TUNED=False)
+    def test_stock_when_disabled(self):
+        """Test SQLITE_TUNED=False leaves new connections alone"""
+        db = self.open_file_database()
+        self.assertEqual(self.pragma(db, 'journal_mode'), 'delete')
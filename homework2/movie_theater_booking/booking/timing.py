@@ -0,0 +1,211 @@
+"""
+Per-request timing breakdown, sent as a Server-Timing header.
+
+ServerTimingMiddleware times each request and splits it into:
+
+- db: SQL queries, counted and timed by an execute wrapper installed on
+  every database connection
+- serialize: serializer .data in the viewsets (ServerTimingMixin) and the
+  async views (serialized()), minus the queries it ran
+- template: template rendering in template_views.py, minus the queries it ran
+- total: the whole request as seen by the middleware
+
+The running request's numbers live in a context variable, so queries run
+in sync_to_async threads by the async views are counted too. Outside a
+request (management commands, the test runner) the timers return after
+a single lookup. A fraction of requests, settings.SERVER_TIMING_LOG_SAMPLE_RATE,
+is also logged as one JSON line on the booking.timing logger.
+
+Browsers show Server-Timing in the network panel; the header only carries
+durations and a query count, no SQL.
+"""
+import json
+import logging
+import random
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import cache
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db.backends.signals import connection_created
+from rest_framework.serializers import ListSerializer
+
+logger = logging.getLogger(__name__)
+
+_current = ContextVar('booking_request_timing', default=None)
+_installed = False
+
+
+def timing_enabled():
+    return getattr(settings, 'SERVER_TIMING', True)
+
+
+class RequestTiming:
+    """Accumulated timings (in seconds) for one request"""
+    
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.queries = 0
+        self.db = 0.0
+        self.serialize = 0.0
+        self.template = 0.0
+        self._depth = {}
+    
+    def header(self, total):
+        return ', '.join([
+            f'db;dur={self.db * 1000:.2f};desc="{self.queries} queries"',
+            f'serialize;dur={self.serialize * 1000:.2f}',
+            f'template;dur={self.template * 1000:.2f}',
+            f'total;dur={total * 1000:.2f}',
+        ])
+    
+    def as_dict(self, request, response, total):
+        return {
+            'method': request.method,
+            'path': request.path,
+            'status': response.status_code,
+            'queries': self.queries,
+            'db_ms': round(self.db * 1000, 2),
+            'serialize_ms': round(self.serialize * 1000, 2),
+            'template_ms': round(self.template * 1000, 2),
+            'total_ms': round(total * 1000, 2),
+        }
+
+
+def _record_query(execute, sql, params, many, context):
+    timing = _current.get()
+    if timing is None:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        timing.db += time.perf_counter() - start
+        timing.queries += 1
+
+
+@contextmanager
+def section(name):
+    """
+    Add the block's time, less any SQL it runs, to the name section of the
+    current request. Nested blocks (a serializer inside a serializer, an
+    included template) only count once.
+    """
+    timing = _current.get()
+    if timing is None or timing._depth.get(name):
+        yield
+        return
+    timing._depth[name] = 1
+    start = time.perf_counter()
+    db_start = timing.db
+    try:
+        yield
+    finally:
+        timing._depth[name] = 0
+        elapsed = time.perf_counter() - start - (timing.db - db_start)
+        setattr(timing, name, getattr(timing, name) + elapsed)
+
+
+def serialized(serializer):
+    """serializer.data, timed as serialize"""
+    with section('serialize'):
+        return serializer.data
+
+
+class TimedData:
+    """Serializer mixin timing .data as serialize"""
+    
+    @property
+    def data(self):
+        with section('serialize'):
+            return super().data
+
+
+@cache
+def timed_serializer_class(serializer_class):
+    """A subclass of serializer_class, and of its many=True list serializer, with TimedData"""
+    meta = getattr(serializer_class, 'Meta', None)
+    list_class = getattr(meta, 'list_serializer_class', ListSerializer)
+    attrs = {
+        'Meta': type('Meta', (meta,) if meta else (), {
+            'list_serializer_class': type(list_class.__name__, (TimedData, list_class), {
+                '__module__': list_class.__module__,
+            }),
+        }),
+        '__module__': serializer_class.__module__,
+    }
+    return type(serializer_class.__name__, (TimedData, serializer_class), attrs)
+
+
+class ServerTimingMixin:
+    """ViewSet mixin: serializers from get_serializer() are timed as serialize"""
+    
+    def get_serializer(self, *args, **kwargs):
+        serializer_class = timed_serializer_class(self.get_serializer_class())
+        kwargs.setdefault('context', self.get_serializer_context())
+        return serializer_class(*args, **kwargs)
+
+
+def _add_query_wrapper(sender, connection, **kwargs):
+    if _record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_record_query)
+
+
+def install():
+    """Time the queries of every database connection (once)"""
+    global _installed
+    if _installed:
+        return
+    _installed = True
+    
+    from django.db import connections
+    
+    connection_created.connect(_add_query_wrapper, dispatch_uid='booking.timing')
+    for connection in connections.all(initialized_only=True):
+        _add_query_wrapper(None, connection)
+
+
+class ServerTimingMiddleware:
+    """Add a Server-Timing header to every response; see the module docstring"""
+    sync_capable = True
+    async_capable = True
+    
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+    
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if not timing_enabled():
+            return self.get_response(request)
+        
+        timing = RequestTiming()
+        token = _current.set(timing)
+        try:
+            response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self.finish(request, response, timing)
+    
+    async def __acall__(self, request):
+        if not timing_enabled():
+            return await self.get_response(request)
+        
+        timing = RequestTiming()
+        token = _current.set(timing)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self.finish(request, response, timing)
+    
+    def finish(self, request, response, timing):
+        total = time.perf_counter() - timing.start
+        response['Server-Timing'] = timing.header(total)
+        sample_rate = getattr(settings, 'SERVER_TIMING_LOG_SAMPLE_RATE', 0)
+        if sample_rate and random.random() < sample_rate:
+            logger.info(json.dumps(timing.as_dict(request, response, total)))
+        return response
@@ -1,13 +1,21 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import MovieViewSet, SeatViewSet, BookingViewSet
+from .views import (
+    MovieViewSet, AuditoriumViewSet, ShowtimeViewSet, SeatViewSet, BookingViewSet, BookingRequestViewSet
+)
 from . import template_views
+from . import streams
+from . import async_views
+from . import metrics
 
 # API Router for REST endpoints
 router = DefaultRouter()
 router.register(r'movies', MovieViewSet, basename='api-movie')
+router.register(r'auditoriums', AuditoriumViewSet, basename='api-auditorium')
+router.register(r'showtimes', ShowtimeViewSet, basename='api-showtime')
 router.register(r'seats', SeatViewSet, basename='api-seat')
 router.register(r'bookings', BookingViewSet, basename='api-booking')
+router.register(r'booking-requests', BookingRequestViewSet, basename='api-booking-request')
 
 urlpatterns = [
     # =========================
@@ -24,7 +32,23 @@ urlpatterns = [
     # API endpoints (REST API)
     # =========================
     # All API routes are prefixed with /api/
+    path('api/movies/<int:movie_id>/events/', streams.seat_events, name='api-movie-seat-events'),
+    path('api/showtimes/<int:showtime_id>/events/', streams.showtime_seat_events,
+         name='api-showtime-seat-events'),
+    
+    # Native async read endpoints (same responses as the viewset GETs)
+    path('api/async/movies/', async_views.movie_list, name='api-async-movie-list'),
+    path('api/async/movies/<int:pk>/', async_views.movie_detail, name='api-async-movie-detail'),
+    path('api/async/movies/<int:pk>/available_seats/', async_views.movie_available_seats,
+         name='api-async-movie-available-seats'),
+    path('api/async/seats/<int:pk>/check_availability/', async_views.seat_check_availability,
+         name='api-async-seat-check-availability'),
+    path('api/async/bookings/my_bookings/', async_views.my_bookings, name='api-async-booking-my-bookings'),
+    path('api/async/bookings/upcoming/', async_views.upcoming_bookings, name='api-async-booking-upcoming'),
     path('api/', include(router.urls)),
+    
+    # Prometheus scrape endpoint
+    path('metrics', metrics.metrics_view, name='metrics'),
 ]
 
 """
@@ -33,13 +57,40 @@ API Endpoints Summary:
 
 MOVIES:
 -------
-GET    /api/movies/                          - List all movies
+GET    /api/movies/                          - List all movies (cursor paginated)
 POST   /api/movies/                          - Create a new movie (requires auth)
 GET    /api/movies/{id}/                     - Retrieve a specific movie
 PUT    /api/movies/{id}/                     - Update a movie (requires auth)
 PATCH  /api/movies/{id}/                     - Partial update a movie (requires auth)
 DELETE /api/movies/{id}/                     - Delete a movie (requires auth)
-GET    /api/movies/{id}/available_seats/     - Get available seats for a movie
+GET    /api/movies/{id}/available_seats/     - Get available seats for the movie's primary showtime
+GET    /api/movies/{id}/seatmap/             - Compact seat map (availability bitset or ?encoding=rle)
+GET    /api/movies/{id}/events/              - Stream seat changes for the primary showtime (server-sent events)
+
+Movie-level seat and booking endpoints act on the movie's primary (first)
+showtime; pass a showtime to reach the others.
+
+AUDITORIUMS:
+------------
+GET    /api/auditoriums/                     - List all auditoriums
+POST   /api/auditoriums/                     - Create an auditorium (requires auth)
+GET    /api/auditoriums/{id}/                - Retrieve an auditorium
+PUT    /api/auditoriums/{id}/                - Update an auditorium (requires auth)
+PATCH  /api/auditoriums/{id}/                - Partial update an auditorium (requires auth)
+DELETE /api/auditoriums/{id}/                - Delete an auditorium (requires auth)
+GET    /api/auditoriums/{id}/layout/         - Seat order for compact seat maps (?version=, immutable)
+POST   /api/auditoriums/{id}/generate_seats/ - Create rows x seats_per_row seats at once (requires auth)
+
+SHOWTIMES:
+----------
+GET    /api/showtimes/                       - List showtimes (cursor paginated, ?movie_id={id})
+POST   /api/showtimes/                       - Schedule a showtime (requires auth)
+GET    /api/showtimes/{id}/                  - Retrieve a showtime
+PUT    /api/showtimes/{id}/                  - Reschedule a showtime (requires auth)
+PATCH  /api/showtimes/{id}/                  - Partial update a showtime (requires auth)
+DELETE /api/showtimes/{id}/                  - Delete a showtime and its bookings (requires auth)
+GET    /api/showtimes/{id}/available_seats/  - Get available seats for a showtime
+GET    /api/showtimes/{id}/events/           - Stream seat changes (server-sent events)
 
 SEATS:
 ------
@@ -50,18 +101,33 @@ PUT    /api/seats/{id}/                      - Update a seat (requires auth)
 PATCH  /api/seats/{id}/                      - Partial update a seat (requires auth)
 DELETE /api/seats/{id}/                      - Delete a seat (requires auth)
 GET    /api/seats/available/                 - Get available seats
+GET    /api/seats/available/?showtime_id={id} - Get available seats for a showtime
 GET    /api/seats/available/?movie_id={id}   - Get available seats for a movie
+GET    /api/seats/{id}/check_availability/?showtime_id={id} - Check seat availability
 GET    /api/seats/{id}/check_availability/?movie_id={id} - Check seat availability
+POST   /api/seats/hold/                      - Hold seats for a showtime during checkout (requires auth)
+POST   /api/seats/release/                   - Release held seats (requires auth)
 
 BOOKINGS:
 ---------
-GET    /api/bookings/                        - List user's bookings (requires auth)
+GET    /api/bookings/                        - List user's bookings (requires auth, cursor paginated)
 POST   /api/bookings/                        - Create a new booking (requires auth)
+POST   /api/bookings/bulk/                   - Book several seats at once (requires auth)
+POST   /api/bookings/from_hold/              - Book the seats you are holding (requires auth)
 GET    /api/bookings/{id}/                   - Retrieve a specific booking (requires auth)
 DELETE /api/bookings/{id}/                   - Cancel a booking (requires auth)
 GET    /api/bookings/my_bookings/            - Get current user's bookings (requires auth)
 GET    /api/bookings/upcoming/               - Get current user's upcoming bookings (requires auth)
 
+ASYNC READS (native async, same responses as the matching GET above):
+----------------------------------------------------------------------
+GET    /api/async/movies/
+GET    /api/async/movies/{id}/
+GET    /api/async/movies/{id}/available_seats/
+GET    /api/async/seats/{id}/check_availability/?movie_id={id}
+GET    /api/async/bookings/my_bookings/      (requires auth)
+GET    /api/async/bookings/upcoming/         (requires auth)
+
 TEMPLATE VIEWS:
 --------------
 GET    /                                     - Movie list page
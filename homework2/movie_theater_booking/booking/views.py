@@ -1,35 +1,181 @@
-from rest_framework import viewsets, status
+from rest_framework import viewsets, mixins, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
+from rest_framework.exceptions import ValidationError
 from rest_framework.permissions import IsAuthenticated, IsAuthenticatedOrReadOnly
+from rest_framework.reverse import reverse
+from django.db import transaction
 from django.utils import timezone
-from .models import Movie, Seat, Booking
+from .models import Movie, Auditorium, Showtime, Seat, Booking, SeatHold, BookingRequest
+from .pagination import MovieCursorPagination, BookingCursorPagination, ShowtimeCursorPagination
+from .querybudget import QueryBudgetMixin
+from .etags import ConditionalGetMixin, CATALOG, MOVIE, SEAT_MAP
+from .responsecache import ResponseCacheMixin
+from .fastlist import FastListMixin
+from .timing import ServerTimingMixin, serialized
+from . import availability
+from . import services
+from . import bookingqueue
+from . import counters
+from . import seatcatalog
+from . import seatmapcodec
+from . import layouts
 from .serializers import (
     MovieSerializer, 
     MovieDetailSerializer,
+    AuditoriumSerializer,
+    ShowtimeSerializer,
     SeatSerializer, 
     SeatAvailabilitySerializer,
     BookingSerializer, 
-    BookingCreateSerializer
+    BookingCreateSerializer,
+    BookingRequestSerializer,
+    BulkBookingSerializer,
+    SeatHoldSerializer,
+    SeatReleaseSerializer,
+    BookFromHoldSerializer,
+    SeatLayoutSerializer
 )
 
 
-class MovieViewSet(viewsets.ModelViewSet):
+def _available_seats_response(showtime):
+    """Free seats in a showtime's auditorium"""
+    available_seats = seatcatalog.available_seats(showtime)
+    # Pass showtime_id in context for the serializer
+    serializer = SeatAvailabilitySerializer(
+        available_seats,
+        many=True,
+        context={'showtime_id': showtime.id}
+    )
+    return Response(serialized(serializer))
+
+
+def _seatmap_response(request, showtime):
+    """
+    Compact seat map: the showtime's availability vector, encoded with
+    ?encoding= (bitset by default or rle), plus where to fetch the seat
+    order it follows
+    """
+    encoding = request.query_params.get('encoding', seatmapcodec.BITSET)
+    if encoding not in seatmapcodec.ENCODINGS:
+        return Response(
+            {"error": f"encoding must be one of: {', '.join(seatmapcodec.ENCODINGS)}"},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    
+    catalog, flags = seatcatalog.availability_flags(showtime)
+    layout_url = reverse('api-auditorium-layout', args=[showtime.auditorium_id], request=request)
+    if catalog.version is not None:
+        layout_url += f'?version={catalog.version}'
+    return Response({
+        "showtime_id": showtime.id,
+        "auditorium_id": showtime.auditorium_id,
+        "layout_version": catalog.version,
+        "layout_url": layout_url,
+        "seat_count": len(flags),
+        "available_count": sum(flags),
+        "encoding": encoding,
+        "availability": seatmapcodec.encode(flags, encoding),
+    })
+
+
+def _requested_showtime(params):
+    """
+    The showtime named by ?showtime_id=, or the primary showtime of
+    ?movie_id=. Returns None if neither names an existing showtime.
+    """
+    try:
+        showtime_id = params.get('showtime_id')
+        if showtime_id:
+            return Showtime.objects.filter(pk=showtime_id).first()
+        movie_id = params.get('movie_id')
+        if movie_id:
+            return Showtime.objects.primary_for(movie_id)
+    except ValueError:
+        pass
+    return None
+
+
+class MovieViewSet(
+    ServerTimingMixin, QueryBudgetMixin, ConditionalGetMixin, ResponseCacheMixin, FastListMixin,
+    viewsets.ModelViewSet
+):
     """
     ViewSet for CRUD operations on movies.
     
     Endpoints:
-    - GET /api/movies/ - List all movies
+    - GET /api/movies/ - List all movies (cursor paginated)
     - POST /api/movies/ - Create a new movie
     - GET /api/movies/{id}/ - Retrieve a movie
     - PUT /api/movies/{id}/ - Update a movie
     - PATCH /api/movies/{id}/ - Partial update
     - DELETE /api/movies/{id}/ - Delete a movie
-    - GET /api/movies/{id}/available_seats/ - Get available seats for a movie
+    - GET /api/movies/{id}/available_seats/ - Get available seats for the movie's primary showtime
+    - GET /api/movies/{id}/seatmap/ - Compact seat map for the movie's primary showtime
+    
+    GET responses carry an ETag and answer If-None-Match with 304. List and
+    retrieve data is cached under that ETag (see responsecache.py). Lists
+    are built from .values() rows without the serializer (see fastlist.py).
+    GETs may be served from a read replica (see dbrouter.py).
     """
     queryset = Movie.objects.all()
     serializer_class = MovieSerializer
     permission_classes = [IsAuthenticatedOrReadOnly]
+    pagination_class = MovieCursorPagination
+    read_replica = True
+    
+    query_budgets = {
+        'list': 4,
+        'create': 8,
+        'retrieve': 7,
+        'update': 5,
+        'partial_update': 5,
+        'destroy': 15,
+        'available_seats': 7,
+        'seatmap': 7,
+    }
+    
+    etag_scopes = {
+        'list': CATALOG,
+        'retrieve': MOVIE,
+        'available_seats': SEAT_MAP,
+        'seatmap': SEAT_MAP,
+    }
+    
+    response_cache = {
+        'list': 'movie-list',
+        'retrieve': 'movie-detail',
+    }
+    
+    def get_etag_showtime_id(self):
+        """
+        Movie actions answer for the URL movie (and its primary showtime)
+        whatever ?showtime_id= says, so the tag must not follow it
+        """
+        return None
+    
+    def get_etag_movie_id(self):
+        """Movie actions take the movie from the URL"""
+        return self.kwargs.get('pk')
+    
+    def get_etag_variant(self):
+        """Compact seat maps differ per encoding"""
+        if self.action == 'seatmap':
+            return self.request.query_params.get('encoding', seatmapcodec.BITSET)
+        return None
+    
+    def list(self, request, *args, **kwargs):
+        return self.cached_response(super().list, request, *args, **kwargs)
+    
+    def retrieve(self, request, *args, **kwargs):
+        return self.cached_response(super().retrieve, request, *args, **kwargs)
+    
+    def get_queryset(self):
+        """Carry the cached seat total across showtimes along with the movie row on retrieve"""
+        queryset = super().get_queryset()
+        if self.action == 'retrieve':
+            queryset = queryset.annotate(total_seats=counters.capacity_subquery())
+        return queryset
     
     def get_serializer_class(self):
         """Use detailed serializer for retrieve action"""
@@ -37,26 +183,208 @@ class MovieViewSet(viewsets.ModelViewSet):
             return MovieDetailSerializer
         return MovieSerializer
     
+    def perform_destroy(self, instance):
+        """Delete the movie without updating its soon-to-be-deleted seat index per booking"""
+        with transaction.atomic(), availability.suspend_updates():
+            instance.delete()
+    
     @action(detail=True, methods=['get'])
     def available_seats(self, request, pk=None):
         """
         Get all available seats for a specific movie
         GET /api/movies/{id}/available_seats/
         """
-        movie = self.get_object()
-        booked_seats = Booking.objects.filter(movie=movie).values_list('seat_id', flat=True)
-        available_seats = Seat.objects.exclude(id__in=booked_seats)
+        showtime = Showtime.objects.primary_for(pk)
+        if showtime is None:
+            self.get_object()  # 404 for an unknown movie
+            return Response([])
+        return _available_seats_response(showtime)
+    
+    @action(detail=True, methods=['get'])
+    def seatmap(self, request, pk=None):
+        """
+        Compact seat map for the movie's primary showtime
+        GET /api/movies/{id}/seatmap/?encoding=bitset|rle
+        
+        "availability" flags each seat of layout_url's seat order as
+        available or not; see seatmapcodec.py for the encodings.
+        """
+        showtime = Showtime.objects.primary_for(pk)
+        if showtime is None:
+            self.get_object()  # 404 for an unknown movie
+            return Response(
+                {"detail": "This movie has no showtimes."},
+                status=status.HTTP_404_NOT_FOUND
+            )
+        return _seatmap_response(request, showtime)
+
+
+class AuditoriumViewSet(ServerTimingMixin, QueryBudgetMixin, viewsets.ModelViewSet):
+    """
+    ViewSet for CRUD operations on auditoriums.
+    
+    Endpoints:
+    - GET /api/auditoriums/ - List all auditoriums
+    - POST /api/auditoriums/ - Create a new auditorium
+    - GET /api/auditoriums/{id}/ - Retrieve an auditorium
+    - PUT /api/auditoriums/{id}/ - Update an auditorium
+    - PATCH /api/auditoriums/{id}/ - Partial update
+    - DELETE /api/auditoriums/{id}/ - Delete an auditorium
+    - GET /api/auditoriums/{id}/layout/?version={v} - Seat order for compact seat maps
+    - POST /api/auditoriums/{id}/generate_seats/ - Create a block of rows of seats at once
+    """
+    queryset = Auditorium.objects.all()
+    serializer_class = AuditoriumSerializer
+    permission_classes = [IsAuthenticatedOrReadOnly]
+    
+    query_budgets = {
+        'list': 3,
+        'create': 4,
+        'retrieve': 3,
+        'update': 5,
+        'partial_update': 5,
+        'layout': 4,
+        # destroy and generate_seats are unbudgeted: their batched deletes and
+        # inserts grow with the layout
+    }
+    
+    def get_serializer_class(self):
+        """Use the input serializer for generate_seats"""
+        if self.action == 'generate_seats':
+            return SeatLayoutSerializer
+        return AuditoriumSerializer
+    
+    def perform_destroy(self, instance):
+        """Delete the auditorium, updating the counters once rather than per seat and booking"""
+        layouts.delete_auditorium(instance)
+    
+    @action(detail=True, methods=['post'])
+    def generate_seats(self, request, pk=None):
+        """
+        Create rows x seats_per_row seats numbered A1, A2, ... in one go
+        POST /api/auditoriums/{id}/generate_seats/
+             {"rows": 40, "seats_per_row": 50, "section": "Stalls", "first_row": 1}
         
-        # Pass movie_id in context for the serializer
-        serializer = SeatAvailabilitySerializer(
-            available_seats, 
-            many=True,
-            context={'movie_id': movie.id}
+        first_row starts a further section below existing rows (27 is row AA).
+        """
+        auditorium = self.get_object()
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        
+        try:
+            created = layouts.generate_layout(auditorium, **serializer.validated_data)
+        except layouts.LayoutError as error:
+            return Response({"error": str(error)}, status=status.HTTP_400_BAD_REQUEST)
+        
+        auditorium.refresh_from_db(fields=['seat_count'])
+        return Response(
+            {"created": created, "seat_count": auditorium.seat_count},
+            status=status.HTTP_201_CREATED
         )
-        return Response(serializer.data)
+    
+    @action(detail=True, methods=['get'])
+    def layout(self, request, pk=None):
+        """
+        The auditorium's seats as [id, seat_number] pairs, in the order of
+        the compact seat map's availability vector
+        GET /api/auditoriums/{id}/layout/?version={catalog version}
+        
+        A URL with the current version never changes, so it is served as
+        immutable; any other version redirects to the current one.
+        """
+        catalog = seatcatalog.get_catalog()
+        try:
+            seats = catalog.seats_in(int(pk))
+        except ValueError:
+            seats = []
+        if not seats:
+            self.get_object()  # 404 for an unknown auditorium
+        
+        if catalog.version is not None and request.query_params.get('version') != str(catalog.version):
+            location = reverse('api-auditorium-layout', args=[pk], request=request)
+            return Response(
+                status=status.HTTP_302_FOUND,
+                headers={'Location': f'{location}?version={catalog.version}'}
+            )
+        
+        response = Response({
+            "auditorium_id": int(pk),
+            "version": catalog.version,
+            "seats": [[seat.id, seat.seat_number] for seat in seats],
+        })
+        if catalog.version is not None:
+            response['Cache-Control'] = 'public, max-age=31536000, immutable'
+        return response
 
 
-class SeatViewSet(viewsets.ModelViewSet):
+class ShowtimeViewSet(ServerTimingMixin, QueryBudgetMixin, viewsets.ModelViewSet):
+    """
+    ViewSet for CRUD operations on showtimes.
+    
+    Endpoints:
+    - GET /api/showtimes/ - List showtimes (cursor paginated, optionally ?movie_id={id})
+    - POST /api/showtimes/ - Schedule a showtime
+    - GET /api/showtimes/{id}/ - Retrieve a showtime
+    - PUT /api/showtimes/{id}/ - Update a showtime
+    - PATCH /api/showtimes/{id}/ - Partial update
+    - DELETE /api/showtimes/{id}/ - Delete a showtime and its bookings
+    - GET /api/showtimes/{id}/available_seats/ - Get available seats for a showtime
+    """
+    queryset = Showtime.objects.all()
+    serializer_class = ShowtimeSerializer
+    permission_classes = [IsAuthenticatedOrReadOnly]
+    pagination_class = ShowtimeCursorPagination
+    
+    query_budgets = {
+        'list': 3,
+        'create': 7,
+        'retrieve': 3,
+        'update': 7,
+        'partial_update': 5,
+        'destroy': 13,
+        'available_seats': 6,
+    }
+    
+    def get_queryset(self):
+        """Optionally limit the list to one movie"""
+        queryset = super().get_queryset()
+        movie_id = self.request.query_params.get('movie_id')
+        if self.action == 'list' and movie_id:
+            queryset = queryset.filter(movie_id=movie_id)
+        return queryset
+    
+    def perform_update(self, serializer):
+        """
+        Bookings copy the showtime's movie and use its auditorium's seats,
+        so only the start time can change.
+        """
+        instance = serializer.instance
+        for field in ('movie', 'auditorium'):
+            value = serializer.validated_data.get(field)
+            if value is not None and value.pk != getattr(instance, f'{field}_id'):
+                raise ValidationError({field: ["Only the start time of a showtime can be changed."]})
+        serializer.save()
+    
+    def perform_destroy(self, instance):
+        """Delete the showtime, uncounting its bookings in one update instead of per booking"""
+        with transaction.atomic(), availability.suspend_updates():
+            booked = instance.bookings.count()
+            instance.delete()
+            counters.adjust_booked_count(instance.movie_id, -booked)
+            counters.bump_catalog()
+    
+    @action(detail=True, methods=['get'])
+    def available_seats(self, request, pk=None):
+        """
+        Get all available seats for a showtime
+        GET /api/showtimes/{id}/available_seats/
+        """
+        return _available_seats_response(self.get_object())
+
+
+class SeatViewSet(
+    ServerTimingMixin, QueryBudgetMixin, ConditionalGetMixin, FastListMixin, viewsets.ModelViewSet
+):
     """
     ViewSet for seat availability and booking status.
     
@@ -67,84 +395,189 @@ class SeatViewSet(viewsets.ModelViewSet):
     - PUT /api/seats/{id}/ - Update a seat
     - PATCH /api/seats/{id}/ - Partial update
     - DELETE /api/seats/{id}/ - Delete a seat
-    - GET /api/seats/available/ - Get available seats (optionally filtered by movie)
-    - GET /api/seats/{id}/check_availability/ - Check if seat is available for a movie
+    - GET /api/seats/available/ - Get available seats (optionally for a showtime or movie)
+    - GET /api/seats/{id}/check_availability/ - Check if seat is available for a showtime or movie
+    - POST /api/seats/hold/ - Hold seats for a showtime for a limited time
+    - POST /api/seats/release/ - Release held seats
+    
+    GET responses carry an ETag and answer If-None-Match with 304. The list
+    is built from .values() rows without the serializer (see fastlist.py).
+    GETs may be served from a read replica (see dbrouter.py).
     """
     queryset = Seat.objects.all()
     serializer_class = SeatSerializer
     permission_classes = [IsAuthenticatedOrReadOnly]
+    read_replica = True
+    
+    query_budgets = {
+        'list': 4,
+        'create': 7,
+        'retrieve': 4,
+        'update': 7,
+        'partial_update': 6,
+        'destroy': 8,
+        'available': 7,
+        'check_availability': 7,
+        # Includes reading and deleting the showtime's expired holds
+        'hold': 14,
+        'release': 9,
+    }
+    
+    etag_scopes = {
+        'list': CATALOG,
+        'retrieve': CATALOG,
+        'available': SEAT_MAP,
+        'check_availability': SEAT_MAP,
+    }
+    
+    def get_serializer_class(self):
+        """Use input serializers for the hold actions"""
+        if self.action == 'hold':
+            return SeatHoldSerializer
+        if self.action == 'release':
+            return SeatReleaseSerializer
+        return SeatSerializer
     
     @action(detail=False, methods=['get'])
     def available(self, request):
         """
-        Get all available seats, optionally filtered by movie
-        GET /api/seats/available/?movie_id={id}
+        Get all available seats, optionally for a showtime or a movie
+        GET /api/seats/available/?showtime_id={id}
+        GET /api/seats/available/?movie_id={id}  (the movie's primary showtime)
         """
-        movie_id = request.query_params.get('movie_id', None)
-        
-        if movie_id:
-            # Get seats not booked for a specific movie
-            booked_seats = Booking.objects.filter(movie_id=movie_id).values_list('seat_id', flat=True)
-            available_seats = Seat.objects.exclude(id__in=booked_seats)
-            serializer = SeatAvailabilitySerializer(
-                available_seats,
-                many=True,
-                context={'movie_id': movie_id}
-            )
-        else:
-            # Get all seats that are not marked as booked
-            available_seats = Seat.objects.filter(is_booked=False)
-            serializer = self.get_serializer(available_seats, many=True)
+        params = request.query_params
+        if params.get('showtime_id') or params.get('movie_id'):
+            # Get the free seats in the showtime's auditorium
+            showtime = _requested_showtime(params)
+            if showtime is None:
+                return Response([])
+            return _available_seats_response(showtime)
         
+        # Get all seats that are not marked as booked
+        available_seats = Seat.objects.filter(is_booked=False)
+        serializer = self.get_serializer(available_seats, many=True)
         return Response(serializer.data)
     
     @action(detail=True, methods=['get'])
     def check_availability(self, request, pk=None):
         """
-        Check if a specific seat is available for a movie
-        GET /api/seats/{id}/check_availability/?movie_id={id}
+        Check if a specific seat is available for a showtime or a movie
+        GET /api/seats/{id}/check_availability/?showtime_id={id}
+        GET /api/seats/{id}/check_availability/?movie_id={id}  (the movie's primary showtime)
         """
         seat = self.get_object()
-        movie_id = request.query_params.get('movie_id')
+        params = request.query_params
         
-        if not movie_id:
+        if not params.get('movie_id') and not params.get('showtime_id'):
             return Response(
                 {"error": "movie_id parameter is required"}, 
                 status=status.HTTP_400_BAD_REQUEST
             )
         
-        is_available = not Booking.objects.filter(
-            movie_id=movie_id, 
-            seat=seat
-        ).exists()
+        showtime = _requested_showtime(params)
+        if showtime is None:
+            return Response(
+                {"detail": "No Showtime matches the given query."},
+                status=status.HTTP_404_NOT_FOUND
+            )
+        
+        is_available = (
+            seat.auditorium_id == showtime.auditorium_id
+            and not availability.is_seat_booked(showtime.id, seat.id)
+            and not SeatHold.objects.active().filter(showtime=showtime, seat=seat).exists()
+        )
         
         return Response({
             "seat_id": seat.id,
             "seat_number": seat.seat_number,
-            "movie_id": movie_id,
+            "movie_id": showtime.movie_id,
+            "showtime_id": showtime.id,
             "is_available": is_available
         })
+    
+    @action(detail=False, methods=['post'])
+    def hold(self, request):
+        """
+        Hold seats for a showtime while the user checks out
+        POST /api/seats/hold/  {"showtime": id, "seats": [id, ...], "seconds": N}
+        
+        {"movie": id} may be sent instead of "showtime" to use the movie's
+        primary showtime; the same applies to release, bulk and from_hold.
+        
+        Held seats are unavailable to everyone else until the hold expires
+        or is converted with POST /api/bookings/from_hold/.
+        """
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        
+        results = services.hold_seats(
+            serializer.validated_data['showtime'],
+            serializer.validated_data['seats'],
+            request.user,
+            serializer.validated_data.get('seconds')
+        )
+        
+        if any(r['status'] == services.HELD for r in results):
+            response_status = status.HTTP_201_CREATED
+        else:
+            response_status = status.HTTP_409_CONFLICT
+        return Response({"results": results}, status=response_status)
+    
+    @action(detail=False, methods=['post'])
+    def release(self, request):
+        """
+        Release seats the current user is holding
+        POST /api/seats/release/  {"showtime": id, "seats": [id, ...]}
+        """
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        
+        released = services.release_holds(
+            serializer.validated_data['showtime'],
+            serializer.validated_data['seats'],
+            request.user
+        )
+        return Response({"released": released})
 
 
-class BookingViewSet(viewsets.ModelViewSet):
+class BookingViewSet(ServerTimingMixin, QueryBudgetMixin, FastListMixin, viewsets.ModelViewSet):
     """
     ViewSet for users to book seats and view their booking history.
     
     Endpoints:
-    - GET /api/bookings/ - List user's bookings (or all if staff)
-    - POST /api/bookings/ - Create a new booking
+    - GET /api/bookings/ - List user's bookings (or all if staff, cursor paginated)
+    - POST /api/bookings/ - Create a new booking (or queue it, see bookingqueue.py)
+    - POST /api/bookings/bulk/ - Book several seats for one showtime at once
+    - POST /api/bookings/from_hold/ - Book the seats the user is holding
     - GET /api/bookings/{id}/ - Retrieve a booking
     - DELETE /api/bookings/{id}/ - Cancel a booking
     - GET /api/bookings/my_bookings/ - Get current user's bookings
     - GET /api/bookings/upcoming/ - Get current user's upcoming bookings
+    
+    The list is built from .values() rows without the serializer (see fastlist.py).
     """
     queryset = Booking.objects.all()
     permission_classes = [IsAuthenticated]
+    pagination_class = BookingCursorPagination
+    query_budgets = {
+        'list': 3,
+        'my_bookings': 3,
+        'upcoming': 3,
+        'retrieve': 3,
+        'create': 15,
+        'bulk': 16,
+        'from_hold': 17,
+        'destroy': 11,
+    }
     
     def get_serializer_class(self):
         """Use different serializers for different actions"""
         if self.action == 'create':
             return BookingCreateSerializer
+        if self.action == 'bulk':
+            return BulkBookingSerializer
+        if self.action == 'from_hold':
+            return BookFromHoldSerializer
         return BookingSerializer
     
     def get_queryset(self):
@@ -154,18 +587,37 @@ class BookingViewSet(viewsets.ModelViewSet):
         """
         user = self.request.user
         if user.is_staff:
-            return Booking.objects.all()
-        return Booking.objects.filter(user=user)
+            return Booking.objects.with_related()
+        return Booking.objects.with_related().filter(user=user)
     
     def create(self, request, *args, **kwargs):
         """Create a new booking"""
+        if bookingqueue.queue_enabled():
+            return self.enqueue(request)
+        
         serializer = self.get_serializer(data=request.data, context={'request': request})
         serializer.is_valid(raise_exception=True)
+        
+        # Inserts in one transaction with the index write from the Booking
+        # signals; a seat booked meanwhile comes back as a 400
         booking = serializer.save()
         
         # Return with the full BookingSerializer for response
         response_serializer = BookingSerializer(booking)
-        return Response(response_serializer.data, status=status.HTTP_201_CREATED)
+        return Response(serialized(response_serializer), status=status.HTTP_201_CREATED)
+    
+    def enqueue(self, request):
+        """
+        Queued mode: store the request for the worker and answer 202 with a
+        ticket and the URL to poll for the outcome
+        """
+        serializer = BookingRequestSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        booking_request = bookingqueue.enqueue(request.user, **serializer.validated_data)
+        
+        status_url = reverse('api-booking-request-detail', args=[booking_request.ticket], request=request)
+        data = dict(serialized(BookingRequestSerializer(booking_request)), status_url=status_url)
+        return Response(data, status=status.HTTP_202_ACCEPTED, headers={'Location': status_url})
     
     def destroy(self, request, *args, **kwargs):
         """
@@ -177,7 +629,54 @@ class BookingViewSet(viewsets.ModelViewSet):
                 {"error": "You can only cancel your own bookings"},
                 status=status.HTTP_403_FORBIDDEN
             )
-        return super().destroy(request, *args, **kwargs)
+        with transaction.atomic():
+            booking.delete()
+        return Response(status=status.HTTP_204_NO_CONTENT)
+    
+    @action(detail=False, methods=['post'])
+    def bulk(self, request):
+        """
+        Book several seats for one showtime in a single transaction
+        POST /api/bookings/bulk/  {"showtime": id, "seats": [id, ...]}
+        
+        Returns a per-seat status of booked, conflict or not_found.
+        """
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        
+        results = services.book_seats(
+            serializer.validated_data['showtime'],
+            serializer.validated_data['seats'],
+            request.user
+        )
+        
+        if any(r['status'] == services.BOOKED for r in results):
+            response_status = status.HTTP_201_CREATED
+        else:
+            response_status = status.HTTP_409_CONFLICT
+        return Response({"results": results}, status=response_status)
+    
+    @action(detail=False, methods=['post'])
+    def from_hold(self, request):
+        """
+        Convert the current user's active holds for a showtime into bookings
+        POST /api/bookings/from_hold/  {"showtime": id}
+        """
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        
+        results = services.book_held_seats(serializer.validated_data['showtime'], request.user)
+        if not results:
+            return Response(
+                {"error": "You have no active seat holds for this movie"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        if any(r['status'] == services.BOOKED for r in results):
+            response_status = status.HTTP_201_CREATED
+        else:
+            response_status = status.HTTP_409_CONFLICT
+        return Response({"results": results}, status=response_status)
     
     @action(detail=False, methods=['get'])
     def my_bookings(self, request):
@@ -185,9 +684,8 @@ class BookingViewSet(viewsets.ModelViewSet):
         Get current user's booking history
         GET /api/bookings/my_bookings/
         """
-        bookings = Booking.objects.filter(user=request.user)
-        serializer = self.get_serializer(bookings, many=True)
-        return Response(serializer.data)
+        bookings = Booking.objects.with_related().filter(user=request.user)
+        return self._paginated_response(bookings)
     
     @action(detail=False, methods=['get'])
     def upcoming(self, request):
@@ -195,9 +693,38 @@ class BookingViewSet(viewsets.ModelViewSet):
         Get current user's upcoming bookings (movies with future release dates)
         GET /api/bookings/upcoming/
         """
-        bookings = Booking.objects.filter(
+        bookings = Booking.objects.with_related().filter(
             user=request.user,
             movie__release_date__gte=timezone.now().date()
         )
-        serializer = self.get_serializer(bookings, many=True)
-        return Response(serializer.data)
\ No newline at end of file
+        return self._paginated_response(bookings)
+    
+    def _paginated_response(self, queryset):
+        """Serialize one cursor page of a booking queryset"""
+        page = self.paginate_queryset(queryset)
+        serializer = self.get_serializer(page, many=True)
+        return self.get_paginated_response(serializer.data)
+
+
+class BookingRequestViewSet(ServerTimingMixin, QueryBudgetMixin, mixins.RetrieveModelMixin, viewsets.GenericViewSet):
+    """
+    Status of bookings queued while settings.BOOKING_QUEUE_ENABLED is on.
+    
+    Endpoints:
+    - GET /api/booking-requests/{ticket}/ - A queued request's status: pending
+      (with its place in the queue), booked (with the booking) or rejected
+      (with the reason)
+    """
+    serializer_class = BookingRequestSerializer
+    permission_classes = [IsAuthenticated]
+    lookup_field = 'ticket'
+    query_budgets = {
+        'retrieve': 3,
+    }
+    
+    def get_queryset(self):
+        """Only the user's own requests unless user is staff"""
+        user = self.request.user
+        if user.is_staff:
+            return BookingRequest.objects.all()
+        return BookingRequest.objects.filter(user=user)
@@ -55,12 +55,15 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'booking.timing.ServerTimingMiddleware',
+    'booking.metrics.MetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware', 
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'booking.dbrouter.ReplicaMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -102,6 +105,41 @@ else:
         }
     }
 
+# SQLite tuned for concurrent requests (see booking/sqlitetuning.py). SQLITE_TUNED=0 gives
+# stock SQLite, for comparison with `manage.py bench_sqlite`
+SQLITE_TUNED = os.environ.get("SQLITE_TUNED", "1") == "1"
+SQLITE_PRAGMAS = {
+    'journal_mode': 'wal',
+    'busy_timeout': 5000,
+    'synchronous': 'normal',
+    'mmap_size': 128 * 1024 * 1024,
+}
+if SQLITE_TUNED and DATABASES['default']['ENGINE'] == 'django.db.backends.sqlite3':
+    # Take the write lock at BEGIN, so writers queue on busy_timeout instead of
+    # failing with "database is locked" when a read lock cannot be upgraded
+    DATABASES['default']['OPTIONS'] = {'transaction_mode': 'IMMEDIATE'}
+
+# Read replicas for the read-heavy views (see booking/dbrouter.py)
+if ENVIRONMENT == "production":
+    _replica_urls = [url for url in os.environ.get("DATABASE_REPLICA_URLS", "").split(",") if url]
+    for n, url in enumerate(_replica_urls, 1):
+        DATABASES[f'replica{n}'] = dj_database_url.parse(url, conn_max_age=600)
+elif os.environ.get("SQLITE_REPLICA") == "1":
+    # Local testing: fill it with `manage.py sync_sqlite_replicas`
+    DATABASES['replica1'] = {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': BASE_DIR / 'db.replica1.sqlite3',
+    }
+
+DATABASE_REPLICAS = [alias for alias in DATABASES if alias != 'default']
+for alias in DATABASE_REPLICAS:
+    # Tests read the test database through the replica aliases
+    DATABASES[alias]['TEST'] = {'MIRROR': 'default'}
+DATABASE_ROUTERS = ['booking.dbrouter.ReplicaRouter']
+
+# How long a user reads from 'default' after a write, to see their own changes (seconds)
+READ_REPLICA_STICKY_SECONDS = 10
+
 
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
@@ -155,4 +193,62 @@ if ENVIRONMENT == "production":
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
+# Seat holds: how long a seat stays reserved during checkout (seconds)
+SEAT_HOLD_SECONDS = int(os.environ.get("SEAT_HOLD_SECONDS", 300))
+SEAT_HOLD_MAX_SECONDS = 900
+
+# Queued booking intake: POST /api/bookings/ answers 202 with a ticket and the
+# process_booking_queue command books the seats (see booking/bookingqueue.py)
+BOOKING_QUEUE_ENABLED = os.environ.get("BOOKING_QUEUE_ENABLED") == "1"
+
+# Live seat map streams (server-sent events, see booking/streams.py)
+SEAT_EVENTS_STREAM_SECONDS = 300
+SEAT_EVENTS_KEEPALIVE_SECONDS = 15
+
 #FORCE_SCRIPT_NAME = '/proxy/3000'
+
+# Per-endpoint SQL query budgets (see booking/querybudget.py)
+QUERY_BUDGETS_ENFORCED = DEBUG
+
+# Caches. 'responses' holds versioned API and page data (see booking/responsecache.py);
+# its keys change whenever the data does, so a per-process cache is safe
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'responses': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'responses',
+        'OPTIONS': {'MAX_ENTRIES': 1000},
+    },
+}
+
+# Response cache lifetime per endpoint (seconds); only bounds how long old versions linger
+RESPONSE_CACHE_TTLS = {
+    'movie-list': 300,
+    'movie-detail': 60,
+    'movie-list-page': 300,
+}
+
+# Build list responses from .values() rows instead of the serializers (see booking/fastlist.py)
+FAST_LIST_RESPONSES = True
+
+# Server-Timing header on every response (see booking/timing.py), and the fraction
+# of requests also logged as a JSON line on the booking.timing logger
+SERVER_TIMING = True
+SERVER_TIMING_LOG_SAMPLE_RATE = float(os.environ.get("SERVER_TIMING_LOG_SAMPLE_RATE", 0))
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'booking.timing': {'handlers': ['console'], 'level': 'INFO', 'propagate': False},
+    },
+}
+
+# Metrics at /metrics (see booking/metrics.py). Under several gunicorn workers, point this
+# at an empty directory shared by the workers so a scrape sums all of them
+METRICS_MULTIPROC_DIR = os.environ.get("METRICS_MULTIPROC_DIR") or None